@@ -0,0 +1,480 @@
+import argparse
+from datetime import datetime
+import json
+import platform
+import statistics
+import subprocess
+import time
+
+import numpy as np
+
+from calculators.autocorrelation_calculator import AutocorrelationCalculator
+from calculators.btc_correlation_calculator import BtcCorrelationCalculator
+from calculators.correlation_matrix_calculator import CorrelationMatrixCalculator
+from calculators.eth_correlation_calculator import EthCorrelationCalculator
+from calculators.market_cap_calculator import MarketCapCalculator
+from calculators.moving_average_30d_calculator import MovingAverage30dCalculator
+from calculators.moving_average_calculator import MovingAverageCalculator
+from calculators.moving_average_family import MovingAverageFamily
+from calculators.price_calculator import PriceCalculator
+from calculators.price_diff_calculator import PriceDiffCalculator
+from calculators.return_calculator import ReturnCalculator
+from calculators.return_30d_calculator import Return30dCalculator
+from calculators.rsi_calculator import RsiCalculator
+from calculators.volume_calculator import VolumeCalculator
+from calculators.volume_diff_calculator import VolumeDiffCalculator
+from core.analytics_engine import AnalyticsEngine
+from core.symbol_store import SymbolStore
+from core.time_series_store import TimeSeriesStore
+from utils.json_payload_serialiser import JsonPayloadSerialiser
+from utils.logger import Logger
+from utils.msgpack_payload_serialiser import MsgpackPayloadSerialiser
+from utils.serialiser import Serialiser
+
+from .stub_lunar_crush_client import StubLunarCrushClient
+from .synthetic_asset_data import SyntheticAssetData
+from .synthetic_symbol_store import SyntheticSymbolStore
+
+
+class BenchmarkSuite:
+    """
+    Represents a suite of micro-benchmarks which times the full and latest tick
+    calculations of every analytics calculator, the ticks of the analytics
+    engine and the serialisation of its output, over synthetic asset data
+    payloads of several sizes, offline.
+
+    ...
+
+    Instance Attributes
+    -------------------
+    _logger : Logger
+        The logger of this class.
+    symbol_counts : int[]
+        The numbers of symbols of the payloads.
+    bar_counts : int[]
+        The numbers of daily bars of the payloads.
+    repeats : int
+        The number of times each benchmark is timed.
+    is_batched : bool
+        A flag which when set to `True` runs the calculators in batched mode.
+    max_workers : int
+        The maximum number of calculators which run at the same time.
+    max_points : int
+        The maximum number of bars (i.e. symbols x bars) of a payload, where
+        larger payloads are skipped to bound the memory used.
+    __synthetic_asset_data : SyntheticAssetData
+        The generator of the synthetic payloads.
+    """
+
+    def __init__(
+        self,
+        symbol_counts=(15, 500, 5000),
+        bar_counts=(100, 1000, 10000),
+        repeats=5,
+        is_batched=True,
+        max_workers=1,
+        max_points=1000000,
+        seed=0,
+        missing_fraction=0.0,
+    ):
+        """
+        Initialises a new instance of this class.
+
+        Parameters
+        ----------
+        symbol_counts : int[]
+            The numbers of symbols of the payloads.
+        bar_counts : int[]
+            The numbers of daily bars of the payloads.
+        repeats : int
+            The number of times each benchmark is timed.
+        is_batched : bool
+            A flag which when set to `True` runs the calculators in batched mode.
+        max_workers : int
+            The maximum number of calculators which run at the same time.
+        max_points : int
+            The maximum number of bars (i.e. symbols x bars) of a payload.
+        seed : int
+            The seed of the synthetic payloads.
+        missing_fraction : double
+            The fraction of bar fundamentals which are missing.
+        """
+
+        self._logger = Logger.get_instance()
+        self.symbol_counts = list(symbol_counts)
+        self.bar_counts = list(bar_counts)
+        self.repeats = repeats
+        self.is_batched = is_batched
+        self.max_workers = max_workers
+        self.max_points = max_points
+        self.__synthetic_asset_data = SyntheticAssetData(seed, missing_fraction)
+
+    @staticmethod
+    def create_calculators():
+        """
+        Creates the calculators the analytics engine runs in production.
+
+        Returns
+        -------
+            The list of analytics calculators, in the order of their dependencies.
+        """
+
+        return_calculator = ReturnCalculator()
+        correlation_matrix_calculator = CorrelationMatrixCalculator(return_calculator)
+        moving_average_family = MovingAverageFamily()
+        moving_average_30d_calculator = MovingAverage30dCalculator(
+            moving_average_family
+        )
+
+        return [
+            PriceCalculator(),
+            VolumeCalculator(),
+            MarketCapCalculator(),
+            return_calculator,
+            Return30dCalculator(),
+            PriceDiffCalculator(),
+            VolumeDiffCalculator(),
+            moving_average_30d_calculator,
+            *MovingAverageCalculator.create_all(
+                moving_average_family, excluded_ids=[moving_average_30d_calculator.id]
+            ),
+            RsiCalculator(),
+            AutocorrelationCalculator(return_calculator),
+            BtcCorrelationCalculator(correlation_matrix_calculator),
+            EthCorrelationCalculator(correlation_matrix_calculator),
+        ]
+
+    def run(self):
+        """
+        Runs every benchmark over payloads of every size.
+
+        Returns
+        -------
+            A dictionary of the run's metadata, indexed by "metadata", and the list
+            of benchmark results, indexed by "results".
+        """
+
+        results = []
+
+        for num_symbols in self.symbol_counts:
+            for num_bars in self.bar_counts:
+                if num_symbols * num_bars > self.max_points:
+                    self._logger.log(
+                        f"Skipping {num_symbols} symbols x {num_bars} bars as it exceeds {self.max_points} bars."
+                    )
+                    continue
+
+                self._logger.log(
+                    f"Benchmarking {num_symbols} symbols x {num_bars} bars."
+                )
+
+                # Only warnings and errors are logged while timing, like in production.
+                level = self._logger.level
+                self._logger.configure(Logger.warning_level)
+
+                try:
+                    results.extend(self.__run_size(num_symbols, num_bars))
+                finally:
+                    self._logger.configure(level)
+
+        return {"metadata": self.__build_metadata(), "results": results}
+
+    @staticmethod
+    def compare(results, baseline_results, tolerance=0.1):
+        """
+        Compares the median timings of the given results with the ones of a
+        baseline run, e.g. of the previous commit.
+
+        Parameters
+        ----------
+        results : dict
+            The results of a run.
+        baseline_results : dict
+            The results of the baseline run.
+        tolerance : double
+            The relative slowdown above which a benchmark counts as a regression.
+
+        Returns
+        -------
+            The list of comparisons of the benchmarks found in both runs, as
+            dictionaries holding the benchmark's key, the ratio of its median
+            timings and whether it regressed.
+        """
+
+        baseline_timings = {
+            BenchmarkSuite.__result_key(result): result["median_seconds"]
+            for result in baseline_results["results"]
+        }
+
+        comparisons = []
+
+        for result in results["results"]:
+            key = BenchmarkSuite.__result_key(result)
+
+            if key not in baseline_timings:
+                continue
+
+            ratio = result["median_seconds"] / baseline_timings[key]
+            comparisons.append(
+                {
+                    "benchmark": key,
+                    "ratio": ratio,
+                    "is_regression": ratio > 1.0 + tolerance,
+                }
+            )
+
+        return comparisons
+
+    @staticmethod
+    def __result_key(result):
+        """
+        Returns the key which identifies a benchmark between runs.
+        """
+
+        return f"{result['name']}[{result['num_symbols']}x{result['num_bars']}]"
+
+    def __run_size(self, num_symbols, num_bars):
+        """
+        Runs every benchmark over payloads of the given size.
+
+        Parameters
+        ----------
+        num_symbols : int
+            The number of symbols of the payloads.
+        num_bars : int
+            The number of daily bars of the payloads.
+
+        Returns
+        -------
+            The list of benchmark results.
+        """
+
+        synthetic_asset_data = self.__synthetic_asset_data
+        symbols = SyntheticAssetData.create_symbols(
+            num_symbols, SymbolStore.get_instance().symbols
+        )
+        symbol_store = SyntheticSymbolStore(symbols)
+        asset_data = synthetic_asset_data.generate(symbols, num_bars)
+        calculators = BenchmarkSuite.create_calculators()
+
+        def create_engine():
+            # Every engine parses a new payload object, since parsing is
+            # memoised on the identity of the payload.
+            TimeSeriesStore.get_instance().clear()
+            client = StubLunarCrushClient(
+                synthetic_asset_data, synthetic_asset_data.generate_tick(asset_data)
+            )
+
+            return AnalyticsEngine(
+                client,
+                symbol_store,
+                calculators,
+                is_batched=self.is_batched,
+                max_workers=self.max_workers,
+            )
+
+        results = []
+
+        def record(name, timings):
+            results.append(
+                {
+                    "name": name,
+                    "num_symbols": num_symbols,
+                    "num_bars": num_bars,
+                    "repeats": len(timings),
+                    "min_seconds": min(timings),
+                    "median_seconds": statistics.median(timings),
+                    "mean_seconds": statistics.mean(timings),
+                }
+            )
+
+        engines = [create_engine() for _ in range(self.repeats)]
+        record(
+            "engine/initialise", [self.__time(engine.initialise) for engine in engines]
+        )
+
+        engine = engines[-1]
+        record(
+            "engine/update", [self.__time(engine.update) for _ in range(self.repeats)]
+        )
+
+        # The payload serialisers are compared with the previous path, i.e.
+        # `Serialiser.to_serialisable` followed by the JSON encoding of Flask/SocketIO.
+        snapshot = engine.snapshot()
+        record(
+            "serialise/serialiser",
+            [
+                self.__time(
+                    lambda: json.dumps(
+                        Serialiser.to_serialisable(engine.engine_output)
+                    ).encode("utf-8")
+                )
+                for _ in range(self.repeats)
+            ],
+        )
+
+        for payload_serialiser in [JsonPayloadSerialiser(), MsgpackPayloadSerialiser()]:
+            if payload_serialiser.is_available:
+                record(
+                    f"serialise/{payload_serialiser.format_name}",
+                    [
+                        self.__time(lambda: payload_serialiser.serialise(snapshot))
+                        for _ in range(self.repeats)
+                    ],
+                )
+
+        fundamental_ids = [
+            calculator.fundamental_id
+            for calculator in calculators
+            if calculator.is_fundamental
+        ]
+        latest_fundamentals = {
+            datum["symbol"]: {
+                fundamental_id: datum[fundamental_id]
+                for fundamental_id in fundamental_ids
+            }
+            for datum in synthetic_asset_data.generate_tick(asset_data)["data"]
+        }
+
+        # Each calculator is timed on its own, in the order of the dependencies,
+        # without the intermediate values other calculators shared with it.
+        for calculator in calculators:
+            timings = []
+
+            for _ in range(self.repeats):
+                fundamental_data = (
+                    synthetic_asset_data.generate_tick(asset_data)
+                    if calculator.is_fundamental
+                    else engine.analytics_data[calculator.fundamental_id]
+                )
+                calculator.intermediate_cache.clear()
+                timings.append(
+                    self.__time(lambda: calculator.calculate(fundamental_data))
+                )
+
+            record(f"calculate/{calculator.id}", timings)
+
+        for calculator in calculators:
+            timings = []
+
+            for _ in range(self.repeats):
+                calculator.intermediate_cache.clear()
+                timings.append(
+                    self.__time(
+                        lambda: calculator.calculate_latest(latest_fundamentals)
+                    )
+                )
+
+            record(f"calculate_latest/{calculator.id}", timings)
+
+        return results
+
+    @staticmethod
+    def __time(run):
+        """
+        Times the given function.
+
+        Parameters
+        ----------
+        run : func
+            Function without parameters.
+
+        Returns
+        -------
+            The number of seconds the function took.
+        """
+
+        start_time = time.perf_counter()
+        run()
+
+        return time.perf_counter() - start_time
+
+    def __build_metadata(self):
+        """
+        Builds the metadata of a run, which identifies the commit and environment
+        the benchmarks ran on.
+
+        Returns
+        -------
+            The metadata dictionary.
+        """
+
+        try:
+            commit = subprocess.run(
+                ["git", "rev-parse", "HEAD"],
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            commit = None
+
+        return {
+            "commit": commit,
+            "time": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "repeats": self.repeats,
+            "is_batched": self.is_batched,
+            "max_workers": self.max_workers,
+        }
+
+
+def main():
+    """
+    Runs the benchmark suite from the command line, e.g. from the `src` directory:
+
+        python -m benchmarks.benchmark_suite --symbols 15 500 --bars 100 1000 \\
+            --output results.json --baseline previous_results.json
+    """
+
+    logger = Logger.get_instance()
+
+    parser = argparse.ArgumentParser(description="Benchmarks the analytics engine.")
+    parser.add_argument("--symbols", type=int, nargs="+", default=[15, 500, 5000])
+    parser.add_argument("--bars", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--per-symbol", action="store_true")
+    parser.add_argument("--max-workers", type=int, default=1)
+    parser.add_argument("--max-points", type=int, default=1000000)
+    parser.add_argument("--missing-fraction", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--baseline")
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    arguments = parser.parse_args()
+
+    results = BenchmarkSuite(
+        arguments.symbols,
+        arguments.bars,
+        repeats=arguments.repeats,
+        is_batched=not arguments.per_symbol,
+        max_workers=arguments.max_workers,
+        max_points=arguments.max_points,
+        seed=arguments.seed,
+        missing_fraction=arguments.missing_fraction,
+    ).run()
+
+    with open(arguments.output, "w") as output_file:
+        json.dump(results, output_file, indent=2)
+
+    logger.log(f"Wrote {len(results['results'])} results to {arguments.output}.")
+
+    if arguments.baseline is None:
+        return 0
+
+    with open(arguments.baseline) as baseline_file:
+        comparisons = BenchmarkSuite.compare(
+            results, json.load(baseline_file), arguments.tolerance
+        )
+
+    for comparison in comparisons:
+        flag = " REGRESSION" if comparison["is_regression"] else ""
+        logger.log(f"{comparison['benchmark']}: x{comparison['ratio']:.2f}{flag}")
+
+    return int(any(comparison["is_regression"] for comparison in comparisons))
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,66 @@
+from utils.logger import Logger
+
+
+class StubLunarCrushClient:
+    """
+    Represents an offline stand-in for the `LunarCrushClient`, which serves a
+    synthetic asset data payload rather than calling the LunarCrush API.
+
+    ...
+
+    Instance Attributes
+    -------------------
+    _logger : Logger
+        The logger of this class.
+    __synthetic_asset_data : SyntheticAssetData
+        The generator of the payload's intraday ticks.
+    __asset_data : dict
+        The payload served by the next fetch.
+    num_fetches : int
+        The number of fetches served so far.
+    """
+
+    def __init__(self, synthetic_asset_data, asset_data):
+        """
+        Initialises a new instance of this class.
+
+        Parameters
+        ----------
+        synthetic_asset_data : SyntheticAssetData
+            The generator of the payload's intraday ticks.
+        asset_data : dict
+            The payload served by the first fetch.
+        """
+
+        self._logger = Logger.get_instance()
+        self.__synthetic_asset_data = synthetic_asset_data
+        self.__asset_data = asset_data
+        self.num_fetches = 0
+
+    def fetch_asset_data(self, num_of_datapoints=100):
+        """
+        Serves the synthetic payload, where every fetch after the first one serves
+        the payload's next intraday tick.
+
+        Parameters
+        ----------
+        num_of_datapoints : int
+            The number of time series datapoints requested, which is ignored since
+            the payload has a fixed number of bars.
+
+        Returns
+        -------
+            A dictionary where the keys are the asset symbols and the values asset data
+            (e.g. time series data, etc).
+        """
+
+        self._logger.log("Fetching synthetic asset data from the stub client.")
+
+        if self.num_fetches > 0:
+            self.__asset_data = self.__synthetic_asset_data.generate_tick(
+                self.__asset_data
+            )
+
+        self.num_fetches += 1
+
+        return self.__asset_data
@@ -0,0 +1,216 @@
+import time
+
+import numpy as np
+
+
+class SyntheticAssetData:
+    """
+    Represents a generator of synthetic asset data payloads shaped like the ones
+    returned by `LunarCrushClient.fetch_asset_data`, where prices and volumes
+    follow geometric Brownian motions.
+
+    ...
+
+    Class Attributes
+    ----------------
+    day_in_seconds : int
+        The number of seconds between two bars.
+
+    Instance Attributes
+    -------------------
+    __random : np.random.Generator
+        The random number generator, which is seeded so that payloads are
+        reproducible between runs.
+    __missing_fraction : double
+        The fraction of bar fundamentals which are missing (i.e. `None`).
+    """
+
+    day_in_seconds = 24 * 60 * 60
+
+    def __init__(self, seed=0, missing_fraction=0.0):
+        """
+        Initialises a new instance of this class.
+
+        Parameters
+        ----------
+        seed : int
+            The seed of the random number generator.
+        missing_fraction : double
+            The fraction of bar fundamentals which are missing (i.e. `None`).
+        """
+
+        self.__random = np.random.default_rng(seed)
+        self.__missing_fraction = missing_fraction
+
+    @staticmethod
+    def create_symbols(num_symbols, symbols=()):
+        """
+        Creates the given number of asset symbols, starting with the given symbols.
+
+        Parameters
+        ----------
+        num_symbols : int
+            The number of symbols.
+        symbols : str[]
+            The symbols to start with, e.g. the symbols of the `SymbolStore`.
+
+        Returns
+        -------
+            The list of symbols.
+        """
+
+        symbols = list(symbols)[:num_symbols]
+
+        return symbols + [f"SYN{index}" for index in range(num_symbols - len(symbols))]
+
+    def generate(self, symbols, num_bars, end_time=None):
+        """
+        Generates an asset data payload of the given symbols and number of daily bars.
+
+        Parameters
+        ----------
+        symbols : str[]
+            The asset symbols.
+        num_bars : int
+            The number of daily bars of each symbol.
+        end_time : int
+            The epoch time of the last bar, which defaults to the start of the
+            current day so that the payload looks fresh to the analytics engine.
+
+        Returns
+        -------
+            API time_series data dictionary where relevant information is indexed by
+            the keyword "data".
+        """
+
+        if end_time is None:
+            end_time = (
+                int(time.time()) // SyntheticAssetData.day_in_seconds
+            ) * SyntheticAssetData.day_in_seconds
+
+        num_symbols = len(symbols)
+        times = (
+            end_time
+            - SyntheticAssetData.day_in_seconds * np.arange(num_bars - 1, -1, -1)
+        ).tolist()
+
+        prices = self.__simulate(
+            self.__random.uniform(0.01, 50000.0, num_symbols), 0.0005, 0.04, num_bars
+        )
+        volumes = self.__simulate(
+            self.__random.uniform(1e5, 1e10, num_symbols), 0.0, 0.25, num_bars
+        )
+        supplies = self.__random.uniform(1e6, 1e11, num_symbols)
+        market_caps = prices * supplies[:, np.newaxis]
+
+        data = []
+
+        for row, symbol in enumerate(symbols):
+            bar_prices = self.__with_missing(prices[row])
+            bar_volumes = self.__with_missing(volumes[row])
+            bar_market_caps = self.__with_missing(market_caps[row])
+
+            data.append(
+                {
+                    "symbol": symbol,
+                    "price": float(prices[row, -1]),
+                    "volume": float(volumes[row, -1]),
+                    "market_cap": float(market_caps[row, -1]),
+                    "timeSeries": [
+                        {
+                            "time": bar_time,
+                            "close": price,
+                            "volume": volume,
+                            "market_cap": market_cap,
+                        }
+                        for bar_time, price, volume, market_cap in zip(
+                            times, bar_prices, bar_volumes, bar_market_caps
+                        )
+                    ],
+                }
+            )
+
+        return {"data": data}
+
+    def generate_tick(self, asset_data):
+        """
+        Generates the next intraday tick of the given payload, which is a new payload
+        sharing the bars of the given payload but with moved latest fundamentals.
+
+        Parameters
+        ----------
+        asset_data : dict
+            API time_series data dictionary where relevant information is indexed by
+            the keyword "data".
+
+        Returns
+        -------
+            The payload of the next tick.
+        """
+
+        data = asset_data["data"]
+        shocks = np.exp(self.__random.normal(0.0, 0.005, (len(data), 2))).tolist()
+
+        return {
+            "data": [
+                {
+                    **datum,
+                    "price": datum["price"] * price_shock,
+                    "volume": datum["volume"] * volume_shock,
+                    "market_cap": datum["market_cap"] * price_shock,
+                }
+                for datum, (price_shock, volume_shock) in zip(data, shocks)
+            ]
+        }
+
+    def __simulate(self, initial_values, drift, volatility, num_bars):
+        """
+        Simulates daily geometric Brownian motions.
+
+        Parameters
+        ----------
+        initial_values : np.ndarray
+            The initial value of each motion.
+        drift : double
+            The daily drift.
+        volatility : double
+            The daily volatility.
+        num_bars : int
+            The number of values of each motion.
+
+        Returns
+        -------
+            A 2-D (symbols x time) array of values.
+        """
+
+        log_increments = (drift - 0.5 * volatility**2) + volatility * (
+            self.__random.standard_normal((len(initial_values), num_bars))
+        )
+        log_increments[:, 0] = 0.0
+
+        return initial_values[:, np.newaxis] * np.exp(np.cumsum(log_increments, axis=1))
+
+    def __with_missing(self, values):
+        """
+        Converts the given values into a list where a random fraction of them are
+        missing, except for the last value.
+
+        Parameters
+        ----------
+        values : np.ndarray
+            An array of values.
+
+        Returns
+        -------
+            A list of values and `None`.
+        """
+
+        values = values.tolist()
+
+        if self.__missing_fraction > 0.0:
+            is_missing = self.__random.random(len(values) - 1) < self.__missing_fraction
+
+            for index in np.flatnonzero(is_missing):
+                values[index] = None
+
+        return values
@@ -0,0 +1,38 @@
+class SyntheticSymbolStore:
+    """
+    Represents a store of synthetic asset symbols, which stands in for the
+    `SymbolStore` singleton so that benchmarks can run over any number of symbols.
+
+    ...
+
+    Instance Attributes
+    -------------------
+    symbol_map : dict
+        The asset names indexed by symbol.
+    symbols : str[]
+        The asset symbols.
+    """
+
+    def __init__(self, symbols):
+        """
+        Initialises a new instance of this class.
+
+        Parameters
+        ----------
+        symbols : str[]
+            The asset symbols.
+        """
+
+        self.symbol_map = {symbol: symbol for symbol in symbols}
+        self.symbols = self.symbol_map.keys()
+
+    def __str__(self):
+        """
+        Returns a comma separated string list of symbols.
+
+        Returns
+        -------
+            A comma separated string list of symbols.
+        """
+
+        return ",".join(self.symbols)
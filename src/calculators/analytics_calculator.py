@@ -1,7 +1,11 @@
-import scipy.stats as stats
+import numpy as np
 
+from core.time_series_store import TimeSeriesStore
 from utils.logger import Logger
 
+from .rolling_kernels import RollingKernel
+from .z_score_state import ZScoreState
+
 
 class AnalyticsCalculator:
     """
@@ -13,6 +17,8 @@ class AnalyticsCalculator:
     ----------
     _logger : Logger
         The logger of this class.
+    _store : TimeSeriesStore
+        The store which all calculated time series are read from and written to.
     id : string
         An ID for the calculator which is simply the name of the analytics being calculated.
     id : string
@@ -21,19 +27,80 @@ class AnalyticsCalculator:
         Price data dictionary indexed by symbol names.
     analytics_data : dict
         Analytics data dictionary indexed by symbol names.
+    _z_score_states : dict
+        The running z-score state of the analytics values indexed by symbol names.
+    is_batched : bool
+        A flag which when set to `True` calculates the analytics of all symbols at
+        once over a 2-D (symbols x time) panel, rather than symbol by symbol.
+    dependencies : str[]
+        The IDs of the calculators whose analytics this calculator reads, which
+        have to be calculated before it.
+    is_in_total_z_score : bool
+        A flag which when set to `True` adds the z-score of the analytics to the
+        total z-score of each symbol.
+    intermediate_cache : IntermediateCache
+        The cache of intermediate values of the current tick shared by every
+        calculator, or `None` to compute intermediate values every time.
+    _kernels : dict
+        The rolling kernels primed right before the last fundamentals, indexed by
+        the tuple of symbols of the panel they ran over, which recalculate the
+        analytics of the latest tick in constant time.
+    __primed_panels : dict
+        The panel of fundamentals the kernels were last primed with and the array
+        of the analytics of its last fundamentals, indexed like the kernels, which
+        are needed to roll the kernels over to the next day.
+    __latest_analytics_source : dict
+        The analytics data the latest analytics data was calculated for, whose
+        latest entries are only reused while the analytics data is the same.
     """
 
-    def __init__(self, analytics_id, fundamental_id, is_fundamental=False):
+    def __init__(
+        self,
+        analytics_id,
+        fundamental_id,
+        is_fundamental=False,
+        dependencies=None,
+        is_in_total_z_score=True,
+    ):
         """
         Initialises a new instance of this class.
+
+        Parameters
+        ----------
+        analytics_id : str
+            The ID of the analytics being calculated.
+        fundamental_id : str
+            The ID of the fundamental data underpinning the analytics.
+        is_fundamental : bool
+            A flag which when set to `True` marks the calculator as one that reads
+            raw asset data rather than the output of another calculator.
+        dependencies : str[]
+            The IDs of the calculators whose analytics this calculator reads, which
+            default to the calculator of its fundamental data.
+        is_in_total_z_score : bool
+            A flag which when set to `False` leaves the z-score of the analytics out
+            of the total z-score of each symbol.
         """
         self._logger = Logger.get_instance()
+        self._store = TimeSeriesStore.get_instance()
         self.id = analytics_id
         self.fundamental_id = fundamental_id
         self.is_fundamental = is_fundamental
         self.fundamental_data = None
         self.analytics_data = None
         self.latest_analytics_data = None
+        self._z_score_states = {}
+        self.is_batched = False
+        self.intermediate_cache = None
+        self._kernels = {}
+        self.__primed_panels = {}
+        self.__latest_analytics_source = None
+
+        if dependencies is None:
+            dependencies = [] if is_fundamental else [fundamental_id]
+
+        self.dependencies = dependencies
+        self.is_in_total_z_score = is_in_total_z_score
 
     def calculate(self, fundamental_data):
         """
@@ -49,17 +116,32 @@ class AnalyticsCalculator:
             Analytics data dictionary indexed by symbol names.
         """
 
-        self._logger.log(f"Calculating {self.id} data for all symbols.")
+        self._logger.log("Calculating {} data for all symbols.", self.id)
 
         self.fundamental_data = fundamental_data
-        self.analytics_data = {
-            symbol: self.__build_entry(symbol, fundamental_data[symbol])
-            for symbol in fundamental_data
-        }
+
+        if self.is_batched:
+            symbols = list(fundamental_data)
+            fundamentals = self._store.panel(self.fundamental_id, symbols)
+            analytics_panel = self._calculate_panel_analytics(symbols, fundamentals)
+            self.__primed_panels[tuple(symbols)] = (
+                fundamentals,
+                analytics_panel[:, -1],
+            )
+
+            self.analytics_data = {
+                symbol: self.__package_entry(symbol, analytics_panel[row])
+                for row, symbol in enumerate(symbols)
+            }
+        else:
+            self.analytics_data = {
+                symbol: self.__build_entry(symbol, fundamental_data[symbol])
+                for symbol in fundamental_data
+            }
 
         return self.analytics_data
 
-    def calculate_latest(self, latest_fundamentals):
+    def calculate_latest(self, latest_fundamentals, changed_symbols=None):
         """
         Calculates the analytics only for the most recent tick.
 
@@ -67,6 +149,10 @@ class AnalyticsCalculator:
         ----------
         latest_fundamentals : dict
             The latest tick fundamentals (e.g. price or volume) dictionary indexed by symbol.
+        changed_symbols : set
+            The symbols whose data changed since the previous tick, which are the
+            only ones recalculated while the latest analytics of the other symbols
+            are reused, or `None` to recalculate every symbol.
 
         Returns
         -------
@@ -78,17 +164,366 @@ class AnalyticsCalculator:
                 f"Both caches for {self.fundamental_id} and analytics data are null - run `calculate` to initialise them."
             )
 
-        self.latest_analytics_data = {
-            symbol: self._calculate_latest_analytics(
-                latest_fundamentals[symbol][self.fundamental_id],
-                [entry[1] for entry in self.fundamental_data[symbol]["time_series"]],
-                [entry[1] for entry in self.analytics_data[symbol]["time_series"]],
+        symbols = list(self.analytics_data.keys())
+        recalculated_symbols = self._recalculated_symbols(symbols, changed_symbols)
+
+        if self.is_batched:
+            fundamentals = self._store.panel(
+                self.fundamental_id, symbols, drop_missing=False
+            )
+            latest_fundamentals_vector = self._get_intermediate(
+                ("latest", self.fundamental_id, tuple(symbols)),
+                lambda: self.__build_latest_fundamentals_vector(
+                    symbols, latest_fundamentals, fundamentals
+                ),
             )
-            for symbol in self.analytics_data.keys()
-        }
+
+            if len(recalculated_symbols) == len(symbols):
+                latest_analytics = self._calculate_latest_panel_analytics(
+                    symbols, latest_fundamentals_vector, fundamentals
+                )
+            else:
+                latest_analytics = self.__calculate_latest_panel_rows(
+                    symbols,
+                    recalculated_symbols,
+                    latest_fundamentals_vector,
+                    fundamentals,
+                )
+
+            latest_entries = {
+                symbol: self.__package_latest_entry(symbol, latest_analytics[row])
+                for row, symbol in enumerate(recalculated_symbols)
+            }
+        else:
+            latest_entries = {
+                symbol: self.__build_latest_entry(
+                    symbol, latest_fundamentals[symbol][self.fundamental_id]
+                )
+                for symbol in recalculated_symbols
+            }
+
+        self.latest_analytics_data = self._merge_latest_entries(symbols, latest_entries)
 
         return self.latest_analytics_data
 
+    def roll_over(self, fundamental_data):
+        """
+        Calculates the analytics data for the given price data of the next day,
+        i.e. once the stored fundamentals have been extended by a new bar and the
+        previous last bar has closed, by advancing the rolling kernels by the
+        closed bar and appending its analytics to the stored analytics, rather
+        than recalculating the whole history.
+
+        The analytics are recalculated over the whole history if the calculator
+        has no rolling kernels or if the stored fundamentals changed by more than
+        one bar, e.g. after the engine missed a day.
+
+        Parameters
+        ----------
+        fundamental_data : dict
+            Price data dictionary.
+
+        Returns
+        -------
+            Analytics data dictionary indexed by symbol names.
+        """
+
+        if self.fundamental_data is None or self.analytics_data is None:
+            raise Exception(
+                f"Both caches for {self.fundamental_id} and analytics data are null - run `calculate` to initialise them."
+            )
+
+        symbols = list(fundamental_data)
+        analytics_data = None
+
+        if symbols == list(self.analytics_data):
+            if self.is_batched:
+                analytics_data = self.__roll_over_panel(
+                    symbols, self._store.panel(self.fundamental_id, symbols)
+                )
+            else:
+                analytics_data = {}
+
+                for symbol in symbols:
+                    entries = self.__roll_over_panel(
+                        [symbol],
+                        self._clean_values(self.fundamental_id, symbol)[np.newaxis, :],
+                    )
+
+                    if entries is None:
+                        analytics_data = None
+                        break
+
+                    analytics_data.update(entries)
+
+        if analytics_data is None:
+            self._logger.log(
+                "Recalculating {} data for all symbols as it can't be rolled over.",
+                self.id,
+            )
+
+            return self.calculate(fundamental_data)
+
+        self._logger.log("Rolled {} data over for all symbols.", self.id)
+
+        self.fundamental_data = fundamental_data
+        self.analytics_data = analytics_data
+
+        return self.analytics_data
+
+    def __roll_over_panel(self, symbols, fundamentals):
+        """
+        Rolls the analytics of the given symbols over to the next day, if their
+        fundamentals are the ones the kernels were primed with followed by one bar.
+
+        Parameters
+        ----------
+        symbols : str[]
+            The asset symbols, in the order of the panel's rows.
+        fundamentals : np.ndarray
+            A 2-D (symbols x time) array of fundamentals aligned to the right.
+
+        Returns
+        -------
+            Analytics data dictionary indexed by symbol names, or `None` if the
+            analytics can't be rolled over.
+        """
+
+        primed_panel = self.__primed_panels.get(tuple(symbols))
+
+        if primed_panel is None:
+            return None
+
+        primed_fundamentals, primed_last_analytics = primed_panel
+
+        if not TimeSeriesStore.is_rolled_over(primed_fundamentals, fundamentals):
+            return None
+
+        rolled_over_analytics = self._roll_over_panel_analytics(
+            symbols, fundamentals[:, -2], fundamentals[:, -1]
+        )
+
+        if rolled_over_analytics is None:
+            return None
+
+        closed_analytics, latest_analytics = rolled_over_analytics
+        self.__primed_panels[tuple(symbols)] = (fundamentals, latest_analytics)
+
+        return {
+            symbol: self.__package_rolled_over_entry(
+                symbol,
+                primed_last_analytics[row],
+                closed_analytics[row],
+                latest_analytics[row],
+            )
+            for row, symbol in enumerate(symbols)
+        }
+
+    def __package_rolled_over_entry(
+        self,
+        symbol,
+        primed_last_analytics_value,
+        closed_analytics_value,
+        analytics_value,
+    ):
+        """
+        Constructs an analytics data dictionary entry by replacing the last stored
+        analytics value with the one of the closed bar and appending the one of the
+        new bar.
+
+        Parameters
+        ----------
+        symbol: str
+            The asset symbol.
+        primed_last_analytics_value: double
+            The analytics value of the last bar when the kernels were primed, which
+            is the last stored analytics value unless it's missing.
+        closed_analytics_value: double
+            The analytics value of the closed bar.
+        analytics_value: double
+            The analytics value of the new bar.
+
+        Returns
+        -------
+            An analytics data entry (i.e. a dictionary).
+        """
+
+        fundamentals_time_series = self._store.read(self.fundamental_id, symbol)
+        stored_analytics = self._store.read(self.id, symbol).values
+        appended_analytics = self._drop_missing(
+            [closed_analytics_value, analytics_value]
+        )
+        z_score_state = self._z_score_states[symbol]
+
+        # The running z-score statistics are advanced in the same way as the
+        # stored analytics, where a missing value was never stored.
+        if not np.isfinite(primed_last_analytics_value):
+            new_analytics = appended_analytics
+        elif len(appended_analytics) > 0:
+            stored_analytics = stored_analytics[:-1]
+            z_score_state.last_value = appended_analytics[0]
+            new_analytics = appended_analytics[1:]
+        else:
+            stored_analytics = stored_analytics[:-1]
+            z_score_state = ZScoreState(stored_analytics)
+            self._z_score_states[symbol] = z_score_state
+            new_analytics = appended_analytics
+
+        for value in new_analytics:
+            z_score_state.append(value)
+
+        analytics = np.concatenate([stored_analytics, appended_analytics])
+        analytics_time_series = self._store.write(
+            self.id,
+            symbol,
+            fundamentals_time_series.times[-len(analytics) :],
+            analytics,
+        )
+
+        return {
+            "time_series": analytics_time_series,
+            f"last_{self.id}": analytics[-1],
+            "last_z_score": z_score_state.z_score(z_score_state.last_value),
+        }
+
+    def __build_latest_fundamentals_vector(
+        self, symbols, latest_fundamentals, fundamentals
+    ):
+        """
+        Constructs the array of latest tick fundamentals, where a missing latest
+        tick fundamental falls back to the last fundamental.
+
+        Parameters
+        ----------
+        symbols : str[]
+            The asset symbols, in the order of the panel's rows.
+        latest_fundamentals : dict
+            The latest tick fundamentals (e.g. price or volume) dictionary indexed by symbol.
+        fundamentals : np.ndarray
+            A 2-D (symbols x time) array of fundamentals aligned to the right.
+
+        Returns
+        -------
+            The array of latest tick fundamentals, one per symbol.
+        """
+
+        latest_fundamentals_vector = np.array(
+            [latest_fundamentals[symbol][self.fundamental_id] for symbol in symbols],
+            dtype=np.float64,
+        )
+
+        return np.where(
+            np.isnan(latest_fundamentals_vector),
+            fundamentals[:, -1],
+            latest_fundamentals_vector,
+        )
+
+    def __calculate_latest_panel_rows(
+        self, symbols, recalculated_symbols, latest_fundamentals, fundamentals
+    ):
+        """
+        Calculates the latest analytics of some rows of the panel only, using
+        rolling kernels with the state of those rows only.
+
+        Parameters
+        ----------
+        symbols : str[]
+            The asset symbols, in the order of the panel's rows.
+        recalculated_symbols : str[]
+            The symbols to calculate the latest analytics of, in the same order.
+        latest_fundamentals : np.ndarray
+            The array of latest tick fundamentals, one per symbol of the panel.
+        fundamentals : np.ndarray
+            A 2-D (symbols x time) array of fundamentals aligned to the right.
+
+        Returns
+        -------
+            The array of latest analytics values, one per recalculated symbol.
+        """
+
+        recalculated_symbol_set = set(recalculated_symbols)
+        rows = [
+            row
+            for row, symbol in enumerate(symbols)
+            if symbol in recalculated_symbol_set
+        ]
+        kernels = self._kernels.get(tuple(symbols))
+
+        # The rows are fewer than the panel's, so their key never replaces the
+        # kernels of the whole panel.
+        if kernels is not None:
+            self._kernels[tuple(recalculated_symbols)] = (
+                tuple(kernel.select(rows) for kernel in kernels)
+                if isinstance(kernels, tuple)
+                else kernels.select(rows)
+            )
+
+        try:
+            return self._calculate_latest_panel_analytics(
+                recalculated_symbols, latest_fundamentals[rows], fundamentals[rows]
+            )
+        finally:
+            if kernels is not None:
+                del self._kernels[tuple(recalculated_symbols)]
+
+    def __build_latest_entry(self, symbol, latest_fundamental):
+        """
+        Constructs an analytics data dictionary entry for the latest tick given
+        the latest tick fundamental.
+
+        Parameters
+        ----------
+        symbol: str
+            The asset symbol.
+        latest_fundamental: double
+            The latest tick fundamental (e.g. price or volume).
+
+        Returns
+        -------
+            An analytics data entry (i.e. a dictionary) without a time series.
+        """
+
+        latest_analytics_value = self._calculate_latest_analytics(
+            symbol,
+            latest_fundamental,
+            self._store.read(self.fundamental_id, symbol).values,
+        )
+
+        return self.__package_latest_entry(symbol, latest_analytics_value)
+
+    def __package_latest_entry(self, symbol, latest_analytics_value):
+        """
+        Constructs an analytics data dictionary entry for the latest tick given
+        the latest analytics value.
+
+        Parameters
+        ----------
+        symbol: str
+            The asset symbol.
+        latest_analytics_value: double
+            The latest analytics value.
+
+        Returns
+        -------
+            An analytics data entry (i.e. a dictionary) without a time series.
+        """
+
+        is_missing = (
+            latest_analytics_value is None
+            or latest_analytics_value != latest_analytics_value
+        )
+
+        z_score_state = self._z_score_states[symbol]
+        z_score = z_score_state.z_score(
+            z_score_state.last_value if is_missing else latest_analytics_value
+        )
+
+        return {
+            "time_series": None,
+            f"last_{self.id}": latest_analytics_value,
+            "last_z_score": z_score,
+        }
+
     def __build_entry(self, symbol, entry):
         """
         Constructs an analytics data dictionary entry given a
@@ -106,22 +541,48 @@ class AnalyticsCalculator:
             An analytics data entry (i.e. a dictionary).
         """
 
-        self._logger.log(
-            f"Building entry for {self.id} data for the asset symbol {symbol}."
+        self._logger.debug(
+            "Building entry for {} data for the asset symbol {}.", self.id, symbol
         )
 
-        fundamentals = [entry[1] for entry in entry["time_series"]]
-        time_datapoints = [entry[0] for entry in entry["time_series"]]
-        analytics = self._calculate_analytics(
-            [*fundamentals[:-1], entry[f"last_{self.fundamental_id}"]]
+        # The stored fundamentals already end with the entry's last fundamental.
+        fundamentals = self._clean_values(self.fundamental_id, symbol)
+        analytics = self._calculate_analytics(symbol, fundamentals)
+        self.__primed_panels[(symbol,)] = (
+            fundamentals[np.newaxis, :],
+            analytics[-1:],
         )
 
-        filtered_analytics = list(filter(None, analytics))
+        return self.__package_entry(symbol, analytics)
+
+    def __package_entry(self, symbol, analytics):
+        """
+        Constructs an analytics data dictionary entry given the analytics
+        calculated for a symbol.
+
+        Parameters
+        ----------
+        symbol: str
+            The asset symbol.
+        analytics: np.ndarray
+            The calculated analytics, where missing values are NaN.
+
+        Returns
+        -------
+            An analytics data entry (i.e. a dictionary).
+        """
+
+        fundamentals_time_series = self._store.read(self.fundamental_id, symbol)
+
+        filtered_analytics = self._drop_missing(analytics)
         last_analytics_value = filtered_analytics[-1]
-        z_score = stats.zscore(filtered_analytics)[-1]
+        z_score = self._track_z_score(symbol, filtered_analytics)
 
-        analytics_time_series = list(
-            zip(time_datapoints[-len(filtered_analytics) :], filtered_analytics)
+        analytics_time_series = self._store.write(
+            self.id,
+            symbol,
+            fundamentals_time_series.times[-len(filtered_analytics) :],
+            filtered_analytics,
         )
 
         return {
@@ -130,41 +591,270 @@ class AnalyticsCalculator:
             "last_z_score": z_score,
         }
 
-    def _calculate_analytics(self, fundamentals):
+    def _recalculated_symbols(self, symbols, changed_symbols):
+        """
+        Returns the symbols whose latest analytics have to be recalculated, which
+        are only the changed symbols if the latest analytics of the other symbols
+        were calculated since the analytics were last calculated (or rolled over).
+
+        Parameters
+        ----------
+        symbols : str[]
+            The asset symbols.
+        changed_symbols : set
+            The symbols whose data changed since the previous tick, or `None` if
+            every symbol has to be recalculated.
+
+        Returns
+        -------
+            The list of symbols to recalculate, in the order of the given symbols.
+        """
+
+        if (
+            changed_symbols is None
+            or self.latest_analytics_data is None
+            or self.__latest_analytics_source is not self.analytics_data
+        ):
+            return symbols
+
+        return [
+            symbol
+            for symbol in symbols
+            if symbol in changed_symbols or symbol not in self.latest_analytics_data
+        ]
+
+    def _merge_latest_entries(self, symbols, latest_entries):
+        """
+        Constructs the latest analytics data from the given recalculated entries
+        and, for the other symbols, the previous latest entries.
+
+        Parameters
+        ----------
+        symbols : str[]
+            The asset symbols.
+        latest_entries : dict
+            The recalculated latest analytics data entries indexed by symbol names.
+
+        Returns
+        -------
+            A new latest analytics data dictionary indexed by symbol names.
+        """
+
+        self.__latest_analytics_source = self.analytics_data
+
+        return {
+            symbol: (
+                latest_entries[symbol]
+                if symbol in latest_entries
+                else self.latest_analytics_data[symbol]
+            )
+            for symbol in symbols
+        }
+
+    @staticmethod
+    def _drop_missing(values):
+        """
+        Drops missing (i.e. NaN or infinite) values from the given values.
+
+        Parameters
+        ----------
+        values : double[]
+            An array of values.
+
+        Returns
+        -------
+            A float64 array of the values which aren't missing.
+        """
+
+        values = np.asarray(values, dtype=np.float64)
+
+        return values[np.isfinite(values)]
+
+    def _get_intermediate(self, key, compute):
+        """
+        Returns the intermediate value of the current tick with the given key from
+        the shared intermediate cache, computing it only if no calculator has yet.
+
+        Parameters
+        ----------
+        key : tuple
+            The key of the value, e.g. `("clean", "price", "BTC")`.
+        compute : func
+            Function without parameters which computes the value.
+
+        Returns
+        -------
+            The intermediate value, which must not be modified.
+        """
+
+        if self.intermediate_cache is None:
+            return compute()
+
+        return self.intermediate_cache.get_or_compute(key, compute)
+
+    def _clean_values(self, series_id, symbol):
+        """
+        Returns the stored values of the given time series without its missing
+        values, which are shared by every calculator during the current tick.
+
+        Parameters
+        ----------
+        series_id : str
+            The ID of the series, e.g. "price" or "return".
+        symbol : str
+            The asset symbol.
+
+        Returns
+        -------
+            A float64 array of the values which aren't missing.
+        """
+
+        return self._get_intermediate(
+            ("clean", series_id, symbol),
+            lambda: self._drop_missing(self._store.read(series_id, symbol).values),
+        )
+
+    def _track_z_score(self, symbol, values):
+        """
+        Builds the running z-score state of the given (non-missing) values,
+        which is used to calculate the z-score of the latest tick in constant time.
+
+        Parameters
+        ----------
+        symbol: str
+            The asset symbol.
+        values : np.ndarray
+            The array of analytics values.
+
+        Returns
+        -------
+            The z-score of the last of the given values.
+        """
+
+        z_score_state = ZScoreState(values)
+        self._z_score_states[symbol] = z_score_state
+
+        return z_score_state.z_score(z_score_state.last_value)
+
+    def _calculate_analytics(self, symbol, fundamentals):
         """
         Calculate the analytics using the given fundamentals.
 
         Parameters
         ----------
-        fundamentals : double[]
-            An array of fundamentals - a.g. fundamentals or volumes.
+        symbol : str
+            The asset symbol.
+        fundamentals : np.ndarray
+            An array of fundamentals - a.g. fundamentals or volumes, without
+            missing fundamentals.
 
         Returns
         -------
             An array of the calculated analytics.
         """
 
+        fundamentals_panel = fundamentals[np.newaxis, :]
+
+        return self._calculate_panel_analytics([symbol], fundamentals_panel)[0]
+
+    def _calculate_panel_analytics(self, symbols, fundamentals):
+        """
+        Calculate the analytics of all symbols at once using the given panel of fundamentals.
+
+        Parameters
+        ----------
+        symbols : str[]
+            The asset symbols, in the order of the panel's rows.
+        fundamentals : np.ndarray
+            A 2-D (symbols x time) array of fundamentals, where each row holds the
+            non-missing fundamentals of a symbol aligned to the right and padded
+            with NaN on the left.
+
+        Returns
+        -------
+            A 2-D (symbols x time) array of the calculated analytics, where missing
+            analytics are NaN.
+        """
+
         raise NotImplementedError(
             "analytics_generator is a base class and this method should be implemented in its child classes."
         )
 
-    def _calculate_latest_analytics(self, latest_fundamental, fundamentals, analytics):
+    def _calculate_latest_analytics(self, symbol, latest_fundamental, fundamentals):
         """
         Calculate the analytics using the given fundamentals but only for the latest tick.
 
         Parameters
         ----------
+        symbol : str
+            The asset symbol.
         latest_fundamental : double
             The latest tick price.
-        fundamentals : double[]
+        fundamentals : np.ndarray
             An array of fundamentals.
-        analytics : double[
-            An array of analytics values.
 
         Returns
         -------
-            An array of the calculated analytics.
+            The latest analytics value.
         """
         raise NotImplementedError(
             "analytics_generator is a base class and this method should be implemented in its child classes."
         )
+
+    def _calculate_latest_panel_analytics(
+        self, symbols, latest_fundamentals, fundamentals
+    ):
+        """
+        Calculate the analytics of all symbols at once using the given panel of
+        fundamentals but only for the latest tick.
+
+        Parameters
+        ----------
+        symbols : str[]
+            The asset symbols, in the order of the panel's rows.
+        latest_fundamentals : np.ndarray
+            The array of latest tick fundamentals, one per symbol.
+        fundamentals : np.ndarray
+            A 2-D (symbols x time) array of fundamentals aligned to the right.
+
+        Returns
+        -------
+            The array of latest analytics values, one per symbol.
+        """
+        raise NotImplementedError(
+            "analytics_generator is a base class and this method should be implemented in its child classes."
+        )
+
+    def _roll_over_panel_analytics(
+        self, symbols, closed_fundamentals, latest_fundamentals
+    ):
+        """
+        Advances the rolling kernels of the given symbols by the fundamentals of
+        the bar which has closed and calculates the analytics of the closed bar and
+        of the new bar, where the kernels are the ones primed right before the
+        closed bar's fundamentals.
+
+        By default the panel's kernel is a single rolling kernel whose outputs are
+        the analytics, and child classes whose analytics aren't override this.
+
+        Parameters
+        ----------
+        symbols : str[]
+            The asset symbols, in the order of the panel's rows.
+        closed_fundamentals : np.ndarray
+            The array of the closed bar's fundamentals, one per symbol.
+        latest_fundamentals : np.ndarray
+            The array of the new bar's fundamentals, one per symbol.
+
+        Returns
+        -------
+            The arrays of the analytics values of the closed bar and of the new
+            bar, one per symbol, or `None` if the analytics can't be rolled over.
+        """
+
+        kernel = self._kernels.get(tuple(symbols))
+
+        if not isinstance(kernel, RollingKernel):
+            return None
+
+        return kernel.push(closed_fundamentals), kernel.peek(latest_fundamentals)
@@ -1,53 +1,306 @@
-import pandas as pd
+import numpy as np
 
-from .correlation_calculator import CorrelationCalculator
+from core.time_series_store import TimeSeriesStore
 
+from .analytics_calculator import AnalyticsCalculator
+from .co_moment_state import CoMomentState
 
-class AutocorrelationCalculator(CorrelationCalculator):
+
+class AutocorrelationCalculator(AnalyticsCalculator):
     """
     Represents an class that calculates correlation of return of symbols
-    with its own lagged returns
+    with its own lagged returns, for every lag up to a maximum lag.
+
+    The co-moment sums of every lag are calculated for all symbols at once with
+    FFT-based cross-correlations of the return panel, and then kept so the
+    autocorrelations of the latest tick are calculated without revisiting the
+    history.
+
+    ...
+
+    Instance Attributes
+    -------------------
+    max_lag : int
+        The largest lag the autocorrelation function is calculated for.
+    __return_calculator : ReturnCalculator
+        The return calculator.
+    __window : int
+        The number of most recent returns the autocorrelations are calculated
+        over, or `None` to use every return.
+    __symbols : str[]
+        The asset symbols, in the order of the return panel's rows.
+    __co_moment_state : CoMomentState
+        The (symbols x lags) co-moment sums of every pair of lagged returns but
+        the pairs ending with the last returns.
+    __lagged_returns : np.ndarray
+        The (symbols x lags) returns paired with the last returns at each lag.
+    __returns : np.ndarray
+        The panel of returns the autocorrelations were last calculated from.
     """
 
-    def __init__(self, return_calculator):
+    def __init__(self, return_calculator, max_lag=30, window=None):
         """
         Initialises a new instance of this class.
 
         Parameters
         ----------
-        id : str
-            The ID of this correlation calculator.
         return_calculator : ReturnCalculator
             Returns calculator.
-        get_other_symbol : str
-            The other crypto symbol whose returns should be used
-            in the correlation calculations.
+        max_lag : int
+            The largest lag the autocorrelation function is calculated for.
+        window : int
+            The number of most recent returns the autocorrelations are
+            calculated over, or `None` to use every return.
+        """
+        super().__init__(
+            "autocorrelation", "price", dependencies=["price", return_calculator.id]
+        )
+
+        if max_lag < 1:
+            raise Exception("The autocorrelation needs a maximum lag of at least 1.")
+
+        self.max_lag = max_lag
+        self.__return_calculator = return_calculator
+        self.__window = window
+        self.__symbols = []
+        self.__co_moment_state = None
+        self.__lagged_returns = None
+        self.__returns = None
+
+    def calculate(self, fundamental_data):
+        """
+        Calculates the analytics data for the given price data.
+
+        Parameters
+        ----------
+        fundamental_data : dict
+            Price data dictionary.
+
+        Returns
+        -------
+            Analytics data dictionary indexed by symbol names.
+        """
+
+        self._logger.log("Calculating {} data for all symbols.", self.id)
+
+        return_id = self.__return_calculator.id
+        return_data = self.__return_calculator.analytics_data
+
+        if return_data is None:
+            raise Exception(
+                "The return calculator hasn't executed it's `calculate` method - there are no available return values to calculate correlation values for."
+            )
+
+        symbols = list(fundamental_data)
+        returns = self._store.panel(return_id, symbols)
+
+        if self.__window is not None:
+            returns = returns[:, max(returns.shape[1] - self.__window, 0) :]
+
+        self.__symbols = symbols
+        self.__returns = returns
+        self.__calculate_co_moment_state(returns)
+
+        return self.__build_autocorrelation_data(fundamental_data, returns)
+
+    def roll_over(self, fundamental_data):
+        """
+        Calculates the analytics data for the given price data of the next day, by
+        appending the pairs of lagged returns ending with the returns of the bar
+        which has closed to the co-moment state. The analytics are recalculated
+        over every return if the returns changed by more than the closed and new
+        bars' returns, or if they are calculated over a rolling window.
+
+        Parameters
+        ----------
+        fundamental_data : dict
+            Price data dictionary.
+
+        Returns
+        -------
+            Analytics data dictionary indexed by symbol names.
+        """
+
+        symbols = list(fundamental_data)
+
+        if (
+            self.__returns is None
+            or self.__window is not None
+            or symbols != self.__symbols
+        ):
+            return self.calculate(fundamental_data)
+
+        returns = self._store.panel(self.__return_calculator.id, symbols)
+
+        if not TimeSeriesStore.is_rolled_over(self.__returns, returns):
+            return self.calculate(fundamental_data)
+
+        self._logger.log("Rolling {} data over for all symbols.", self.id)
+
+        # The closed bar's returns become the returns at lag 1 of the new bar.
+        closed_returns = returns[:, -2:-1]
+        self.__co_moment_state.append(self.__lagged_returns, closed_returns)
+        self.__lagged_returns = np.concatenate(
+            [closed_returns, self.__lagged_returns[:, :-1]], axis=1
+        )
+        self.__returns = returns
+
+        return self.__build_autocorrelation_data(fundamental_data, returns)
+
+    def __build_autocorrelation_data(self, fundamental_data, returns):
         """
-        super().__init__("autocorrelation", lambda symbol: symbol, return_calculator)
+        Constructs the analytics data of every symbol from the co-moment state and
+        the last returns.
+
+        Parameters
+        ----------
+        fundamental_data : dict
+            Price data dictionary.
+        returns : np.ndarray
+            A 2-D (symbols x time) array of returns aligned to the right.
 
-    def _calculate_correlation(self, returns, other_returns):
+        Returns
+        -------
+            Analytics data dictionary indexed by symbol names.
         """
-        Calculate the correlation between the two given return series.
+
+        return_id = self.__return_calculator.id
+        autocorrelations = self.__co_moment_state.correlation(
+            self.__lagged_returns, returns[:, -1:]
+        )
+
+        self.fundamental_data = fundamental_data
+        self.analytics_data = {
+            symbol: {
+                "time_series": self._store.write(
+                    self.id,
+                    symbol,
+                    self._store.read(return_id, symbol).times[-1:],
+                    autocorrelations[row, :1],
+                ),
+                f"last_{self.id}": autocorrelations[row, 0],
+                f"{self.id}_function": autocorrelations[row],
+                "last_z_score": 0,
+            }
+            for row, symbol in enumerate(self.__symbols)
+        }
+
+        return self.analytics_data
+
+    def calculate_latest(self, _, changed_symbols=None):
+        """
+        Calculates the analytics only for the most recent tick.
 
         Parameters
         ----------
-        returns : double[]
-            The returns series
-        other_returns : double[]
-            The other returns series
+        _ : dict
+            The latest tick fundamentals (e.g. price or volume) dictionary indexed by symbol.
+        changed_symbols : set
+            The symbols whose data changed since the previous tick, which are the
+            only ones recalculated while the latest analytics of the other symbols
+            are reused, or `None` to recalculate every symbol.
 
         Returns
         -------
-            The correlation between the two given return series.
+            Analytics data dictionary indexed by symbol names.
+        """
+
+        last_return_key = f"last_{self.__return_calculator.id}"
+        latest_return_data = self.__return_calculator.latest_analytics_data
+
+        if self.analytics_data is None or latest_return_data is None:
+            raise Exception(
+                f"Both caches for return_data and latest_return_data data are null - run `calculate` and `calculate_latest` in the return_calculator to initialise them."
+            )
+
+        recalculated_symbols = set(
+            self._recalculated_symbols(self.__symbols, changed_symbols)
+        )
+        rows = [
+            row
+            for row, symbol in enumerate(self.__symbols)
+            if symbol in recalculated_symbols
+        ]
+
+        latest_returns = np.array(
+            [latest_return_data[self.__symbols[row]][last_return_key] for row in rows],
+            dtype=np.float64,
+        )
+
+        latest_autocorrelations = self.__co_moment_state.select(
+            rows, np.arange(self.max_lag)
+        ).correlation(self.__lagged_returns[rows], latest_returns[:, np.newaxis])
+
+        self.latest_analytics_data = self._merge_latest_entries(
+            self.__symbols,
+            {
+                self.__symbols[row]: {
+                    "time_series": None,
+                    f"last_{self.id}": latest_autocorrelations[index, 0],
+                    f"{self.id}_function": latest_autocorrelations[index],
+                    "last_z_score": 0,
+                }
+                for index, row in enumerate(rows)
+            },
+        )
+
+        return self.latest_analytics_data
+
+    def __calculate_co_moment_state(self, returns):
         """
+        Calculates the co-moment sums of the pairs of lagged returns of every lag
+        for all symbols at once, using FFT-based cross-correlations which take
+        O(n log n) time per symbol whatever the maximum lag.
 
-        crypto_returns_df = pd.DataFrame(
-            {"returns": returns, "other_returns": other_returns}
+        Parameters
+        ----------
+        returns : np.ndarray
+            A 2-D (symbols x time) array of returns aligned to the right, where
+            missing returns are NaN.
+        """
+
+        num_returns = returns.shape[1]
+        lags = np.arange(1, self.max_lag + 1)
+
+        is_valid = np.isfinite(returns)
+        weights = is_valid.astype(np.float64)
+        row_means = np.where(is_valid, returns, 0.0).sum(axis=1) / np.maximum(
+            is_valid.sum(axis=1), 1
+        )
+        centred_returns = np.where(is_valid, returns - row_means[:, np.newaxis], 0.0)
+
+        # Padding to at least `num_returns + max_lag` stops the circular
+        # cross-correlations from wrapping around for every lag.
+        fft_size = 1 << int(np.ceil(np.log2(max(num_returns + self.max_lag, 2))))
+        weights_fft, returns_fft, squared_returns_fft = np.fft.rfft(
+            [weights, centred_returns, np.square(centred_returns)], n=fft_size, axis=2
         )
 
-        crypto_returns_df["returns"] = crypto_returns_df["returns"].shift(1)
-        crypto_returns_df = crypto_returns_df.dropna()
+        # The cross-correlation of `a` and `b` at lag k is Σ a[t] * b[t + k], where
+        # the lagged returns play the part of `a` and the returns that of `b`.
+        cross_correlations = np.fft.irfft(
+            [
+                np.conj(weights_fft) * weights_fft,
+                np.conj(returns_fft) * weights_fft,
+                np.conj(weights_fft) * returns_fft,
+                np.conj(squared_returns_fft) * weights_fft,
+                np.conj(weights_fft) * squared_returns_fft,
+                np.conj(returns_fft) * returns_fft,
+            ],
+            n=fft_size,
+            axis=2,
+        )[:, :, lags]
 
-        correlation_df = crypto_returns_df.corr()
+        num_observations, *sums = cross_correlations
+        shifts = row_means[:, np.newaxis]
+
+        self.__co_moment_state = CoMomentState.from_sums(
+            (np.rint(num_observations), *sums), shifts, shifts
+        )
+
+        lagged_columns = num_returns - 1 - lags
+        self.__lagged_returns = np.where(
+            lagged_columns >= 0, returns[:, np.maximum(lagged_columns, 0)], np.nan
+        )
 
-        return correlation_df["returns"]["other_returns"]
+        self.__co_moment_state.remove(self.__lagged_returns, returns[:, -1:])
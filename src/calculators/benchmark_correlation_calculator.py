@@ -0,0 +1,180 @@
+from .analytics_calculator import AnalyticsCalculator
+
+
+class BenchmarkCorrelationCalculator(AnalyticsCalculator):
+    """
+    Represents an abstract class that calculates the correlation of returns of
+    symbols with a benchmark symbol's returns, by reading the benchmark's column
+    of the return correlation matrix.
+    """
+
+    def __init__(self, id, benchmark_symbol, correlation_matrix_calculator):
+        """
+        Initialises a new instance of this class.
+
+        Parameters
+        ----------
+        id : str
+            The ID of this correlation calculator.
+        benchmark_symbol : str
+            The symbol whose returns the returns of all symbols are correlated with.
+        correlation_matrix_calculator : CorrelationMatrixCalculator
+            The return correlation matrix calculator.
+        """
+        super().__init__(
+            id,
+            "price",
+            dependencies=["price", *correlation_matrix_calculator.dependencies],
+        )
+        self.__benchmark_symbol = benchmark_symbol
+        self.__correlation_matrix_calculator = correlation_matrix_calculator
+
+    def calculate(self, fundamental_data):
+        """
+        Calculates the analytics data for the given price data.
+
+        Parameters
+        ----------
+        fundamental_data : dict
+            Price data dictionary.
+
+        Returns
+        -------
+            Analytics data dictionary indexed by symbol names.
+        """
+
+        self._logger.log("Calculating {} data for all symbols.", self.id)
+
+        self.__correlation_matrix_calculator.calculate()
+
+        return self.__build_correlation_data(fundamental_data)
+
+    def roll_over(self, fundamental_data):
+        """
+        Calculates the analytics data for the given price data of the next day,
+        once the correlation matrix has been rolled over.
+
+        Parameters
+        ----------
+        fundamental_data : dict
+            Price data dictionary.
+
+        Returns
+        -------
+            Analytics data dictionary indexed by symbol names.
+        """
+
+        self._logger.log("Rolling {} data over for all symbols.", self.id)
+
+        self.__correlation_matrix_calculator.roll_over()
+
+        return self.__build_correlation_data(fundamental_data)
+
+    def __build_correlation_data(self, fundamental_data):
+        """
+        Constructs the analytics data of every symbol from the benchmark's column
+        of the correlation matrix.
+
+        Parameters
+        ----------
+        fundamental_data : dict
+            Price data dictionary.
+
+        Returns
+        -------
+            Analytics data dictionary indexed by symbol names.
+        """
+
+        matrix_calculator = self.__correlation_matrix_calculator
+        correlations = matrix_calculator.correlations(self.__benchmark_symbol)
+
+        self.fundamental_data = fundamental_data
+        self.analytics_data = {
+            symbol: self.__build_correlation_entry(
+                symbol, correlations[matrix_calculator.index(symbol)]
+            )
+            for symbol in fundamental_data
+        }
+
+        return self.analytics_data
+
+    def calculate_latest(self, _, changed_symbols=None):
+        """
+        Calculates the analytics only for the most recent tick.
+
+        Parameters
+        ----------
+        _ : dict
+            The latest tick fundamentals (e.g. price or volume) dictionary indexed by symbol.
+        changed_symbols : set
+            The symbols whose data changed since the previous tick, which are the
+            only ones recalculated unless the benchmark symbol is one of them, or
+            `None` to recalculate every symbol.
+
+        Returns
+        -------
+            Analytics data dictionary indexed by symbol names.
+        """
+
+        if self.fundamental_data is None or self.analytics_data is None:
+            raise Exception(
+                f"Both caches for {self.fundamental_id} and analytics data are null - run `calculate` to initialise them."
+            )
+
+        matrix_calculator = self.__correlation_matrix_calculator
+        matrix_calculator.calculate_latest(changed_symbols)
+        correlations = matrix_calculator.correlations(
+            self.__benchmark_symbol, latest=True
+        )
+
+        # Every correlation is with the benchmark's returns, so they all change
+        # with them.
+        if changed_symbols is not None and self.__benchmark_symbol in changed_symbols:
+            changed_symbols = None
+
+        symbols = list(self.analytics_data.keys())
+
+        self.latest_analytics_data = self._merge_latest_entries(
+            symbols,
+            {
+                symbol: {
+                    "time_series": None,
+                    f"last_{self.id}": correlations[matrix_calculator.index(symbol)],
+                    "last_z_score": 0,
+                }
+                for symbol in self._recalculated_symbols(symbols, changed_symbols)
+            },
+        )
+
+        return self.latest_analytics_data
+
+    def __build_correlation_entry(self, symbol, correlation):
+        """
+        Constructs an analytics data dictionary entry given the correlation of
+        the symbol's returns with the benchmark's returns.
+
+        Parameters
+        ----------
+        symbol: str
+            The asset symbol.
+        correlation: double
+            The correlation of the symbol's returns with the benchmark's returns.
+
+        Returns
+        -------
+            An analytics data entry (i.e. a dictionary).
+        """
+
+        self._logger.debug(
+            "Building entry for {} data for the asset symbol {}.", self.id, symbol
+        )
+
+        return_times = self._store.read("return", symbol).times
+
+        return {
+            "time_series": self._store.write(
+                self.id, symbol, return_times[-1:], [correlation]
+            ),
+            f"last_{self.id}": correlation,
+            "last_z_score": 0,
+        }
@@ -1,19 +1,19 @@
-from .correlation_calculator import CorrelationCalculator
+from .benchmark_correlation_calculator import BenchmarkCorrelationCalculator
 
 
-class BtcCorrelationCalculator(CorrelationCalculator):
+class BtcCorrelationCalculator(BenchmarkCorrelationCalculator):
     """
     Represents an class that calculates correlation of return of symbols
     with Bitcoin's returns.
     """
 
-    def __init__(self, return_calculator):
+    def __init__(self, correlation_matrix_calculator):
         """
         Initialises a new instance of this class.
 
         Parameters
         ----------
-        return_calculator : ReturnCalculator
-            The returns calculator.
+        correlation_matrix_calculator : CorrelationMatrixCalculator
+            The return correlation matrix calculator.
         """
-        super().__init__("btc_correlation", lambda symbol: "BTC", return_calculator)
+        super().__init__("btc_correlation", "BTC", correlation_matrix_calculator)
@@ -0,0 +1,315 @@
+from collections import deque
+
+import numpy as np
+
+
+class CoMomentState:
+    """
+    Represents the running co-moment sums (i.e. n, Σx, Σy, Σx², Σy² and Σxy) of a
+    series of (x, y) pairs, which is enough to calculate the correlation of the
+    pairs in constant time whenever a pair is appended and, in a rolling window,
+    the oldest pair is removed.
+
+    The sums are element-wise, so one state can hold the sums of every pair of
+    symbols of a correlation matrix. Values are shifted by a constant (e.g. their
+    mean) before being summed, which keeps the sums small and avoids catastrophic
+    cancellation.
+
+    ...
+
+    Instance Attributes
+    -------------------
+    window : int
+        The maximum number of pairs in the state, or `None` for an expanding window.
+    __shift_x : double
+        The constant subtracted from every x value.
+    __shift_y : double
+        The constant subtracted from every y value.
+    __sums : tuple
+        The number of pairs, Σx, Σy, Σx², Σy² and Σxy of the shifted pairs.
+    __pairs : deque
+        The pairs in the rolling window, oldest first, which are only kept when
+        there is a window.
+    """
+
+    def __init__(self, shift_x=0.0, shift_y=0.0, window=None):
+        """
+        Initialises a new instance of this class, without any pairs.
+
+        Parameters
+        ----------
+        shift_x : double
+            The constant subtracted from every x value.
+        shift_y : double
+            The constant subtracted from every y value.
+        window : int
+            The maximum number of pairs in the state, or `None` for an expanding window.
+        """
+
+        self.window = window
+        self.__shift_x = shift_x
+        self.__shift_y = shift_y
+        self.__sums = (0, 0.0, 0.0, 0.0, 0.0, 0.0)
+        self.__pairs = deque()
+
+    @staticmethod
+    def from_panel(values, window=None):
+        """
+        Builds the state of every pair of rows of the given panel in one
+        vectorised pass, where each pair of rows only uses the columns in which
+        both of them have a value (like `pandas.DataFrame.corr`).
+
+        Parameters
+        ----------
+        values : np.ndarray
+            A 2-D (symbols x time) array of values aligned to the right, where
+            missing values are NaN.
+        window : int
+            The maximum number of columns in the state, or `None` for an expanding window.
+
+        Returns
+        -------
+            The (symbols x symbols) state of the last `window` columns (or of all columns).
+        """
+
+        if window is not None:
+            values = values[:, max(values.shape[1] - window, 0) :]
+
+        is_valid = np.isfinite(values)
+        weights = is_valid.astype(np.float64)
+
+        row_means = np.where(is_valid, values, 0.0).sum(axis=1) / np.maximum(
+            is_valid.sum(axis=1), 1
+        )
+        centred_values = np.where(is_valid, values - row_means[:, np.newaxis], 0.0)
+
+        state = CoMomentState(
+            row_means[:, np.newaxis], row_means[np.newaxis, :], window
+        )
+
+        sums_x = centred_values @ weights.T
+        sums_xx = np.square(centred_values) @ weights.T
+
+        state.__sums = (
+            weights @ weights.T,
+            sums_x,
+            sums_x.T,
+            sums_xx,
+            sums_xx.T,
+            centred_values @ centred_values.T,
+        )
+
+        if window is not None:
+            state.__pairs.extend(
+                (column[:, np.newaxis], column[np.newaxis, :]) for column in values.T
+            )
+
+        return state
+
+    @staticmethod
+    def from_sums(sums, shift_x=0.0, shift_y=0.0):
+        """
+        Builds the state of pairs whose co-moment sums have already been
+        calculated, e.g. for many lags at once.
+
+        Parameters
+        ----------
+        sums : tuple
+            The number of pairs, Σx, Σy, Σx², Σy² and Σxy of the shifted pairs.
+        shift_x : double
+            The constant subtracted from every x value before it was summed.
+        shift_y : double
+            The constant subtracted from every y value before it was summed.
+
+        Returns
+        -------
+            The state of the pairs, with an expanding window.
+        """
+
+        state = CoMomentState(shift_x, shift_y)
+        state.__sums = tuple(sums)
+
+        return state
+
+    def select(self, rows, columns):
+        """
+        Returns the state of the pairs of the given rows and columns of a panel
+        state, e.g. to recalculate the correlations of a few symbols only.
+
+        Parameters
+        ----------
+        rows : int[]
+            The indices of the rows.
+        columns : int[]
+            The indices of the columns.
+
+        Returns
+        -------
+            A new (rows x columns) panel state.
+        """
+
+        shape = np.broadcast(*self.__sums).shape
+        block = np.ix_(rows, columns)
+
+        state = CoMomentState(
+            self.__select_block(self.__shift_x, shape, block),
+            self.__select_block(self.__shift_y, shape, block),
+            self.window,
+        )
+        state.__sums = tuple(
+            self.__select_block(total, shape, block) for total in self.__sums
+        )
+        state.__pairs = deque(
+            (
+                self.__select_block(x, shape, block),
+                self.__select_block(y, shape, block),
+            )
+            for x, y in self.__pairs
+        )
+
+        return state
+
+    def append(self, x, y):
+        """
+        Appends the given pair to the state and, if the rolling window is full,
+        removes the oldest pair from it.
+
+        Parameters
+        ----------
+        x : double
+            The x value, or a column of x values for a panel state.
+        y : double
+            The y value, or a row of y values for a panel state.
+        """
+
+        self.__sums = self.__add(self.__sums, self.__pair_sums(x, y))
+
+        if self.window is None:
+            return
+
+        self.__pairs.append((x, y))
+
+        if len(self.__pairs) > self.window:
+            self.__sums = self.__add(
+                self.__sums, self.__pair_sums(*self.__pairs.popleft()), sign=-1
+            )
+
+    def remove(self, x, y):
+        """
+        Removes the given pair, which must have been summed before, from the state.
+
+        Parameters
+        ----------
+        x : double
+            The x value, or a column of x values for a panel state.
+        y : double
+            The y value, or a row of y values for a panel state.
+        """
+
+        self.__sums = self.__add(self.__sums, self.__pair_sums(x, y), sign=-1)
+
+    def correlation(self, x, y):
+        """
+        Calculates the correlation of the pairs in the state were the given pair
+        appended to it, without modifying the state.
+
+        Parameters
+        ----------
+        x : double
+            The x value, or a column of x values for a panel state.
+        y : double
+            The y value, or a row of y values for a panel state.
+
+        Returns
+        -------
+            The correlation, where an undefined correlation is NaN.
+        """
+
+        sums = self.__add(self.__sums, self.__pair_sums(x, y))
+
+        if self.window is not None and len(self.__pairs) >= self.window > 0:
+            sums = self.__add(sums, self.__pair_sums(*self.__pairs[0]), sign=-1)
+
+        (
+            num_observations,
+            sums_x,
+            sums_y,
+            sums_xx,
+            sums_yy,
+            sums_xy,
+        ) = sums
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            covariance = sums_xy - sums_x * sums_y / num_observations
+            variance_x = sums_xx - np.square(sums_x) / num_observations
+            variance_y = sums_yy - np.square(sums_y) / num_observations
+            correlation = covariance / np.sqrt(variance_x * variance_y)
+
+        correlation = np.where(num_observations >= 2, correlation, np.nan)
+
+        return correlation if correlation.ndim > 0 else correlation.item()
+
+    def __pair_sums(self, x, y):
+        """
+        Calculates the contribution of the given pair to the co-moment sums,
+        which is zero if either value is missing.
+
+        Parameters
+        ----------
+        x : double
+            The x value, or a column of x values for a panel state.
+        y : double
+            The y value, or a row of y values for a panel state.
+
+        Returns
+        -------
+            The tuple of the pair's contribution to each co-moment sum.
+        """
+
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+
+        is_valid = np.isfinite(x) & np.isfinite(y)
+        shifted_x = np.where(is_valid, x - self.__shift_x, 0.0)
+        shifted_y = np.where(is_valid, y - self.__shift_y, 0.0)
+
+        return (
+            is_valid.astype(np.float64),
+            shifted_x,
+            shifted_y,
+            np.square(shifted_x),
+            np.square(shifted_y),
+            shifted_x * shifted_y,
+        )
+
+    @staticmethod
+    def __select_block(value, shape, block):
+        """
+        Selects a block of a panel state value, which is broadcast to the shape
+        of the panel first (e.g. a column of x values).
+        """
+
+        return np.broadcast_to(value, shape)[block]
+
+    @staticmethod
+    def __add(sums, other_sums, sign=1):
+        """
+        Adds (or subtracts) the given co-moment sums element-wise.
+
+        Parameters
+        ----------
+        sums : tuple
+            The co-moment sums.
+        other_sums : tuple
+            The co-moment sums to add.
+        sign : int
+            1 to add the other sums, or -1 to subtract them.
+
+        Returns
+        -------
+            The tuple of the resulting co-moment sums.
+        """
+
+        return tuple(
+            total + sign * other_total for total, other_total in zip(sums, other_sums)
+        )
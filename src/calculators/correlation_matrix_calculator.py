@@ -0,0 +1,384 @@
+from threading import Lock
+
+import numpy as np
+
+from core.time_series_store import TimeSeriesStore
+from utils.logger import Logger
+
+from .co_moment_state import CoMomentState
+
+
+class CorrelationMatrixCalculator:
+    """
+    Represents a class that calculates the correlation of returns between every
+    pair of symbols at once, i.e. the (symbols x symbols) correlation matrix.
+
+    The running co-moment sums of every pair of symbols are kept, so replacing
+    the last returns with the latest tick returns doesn't revisit the history.
+
+    ...
+
+    Instance Attributes
+    -------------------
+    _logger : Logger
+        The logger of this class.
+    _store : TimeSeriesStore
+        The store which the return time series are read from.
+    symbols : str[]
+        The asset symbols, in the order of the matrix's rows and columns.
+    matrix : np.ndarray
+        The correlation matrix of the returns calculated by the return calculator.
+    latest_matrix : np.ndarray
+        The correlation matrix of the returns where the last returns are replaced
+        with the latest tick returns.
+    dependencies : str[]
+        The IDs of the calculators whose analytics the matrix is calculated from.
+    __return_calculator : ReturnCalculator
+        The return calculator.
+    __symbol_indices : dict
+        The row (and column) of each symbol in the matrix, indexed by symbol names.
+    __window : int
+        The number of most recent returns the correlations are calculated over,
+        or `None` to use every return.
+    __co_moment_state : CoMomentState
+        The running co-moment sums of every pair of symbols' returns, except the
+        last returns.
+    __returns : np.ndarray
+        The panel of returns the matrix was last calculated from.
+    __return_data : dict
+        The return data the matrix was last calculated from.
+    __latest_return_data : dict
+        The latest tick return data the latest matrix was last calculated from.
+    __lock : Lock
+        The lock which stops the calculators sharing this matrix from calculating
+        it at the same time.
+    """
+
+    def __init__(self, return_calculator, window=None):
+        """
+        Initialises a new instance of this class.
+
+        Parameters
+        ----------
+        return_calculator : ReturnCalculator
+            The return calculator.
+        window : int
+            The number of most recent returns the correlations are calculated over,
+            or `None` to use every return.
+        """
+
+        self._logger = Logger.get_instance()
+        self._store = TimeSeriesStore.get_instance()
+        self.symbols = []
+        self.matrix = None
+        self.latest_matrix = None
+        self.dependencies = [return_calculator.id]
+        self.__return_calculator = return_calculator
+        self.__symbol_indices = {}
+        self.__window = window
+        self.__co_moment_state = None
+        self.__returns = None
+        self.__return_data = None
+        self.__latest_return_data = None
+        self.__lock = Lock()
+
+    def calculate(self):
+        """
+        Calculates the correlation matrix of the returns calculated by the return
+        calculator, unless it has already been calculated for those returns.
+
+        Returns
+        -------
+            The correlation matrix.
+        """
+
+        return_data = self.__return_calculator.analytics_data
+
+        if return_data is None:
+            raise Exception(
+                "The return calculator hasn't executed it's `calculate` method - there are no available return values to calculate correlation values for."
+            )
+
+        with self.__lock:
+            if return_data is self.__return_data:
+                return self.matrix
+
+            self._logger.log(
+                "Calculating the return correlation matrix for all symbols."
+            )
+
+            self.symbols = list(return_data.keys())
+            self.__symbol_indices = {
+                symbol: index for index, symbol in enumerate(self.symbols)
+            }
+
+            returns = self._store.panel(self.__return_calculator.id, self.symbols)
+            self.__co_moment_state = CoMomentState.from_panel(
+                returns[:, :-1], self.__window
+            )
+
+            self.matrix = self.__calculate_matrix(returns[:, -1])
+            self.latest_matrix = self.matrix
+            self.__returns = returns
+            self.__return_data = return_data
+            self.__latest_return_data = None
+
+        return self.matrix
+
+    def roll_over(self):
+        """
+        Calculates the correlation matrix of the returns calculated by the return
+        calculator on the next day, by appending the returns of the bar which has
+        closed to the co-moment state, unless it has already been calculated for
+        those returns. The matrix is recalculated over every return if the returns
+        changed by more than the closed and new bars' returns.
+
+        Returns
+        -------
+            The correlation matrix.
+        """
+
+        return_data = self.__return_calculator.analytics_data
+
+        if return_data is None:
+            raise Exception(
+                "The return calculator hasn't executed it's `calculate` method - there are no available return values to calculate correlation values for."
+            )
+
+        with self.__lock:
+            if return_data is self.__return_data:
+                return self.matrix
+
+            returns = self._store.panel(self.__return_calculator.id, self.symbols)
+
+            if (
+                self.__returns is not None
+                and list(return_data.keys()) == self.symbols
+                and TimeSeriesStore.is_rolled_over(self.__returns, returns)
+            ):
+                self._logger.log(
+                    "Rolling the return correlation matrix over for all symbols."
+                )
+
+                closed_returns = returns[:, -2]
+                self.__co_moment_state.append(
+                    closed_returns[:, np.newaxis], closed_returns[np.newaxis, :]
+                )
+
+                self.matrix = self.__calculate_matrix(returns[:, -1])
+                self.latest_matrix = self.matrix
+                self.__returns = returns
+                self.__return_data = return_data
+                self.__latest_return_data = None
+
+                return self.matrix
+
+        return self.calculate()
+
+    def calculate_latest(self, changed_symbols=None):
+        """
+        Calculates the correlation matrix of the returns where the last returns are
+        replaced with the latest tick returns, unless it has already been calculated
+        for those latest tick returns.
+
+        Parameters
+        ----------
+        changed_symbols : set
+            The symbols whose returns changed since the previous tick, whose rows
+            and columns are the only ones recalculated, or `None` to recalculate
+            the whole matrix.
+
+        Returns
+        -------
+            The latest correlation matrix.
+        """
+
+        latest_return_data = self.__return_calculator.latest_analytics_data
+
+        if self.matrix is None or latest_return_data is None:
+            raise Exception(
+                "Both the correlation matrix and the latest return data are null - run `calculate` and `calculate_latest` in the return calculator to initialise them."
+            )
+
+        with self.__lock:
+            if latest_return_data is self.__latest_return_data:
+                return self.latest_matrix
+
+            last_return_key = f"last_{self.__return_calculator.id}"
+            latest_returns = np.array(
+                [
+                    latest_return_data[symbol][last_return_key]
+                    for symbol in self.symbols
+                ],
+                dtype=np.float64,
+            )
+
+            # The latest matrix only holds the latest tick returns of the other
+            # symbols once it has been calculated since the last `calculate`.
+            if changed_symbols is None or self.__latest_return_data is None:
+                self.latest_matrix = self.__calculate_matrix(latest_returns)
+            else:
+                self.latest_matrix = self.__recalculate_matrix_rows(
+                    latest_returns,
+                    [
+                        index
+                        for index, symbol in enumerate(self.symbols)
+                        if symbol in changed_symbols
+                    ],
+                )
+
+            self.__latest_return_data = latest_return_data
+
+        return self.latest_matrix
+
+    def correlations(self, symbol, latest=False):
+        """
+        Returns the correlations of every symbol's returns with the given symbol's
+        returns, i.e. a view of the given symbol's column of the matrix.
+
+        Parameters
+        ----------
+        symbol : str
+            The asset symbol.
+        latest : bool
+            A flag which when set to `True` reads from the latest correlation matrix.
+
+        Returns
+        -------
+            The array of correlations, in the order of `symbols`.
+        """
+
+        matrix = self.latest_matrix if latest else self.matrix
+
+        return matrix[:, self.__symbol_indices[symbol]]
+
+    def index(self, symbol):
+        """
+        Returns the row (and column) of the given symbol in the matrix.
+
+        Parameters
+        ----------
+        symbol : str
+            The asset symbol.
+
+        Returns
+        -------
+            The index of the symbol.
+        """
+
+        return self.__symbol_indices[symbol]
+
+    def top_pairs(self, k=10, most_correlated=True, latest=True):
+        """
+        Returns the `k` pairs of distinct symbols whose returns are the most (or
+        least) correlated.
+
+        Parameters
+        ----------
+        k : int
+            The number of pairs.
+        most_correlated : bool
+            A flag which when set to `False` returns the least correlated pairs.
+        latest : bool
+            A flag which when set to `True` reads from the latest correlation matrix.
+
+        Returns
+        -------
+            A list of dictionaries with the two symbols and their correlation,
+            sorted from the most to the least extreme correlation.
+        """
+
+        matrix = self.latest_matrix if latest else self.matrix
+
+        if matrix is None:
+            return []
+
+        rows, columns = np.triu_indices(len(self.symbols), k=1)
+        correlations = matrix[rows, columns]
+
+        is_defined = np.isfinite(correlations)
+        rows, columns, correlations = (
+            rows[is_defined],
+            columns[is_defined],
+            correlations[is_defined],
+        )
+
+        ranking = -correlations if most_correlated else correlations
+        k = min(k, len(correlations))
+
+        if k <= 0:
+            return []
+
+        top_indices = np.argpartition(ranking, k - 1)[:k]
+        top_indices = top_indices[np.argsort(ranking[top_indices], kind="stable")]
+
+        return [
+            {
+                "symbol": self.symbols[rows[index]],
+                "other_symbol": self.symbols[columns[index]],
+                "correlation": correlations[index],
+            }
+            for index in top_indices
+        ]
+
+    def __recalculate_matrix_rows(self, last_returns, rows):
+        """
+        Calculates the latest correlation matrix from the previous one by only
+        recalculating the rows and columns of the given symbols, which costs one
+        update of the running sums of each of their pairs.
+
+        Parameters
+        ----------
+        last_returns : np.ndarray
+            The array of last returns, one per symbol, where missing returns are NaN.
+        rows : int[]
+            The rows (and columns) of the symbols whose last returns changed.
+
+        Returns
+        -------
+            The (symbols x symbols) correlation matrix, where undefined
+            correlations are NaN.
+        """
+
+        # The previous matrix may still be read, so it's copied rather than modified.
+        correlations = self.latest_matrix.copy()
+        columns = np.arange(len(self.symbols))
+
+        correlations[rows, :] = self.__co_moment_state.select(
+            rows, columns
+        ).correlation(last_returns[rows, np.newaxis], last_returns[np.newaxis, :])
+        correlations[:, rows] = self.__co_moment_state.select(
+            columns, rows
+        ).correlation(last_returns[:, np.newaxis], last_returns[np.newaxis, rows])
+
+        diagonal = correlations[rows, rows]
+        correlations[rows, rows] = np.where(np.isfinite(diagonal), 1.0, np.nan)
+
+        return correlations
+
+    def __calculate_matrix(self, last_returns):
+        """
+        Calculates the correlation matrix of the returns in the co-moment state
+        were the given returns appended to it, which only costs one update of the
+        running sums of every pair of symbols.
+
+        Parameters
+        ----------
+        last_returns : np.ndarray
+            The array of last returns, one per symbol, where missing returns are NaN.
+
+        Returns
+        -------
+            The (symbols x symbols) correlation matrix, where undefined
+            correlations are NaN.
+        """
+
+        correlations = self.__co_moment_state.correlation(
+            last_returns[:, np.newaxis], last_returns[np.newaxis, :]
+        )
+
+        np.fill_diagonal(
+            correlations, np.where(np.isfinite(np.diag(correlations)), 1.0, np.nan)
+        )
+
+        return correlations
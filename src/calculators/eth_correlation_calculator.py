@@ -1,19 +1,19 @@
-from .correlation_calculator import CorrelationCalculator
+from .benchmark_correlation_calculator import BenchmarkCorrelationCalculator
 
 
-class EthCorrelationCalculator(CorrelationCalculator):
+class EthCorrelationCalculator(BenchmarkCorrelationCalculator):
     """
     Represents an class that calculates correlation of return of symbols
     with Ethereum's returns.
     """
 
-    def __init__(self, return_calculator):
+    def __init__(self, correlation_matrix_calculator):
         """
         Initialises a new instance of this class.
 
         Parameters
         ----------
-        return_calculator : ReturnCalculator
-            The return calculator.
+        correlation_matrix_calculator : CorrelationMatrixCalculator
+            The return correlation matrix calculator.
         """
-        super().__init__("eth_correlation", lambda symbol: "ETH", return_calculator)
+        super().__init__("eth_correlation", "ETH", correlation_matrix_calculator)
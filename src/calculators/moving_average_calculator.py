@@ -0,0 +1,186 @@
+import numpy as np
+
+from .analytics_calculator import AnalyticsCalculator
+from .moving_average_family import MovingAverageFamily
+
+
+class MovingAverageCalculator(AnalyticsCalculator):
+    """
+    Represents a class that calculates a moving average of one kind and window,
+    by reading it from a moving average family which calculates every moving
+    average of the family at once.
+
+    ...
+
+    Instance Attributes
+    -------------------
+    __moving_average_family : MovingAverageFamily
+        The family the moving average belongs to.
+    __window : int
+        The window of the moving average.
+    __kind : str
+        The kind of the moving average.
+    """
+
+    def __init__(
+        self,
+        moving_average_family,
+        window,
+        kind=MovingAverageFamily.simple_kind,
+        is_in_total_z_score=True,
+    ):
+        """
+        Initialises a new instance of this class.
+
+        Parameters
+        ----------
+        moving_average_family : MovingAverageFamily
+            The family the moving average belongs to.
+        window : int
+            The window of the moving average.
+        kind : str
+            The kind of the moving average.
+        is_in_total_z_score : bool
+            A flag which when set to `False` leaves the z-score of the moving
+            average out of the total z-score of each symbol.
+        """
+
+        prefix = "" if kind == MovingAverageFamily.simple_kind else f"{kind}_"
+        super().__init__(
+            f"{prefix}moving_average_{window}d",
+            "price",
+            is_in_total_z_score=is_in_total_z_score,
+        )
+
+        if window not in moving_average_family.windows:
+            raise Exception(f"The moving average family has no {window} window.")
+
+        if kind not in moving_average_family.kinds:
+            raise Exception(f"The moving average family has no {kind} kind.")
+
+        self.__moving_average_family = moving_average_family
+        self.__window = window
+        self.__kind = kind
+
+    @staticmethod
+    def create_all(moving_average_family, excluded_ids=()):
+        """
+        Creates a calculator for every moving average of the given family, whose
+        z-scores are left out of the total z-score of each symbol since the moving
+        averages of one family are collinear.
+
+        Parameters
+        ----------
+        moving_average_family : MovingAverageFamily
+            The moving average family.
+        excluded_ids : str[]
+            The IDs of the moving averages to create no calculator for, e.g. the
+            ones already registered on their own.
+
+        Returns
+        -------
+            The list of moving average calculators.
+        """
+
+        calculators = [
+            MovingAverageCalculator(
+                moving_average_family, window, kind, is_in_total_z_score=False
+            )
+            for kind in moving_average_family.kinds
+            for window in moving_average_family.windows
+        ]
+
+        return [
+            calculator
+            for calculator in calculators
+            if calculator.id not in excluded_ids
+        ]
+
+    def _calculate_panel_analytics(self, symbols, fundamentals):
+        """
+        Calculate the analytics of all symbols at once using the given panel of fundamentals.
+
+        Parameters
+        ----------
+        symbols : str[]
+            The asset symbols, in the order of the panel's rows.
+        fundamentals : np.ndarray
+            A 2-D (symbols x time) array of fundamentals aligned to the right.
+
+        Returns
+        -------
+            A 2-D (symbols x time) array of the calculated analytics.
+        """
+
+        family = self.__moving_average_family
+
+        # Every calculator of the family shares one calculation per tick.
+        moving_averages, kernel = self._get_intermediate(
+            ("moving_averages", id(family), tuple(symbols)),
+            lambda: family.calculate(fundamentals),
+        )[(self.__kind, self.__window)]
+
+        self._kernels[tuple(symbols)] = kernel
+
+        return moving_averages
+
+    def _calculate_latest_analytics(self, symbol, latest_fundamental, fundamentals):
+        """
+        Calculate the analytics using the given fundamentals but only for the latest tick.
+
+        Parameters
+        ----------
+        symbol : str
+            The asset symbol.
+        latest_fundamental : double
+            The latest tick price.
+        fundamentals : np.ndarray
+            An array of fundamentals.
+
+        Returns
+        -------
+            The latest analytics value.
+        """
+
+        latest_price = (
+            fundamentals[-1] if latest_fundamental is None else latest_fundamental
+        )
+
+        new_moving_average = self._calculate_latest_panel_analytics(
+            [symbol],
+            np.array([latest_price], dtype=np.float64),
+            fundamentals[np.newaxis, :],
+        )[0]
+
+        return new_moving_average
+
+    def _calculate_latest_panel_analytics(
+        self, symbols, latest_fundamentals, fundamentals
+    ):
+        """
+        Calculate the analytics of all symbols at once using the given panel of
+        fundamentals but only for the latest tick.
+
+        Parameters
+        ----------
+        symbols : str[]
+            The asset symbols, in the order of the panel's rows.
+        latest_fundamentals : np.ndarray
+            The array of latest tick prices, one per symbol.
+        fundamentals : np.ndarray
+            A 2-D (symbols x time) array of fundamentals aligned to the right.
+
+        Returns
+        -------
+            The array of latest analytics values, one per symbol.
+        """
+
+        if (
+            self.__kind == MovingAverageFamily.simple_kind
+            and fundamentals.shape[1] < self.__window
+        ):
+            raise Exception(
+                "There are insufficient price data points to calculate a singular moving average value."
+            )
+
+        return self._kernels[tuple(symbols)].peek(latest_fundamentals)
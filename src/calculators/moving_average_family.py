@@ -0,0 +1,171 @@
+import numpy as np
+
+from .rolling_kernels import EwmKernel, RollingMeanKernel
+
+
+class MovingAverageFamily:
+    """
+    Represents a family of simple and exponential moving averages over several
+    windows, which are all calculated from one shared cumulative sum and one
+    shared pass of exponential smoothing over the prices.
+
+    ...
+
+    Class Attributes
+    ----------------
+    simple_kind : str
+        The kind of moving average which equally weights the prices in its window.
+    exponential_kind : str
+        The kind of moving average which exponentially weights every price with
+        a smoothing factor of 2 / (window + 1), i.e. like
+        `pandas.Series.ewm(span=window, adjust=False, min_periods=window).mean()`.
+
+    Instance Attributes
+    -------------------
+    windows : int[]
+        The windows of the moving averages, in ascending order.
+    kinds : str[]
+        The kinds of the moving averages.
+    """
+
+    simple_kind = "simple"
+    exponential_kind = "exponential"
+
+    def __init__(self, windows=(7, 14, 30, 50), kinds=(simple_kind, exponential_kind)):
+        """
+        Initialises a new instance of this class.
+
+        Parameters
+        ----------
+        windows : int[]
+            The windows of the moving averages, which default to the ones the
+            100 daily prices fetched from the LunarCrush API are enough for.
+        kinds : str[]
+            The kinds of the moving averages, i.e. `MovingAverageFamily.simple_kind`
+            and/or `MovingAverageFamily.exponential_kind`.
+        """
+
+        for kind in kinds:
+            if kind not in [
+                MovingAverageFamily.simple_kind,
+                MovingAverageFamily.exponential_kind,
+            ]:
+                raise Exception(f"Unknown moving average kind '{kind}'.")
+
+        if any(window < 1 for window in windows):
+            raise Exception("The moving average windows need to be at least 1.")
+
+        self.windows = sorted(set(windows))
+        self.kinds = list(kinds)
+
+    def calculate(self, prices):
+        """
+        Calculates every moving average of the family for the given prices.
+
+        Parameters
+        ----------
+        prices : np.ndarray
+            A 2-D (symbols x time) array of prices, where missing prices are NaN.
+
+        Returns
+        -------
+            A dictionary indexed by `(kind, window)` of the 2-D (symbols x time)
+            array of moving averages, where averages without enough prices are NaN,
+            and of the rolling kernel primed right before the last prices, which
+            calculates the moving averages of the latest tick in constant time.
+        """
+
+        moving_averages = {}
+
+        if MovingAverageFamily.simple_kind in self.kinds:
+            moving_averages.update(self.__calculate_simple_moving_averages(prices))
+
+        if MovingAverageFamily.exponential_kind in self.kinds:
+            moving_averages.update(self.__calculate_exponential_moving_averages(prices))
+
+        return moving_averages
+
+    def __calculate_simple_moving_averages(self, prices):
+        """
+        Calculates the simple moving averages of every window from one cumulative
+        sum of the prices.
+
+        Parameters
+        ----------
+        prices : np.ndarray
+            A 2-D (symbols x time) array of prices.
+
+        Returns
+        -------
+            A dictionary of the simple moving averages and their kernels indexed by
+            `(kind, window)`, where averages over windows with missing prices are NaN.
+        """
+
+        num_symbols, num_prices = prices.shape
+        cum_sums, cum_num_missing = RollingMeanKernel.cumulate(prices)
+
+        moving_averages = {}
+
+        for window in self.windows:
+            kernel = RollingMeanKernel(window, num_symbols)
+
+            if num_prices == 0:
+                averages = kernel.prime(prices)
+            else:
+                # The cumulative sums of all but the last prices are a prefix of
+                # the ones of all prices.
+                averages = kernel.batch(
+                    prices[:, :-1],
+                    cumulated_values=(cum_sums[:, :-1], cum_num_missing[:, :-1]),
+                )
+                averages = np.concatenate(
+                    [averages, kernel.peek(prices[:, -1])[:, np.newaxis]], axis=1
+                )
+
+            moving_averages[(MovingAverageFamily.simple_kind, window)] = (
+                averages,
+                kernel,
+            )
+
+        return moving_averages
+
+    def __calculate_exponential_moving_averages(self, prices):
+        """
+        Calculates the exponential moving averages of every window in one pass over
+        the prices, where missing prices are skipped.
+
+        Parameters
+        ----------
+        prices : np.ndarray
+            A 2-D (symbols x time) array of prices.
+
+        Returns
+        -------
+            A dictionary of the exponential moving averages and their kernels
+            indexed by `(kind, window)`.
+        """
+
+        num_symbols = len(prices)
+        windows = np.repeat(self.windows, num_symbols)
+
+        # One kernel smooths the prices of every window at once, with the rows of
+        # each window stacked on top of each other.
+        kernel = EwmKernel(
+            2.0 / (windows + 1),
+            len(windows),
+            EwmKernel.recursive_mode,
+            min_periods=windows,
+        )
+        all_averages = kernel.prime(np.tile(prices, (len(self.windows), 1)))
+
+        moving_averages = {}
+
+        for index, window in enumerate(self.windows):
+            rows = np.arange(index * num_symbols, (index + 1) * num_symbols)
+
+            moving_averages[(MovingAverageFamily.exponential_kind, window)] = (
+                all_averages[rows],
+                kernel.select(rows),
+            )
+
+        return moving_averages
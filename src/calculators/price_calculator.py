@@ -1,5 +1,4 @@
-from datetime import datetime
-import scipy.stats as stats
+from core.asset_data_parser import AssetDataParser
 
 from .analytics_calculator import AnalyticsCalculator
 
@@ -30,6 +29,9 @@ class PriceCalculator(AnalyticsCalculator):
         -------
             Price data dictionary indexed by symbol names.
         """
+
+        AssetDataParser.get_instance().parse(asset_data)
+
         price_data = {
             datum["symbol"]: self.__build_entry(datum["symbol"], datum)
             for datum in asset_data["data"]
@@ -40,6 +42,26 @@ class PriceCalculator(AnalyticsCalculator):
 
         return price_data
 
+    def roll_over(self, asset_data):
+        """
+        Calculates the price data for the given API price data of the next day,
+        whose bars are merged into the stored price history rather than replacing it.
+
+        Parameters
+        ----------
+        asset_data : dict
+            API price data dictionary where relevant information
+            is indexed by the keyword "data".
+
+        Returns
+        -------
+            Price data dictionary indexed by symbol names.
+        """
+
+        AssetDataParser.get_instance().roll_over(asset_data)
+
+        return self.calculate(asset_data)
+
     def __build_entry(self, symbol, entry):
         """
         Constructs an analytics data dictionary entry given a
@@ -58,61 +80,59 @@ class PriceCalculator(AnalyticsCalculator):
             An analytics data entry (i.e. a dictionary).
         """
 
-        self._logger.log(
-            f"Building entry for {self.id} data for the asset symbol {symbol}."
+        self._logger.debug(
+            "Building entry for {} data for the asset symbol {}.", self.id, symbol
         )
 
-        reformat_time = lambda t: datetime.fromtimestamp(t).strftime(
-            "%Y-%m-%d, %H:%M:%S"
-        )
-        parse_time_series = lambda ts: [
-            [
-                reformat_time(ts_entry["time"]),
-                ts_entry["close"],
-            ]
-            for ts_entry in ts
-        ]
-
         last_price = entry["price"]
-        parsed_time_series = parse_time_series(entry["timeSeries"])
-        parsed_time_series[-1][1] = last_price
-        prices = [entry[1] for entry in parsed_time_series if entry[1] is not None]
-        z_score = stats.zscore(prices)[-1]
+        time_series = self._store.read(self.id, symbol)
+        z_score = self._track_z_score(symbol, self._clean_values(self.id, symbol))
 
         return {
-            "time_series": parsed_time_series,
+            "time_series": time_series,
             "last_price": last_price,
             "last_z_score": z_score,
         }
 
-    def _calculate_latest_analytics(self, latest_fundamental, fundamentals, analytics):
+    def _calculate_latest_analytics(self, symbol, latest_fundamental, fundamentals):
         """
         Calculate the analytics using the given fundamentals but only for the latest tick.
 
         Parameters
         ----------
+        symbol : str
+            The asset symbol.
         latest_fundamental : double
             The latest tick fundamentals.
-        fundamentals : double[]
+        fundamentals : np.ndarray
             An array of fundamentals.
-        analytics : double[]
-            An array of analytics values.
 
         Returns
         -------
-            An array of the calculated analytics.
+            The latest analytics value.
         """
 
-        fundamentals_in_scope = (
-            fundamentals
-            if latest_fundamental is None
-            else [*fundamentals[:-1], latest_fundamental]
-        )
+        return latest_fundamental
 
-        z_score = stats.zscore(fundamentals_in_scope)[-1]
+    def _calculate_latest_panel_analytics(
+        self, symbols, latest_fundamentals, fundamentals
+    ):
+        """
+        Calculate the analytics of all symbols at once using the given panel of
+        fundamentals but only for the latest tick.
 
-        return {
-            "time_series": None,
-            f"last_{self.id}": latest_fundamental,
-            "last_z_score": z_score,
-        }
+        Parameters
+        ----------
+        symbols : str[]
+            The asset symbols, in the order of the panel's rows.
+        latest_fundamentals : np.ndarray
+            The array of latest tick prices, one per symbol.
+        fundamentals : np.ndarray
+            A 2-D (symbols x time) array of fundamentals aligned to the right.
+
+        Returns
+        -------
+            The array of latest analytics values, one per symbol.
+        """
+
+        return latest_fundamentals
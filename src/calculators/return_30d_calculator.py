@@ -1,7 +1,7 @@
 import numpy as np
-import scipy.stats as stats
 
 from .analytics_calculator import AnalyticsCalculator
+from .rolling_kernels import LaggedChangeKernel
 
 
 class Return30dCalculator(AnalyticsCalculator):
@@ -17,64 +17,86 @@ class Return30dCalculator(AnalyticsCalculator):
 
         self.__lag = 30
 
-    def _calculate_analytics(self, fundamentals):
+    def _calculate_panel_analytics(self, symbols, fundamentals):
         """
-        Calculate the analytics using the given fundamentals.
+        Calculate the analytics of all symbols at once using the given panel of fundamentals.
 
         Parameters
         ----------
-        fundamentals : double[]
-            An array of fundamentals.
+        symbols : str[]
+            The asset symbols, in the order of the panel's rows.
+        fundamentals : np.ndarray
+            A 2-D (symbols x time) array of fundamentals aligned to the right.
 
         Returns
         -------
-            An array of the calculated analytics.
+            A 2-D (symbols x time) array of the calculated analytics.
         """
-        prices = list(filter(None, fundamentals))
-        prices_30_lag = np.roll(prices, self.__lag)
-
-        returns_30 = (
-            (prices - prices_30_lag)[self.__lag :] / prices[: -self.__lag] * 100
+        kernel = LaggedChangeKernel(
+            self.__lag, len(symbols), is_relative=True, scale=100
         )
+        self._kernels[tuple(symbols)] = kernel
+
+        returns_30 = kernel.prime(fundamentals)
 
-        # Don't need to worry about "None" values here - it's accounted for later.
-        # Added here to make sure that return values are zipped together with the correct timestamps.
         return returns_30
 
-    def _calculate_latest_analytics(self, latest_fundamental, fundamentals, analytics):
+    def _calculate_latest_analytics(self, symbol, latest_fundamental, fundamentals):
         """
         Calculate the analytics using the given fundamentals but only for the latest tick.
 
         Parameters
         ----------
+        symbol : str
+            The asset symbol.
         latest_fundamental : double
             The latest tick price.
-        fundamentals : double[]
+        fundamentals : np.ndarray
             An array of fundamentals.
-        analytics : double[
-            An array of analytics values.
 
         Returns
         -------
-            An array of the calculated analytics.
+            The latest analytics value.
+        """
+
+        latest_price = (
+            fundamentals[-1] if latest_fundamental is None else latest_fundamental
+        )
+
+        new_return_30 = self._calculate_latest_panel_analytics(
+            [symbol],
+            np.array([latest_price], dtype=np.float64),
+            fundamentals[np.newaxis, :],
+        )[0]
+
+        return new_return_30
+
+    def _calculate_latest_panel_analytics(
+        self, symbols, latest_fundamentals, fundamentals
+    ):
         """
+        Calculate the analytics of all symbols at once using the given panel of
+        fundamentals but only for the latest tick.
 
-        if len(fundamentals) < self.__lag:
+        Parameters
+        ----------
+        symbols : str[]
+            The asset symbols, in the order of the panel's rows.
+        latest_fundamentals : np.ndarray
+            The array of latest tick prices, one per symbol.
+        fundamentals : np.ndarray
+            A 2-D (symbols x time) array of fundamentals aligned to the right.
+
+        Returns
+        -------
+            The array of latest analytics values, one per symbol.
+        """
+
+        # The latest price replaces the last price, so it's compared to the price
+        # `lag` periods before the last price, just like in the full time series.
+        if fundamentals.shape[1] < self.__lag + 1:
             raise Exception(
                 "There are insufficient price data points to calculate a singular return value."
             )
 
-        in_scope_prices = (
-            [fundamentals[-self.__lag], fundamentals[-1]]
-            if latest_fundamental is None
-            else [fundamentals[-self.__lag], latest_fundamental]
-        )
-
-        new_return_30 = (np.diff(in_scope_prices) / in_scope_prices[:-1] * 100)[-1]
-        z_score = stats.zscore([*analytics[:-1], new_return_30])[-1]
-
-        return {
-            "time_series": None,
-            f"last_{self.id}": new_return_30,
-            "last_z_score": z_score,
-        }
+        return self._kernels[tuple(symbols)].peek(latest_fundamentals)
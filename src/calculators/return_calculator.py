@@ -1,7 +1,7 @@
 import numpy as np
-import scipy.stats as stats
 
 from .analytics_calculator import AnalyticsCalculator
+from .rolling_kernels import LaggedChangeKernel
 
 
 class ReturnCalculator(AnalyticsCalculator):
@@ -15,41 +15,44 @@ class ReturnCalculator(AnalyticsCalculator):
         """
         super().__init__("return", "price")
 
-    def _calculate_analytics(self, fundamentals):
+    def _calculate_panel_analytics(self, symbols, fundamentals):
         """
-        Calculate the analytics using the given fundamentals.
+        Calculate the analytics of all symbols at once using the given panel of fundamentals.
 
         Parameters
         ----------
-        fundamentals : double[]
-            An array of fundamentals.
+        symbols : str[]
+            The asset symbols, in the order of the panel's rows.
+        fundamentals : np.ndarray
+            A 2-D (symbols x time) array of fundamentals aligned to the right.
 
         Returns
         -------
-            An array of the calculated analytics.
+            A 2-D (symbols x time) array of the calculated analytics.
         """
-        prices = list(filter(None, fundamentals))
+        kernel = LaggedChangeKernel(1, len(symbols), is_relative=True, scale=100)
+        self._kernels[tuple(symbols)] = kernel
 
-        returns = np.diff(prices) / prices[:-1] * 100
+        returns = kernel.prime(fundamentals)
 
         return returns
 
-    def _calculate_latest_analytics(self, latest_fundamental, fundamentals, analytics):
+    def _calculate_latest_analytics(self, symbol, latest_fundamental, fundamentals):
         """
         Calculate the analytics using the given fundamentals but only for the latest tick.
 
         Parameters
         ----------
+        symbol : str
+            The asset symbol.
         latest_fundamental : double
             The latest tick price.
-        fundamentals : double[]
+        fundamentals : np.ndarray
             An array of fundamentals.
-        analytics : double[
-            An array of analytics values.
 
         Returns
         -------
-            An array of the calculated analytics.
+            The latest analytics value.
         """
 
         if len(fundamentals) < 2:
@@ -57,17 +60,42 @@ class ReturnCalculator(AnalyticsCalculator):
                 "There are insufficient price data points to calculate a singular return value."
             )
 
-        in_scope_prices = (
-            fundamentals[-2:]
-            if latest_fundamental is None
-            else [fundamentals[-2], latest_fundamental]
+        latest_price = (
+            fundamentals[-1] if latest_fundamental is None else latest_fundamental
         )
 
-        new_return = (np.diff(in_scope_prices) / in_scope_prices[:-1] * 100)[-1]
-        z_score = stats.zscore([*analytics[:-1], new_return])[-1]
+        new_return = self._calculate_latest_panel_analytics(
+            [symbol],
+            np.array([latest_price], dtype=np.float64),
+            fundamentals[np.newaxis, :],
+        )[0]
+
+        return new_return
+
+    def _calculate_latest_panel_analytics(
+        self, symbols, latest_fundamentals, fundamentals
+    ):
+        """
+        Calculate the analytics of all symbols at once using the given panel of
+        fundamentals but only for the latest tick.
+
+        Parameters
+        ----------
+        symbols : str[]
+            The asset symbols, in the order of the panel's rows.
+        latest_fundamentals : np.ndarray
+            The array of latest tick prices, one per symbol.
+        fundamentals : np.ndarray
+            A 2-D (symbols x time) array of fundamentals aligned to the right.
+
+        Returns
+        -------
+            The array of latest analytics values, one per symbol.
+        """
+
+        if fundamentals.shape[1] < 2:
+            raise Exception(
+                "There are insufficient price data points to calculate a singular return value."
+            )
 
-        return {
-            "time_series": None,
-            f"last_{self.id}": new_return,
-            "last_z_score": z_score,
-        }
+        return self._kernels[tuple(symbols)].peek(latest_fundamentals)
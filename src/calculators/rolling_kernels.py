@@ -0,0 +1,847 @@
+from collections import deque
+
+import numpy as np
+
+
+class RollingKernel:
+    """
+    Represents a rolling-window kernel which runs over several series (e.g. the
+    prices of every symbol) at once.
+
+    Every kernel has a batch form, which processes a whole history with vectorised
+    operations, and a streaming form, which pushes one value per series at a time
+    in constant time. Both forms perform the same floating point operations, so
+    they give identical results.
+
+    ...
+
+    Instance Attributes
+    -------------------
+    num_series : int
+        The number of series the kernel runs over.
+    num_values : int
+        The number of values per series processed so far.
+    _state : dict
+        The per-series state of the kernel, where arrays (and lists) are indexed
+        by series along their first axis.
+    """
+
+    def __init__(self, num_series=1):
+        """
+        Initialises a new instance of this class.
+
+        Parameters
+        ----------
+        num_series : int
+            The number of series the kernel runs over.
+        """
+
+        self.num_series = num_series
+        self.num_values = 0
+        self._state = {}
+
+    def batch(self, values, **parameters):
+        """
+        Resets the kernel and processes the given history at once, leaving the
+        kernel as if every value had been pushed in turn.
+
+        Parameters
+        ----------
+        values : np.ndarray
+            A 2-D (series x time) array of values, where missing values are NaN.
+        **parameters
+            The keyword parameters specific to the kernel's batch form.
+
+        Returns
+        -------
+            A 2-D (series x time) array of the outputs, where undefined outputs are NaN.
+        """
+
+        values = np.asarray(values, dtype=np.float64).reshape(self.num_series, -1)
+        outputs = self._batch(values, **parameters)
+        self.num_values = values.shape[1]
+
+        return outputs
+
+    def prime(self, values):
+        """
+        Processes the given history with the batch form, except for its last
+        values, so that `peek` recalculates the outputs of the last values (e.g.
+        when they are replaced with the latest tick) in constant time.
+
+        Parameters
+        ----------
+        values : np.ndarray
+            A 2-D (series x time) array of values, where missing values are NaN.
+
+        Returns
+        -------
+            A 2-D (series x time) array of the outputs of every value.
+        """
+
+        values = np.asarray(values, dtype=np.float64).reshape(self.num_series, -1)
+
+        if values.shape[1] == 0:
+            self.batch(values)
+
+            return values.copy()
+
+        outputs = self.batch(values[:, :-1])
+        last_outputs = self.peek(values[:, -1])
+
+        return np.concatenate([outputs, last_outputs[:, np.newaxis]], axis=1)
+
+    def push(self, values):
+        """
+        Processes the next value of every series.
+
+        Parameters
+        ----------
+        values : np.ndarray
+            The array of the next values, one per series.
+
+        Returns
+        -------
+            The array of outputs, one per series.
+        """
+
+        outputs = self._step(self.__as_column(values), is_committed=True)
+        self.num_values += 1
+
+        return outputs
+
+    def peek(self, values):
+        """
+        Calculates the outputs `push` would return for the given values, without
+        changing the kernel.
+
+        Parameters
+        ----------
+        values : np.ndarray
+            The array of the next values, one per series.
+
+        Returns
+        -------
+            The array of outputs, one per series.
+        """
+
+        return self._step(self.__as_column(values), is_committed=False)
+
+    def select(self, rows):
+        """
+        Returns a kernel with the state of the given series only.
+
+        Parameters
+        ----------
+        rows : int[]
+            The indices of the series.
+
+        Returns
+        -------
+            A new kernel of `len(rows)` series.
+        """
+
+        kernel = object.__new__(type(self))
+        kernel.__dict__.update(self.__dict__)
+        kernel.num_series = len(rows)
+        kernel._state = {
+            key: self.__select_state(value, rows) for key, value in self._state.items()
+        }
+
+        return kernel
+
+    def __as_column(self, values):
+        """
+        Converts the given values into an array of one value per series.
+        """
+
+        return np.broadcast_to(
+            np.asarray(values, dtype=np.float64), (self.num_series,)
+        ).copy()
+
+    @staticmethod
+    def __select_state(value, rows):
+        """
+        Selects the state of the given series from a state value.
+        """
+
+        if isinstance(value, RollingKernel):
+            return value.select(rows)
+
+        if isinstance(value, list):
+            return [value[row] for row in rows]
+
+        if isinstance(value, np.ndarray) and value.ndim > 0:
+            return value[rows].copy()
+
+        return value
+
+    def _batch(self, values):
+        """
+        Processes the given history from a fresh state with vectorised operations.
+
+        Parameters
+        ----------
+        values : np.ndarray
+            A 2-D (series x time) array of values.
+
+        Returns
+        -------
+            A 2-D (series x time) array of the outputs.
+        """
+
+        raise NotImplementedError(
+            "RollingKernel is a base class and this method should be implemented in its child classes."
+        )
+
+    def _step(self, values, is_committed):
+        """
+        Calculates the outputs for the next value of every series.
+
+        Parameters
+        ----------
+        values : np.ndarray
+            The array of the next values, one per series.
+        is_committed : bool
+            A flag which when set to `True` updates the state with the values.
+
+        Returns
+        -------
+            The array of outputs, one per series.
+        """
+
+        raise NotImplementedError(
+            "RollingKernel is a base class and this method should be implemented in its child classes."
+        )
+
+
+class RollingSumKernel(RollingKernel):
+    """
+    Represents a kernel which calculates the sum of the last `window` values, which
+    is NaN if any of them is missing.
+
+    Both forms take the difference of two cumulative sums, where the streaming form
+    keeps the cumulative sums of the last `window` values in a ring buffer.
+
+    ...
+
+    Instance Attributes
+    -------------------
+    window : int
+        The number of values summed.
+    """
+
+    def __init__(self, window, num_series=1):
+        """
+        Initialises a new instance of this class.
+
+        Parameters
+        ----------
+        window : int
+            The number of values summed.
+        num_series : int
+            The number of series the kernel runs over.
+        """
+
+        super().__init__(num_series)
+
+        if window < 1:
+            raise Exception("A rolling window needs to be at least 1.")
+
+        self.window = window
+        self._batch(np.empty((num_series, 0)))
+
+    @staticmethod
+    def cumulate(values):
+        """
+        Calculates the cumulative sums and cumulative numbers of missing values of
+        the given values, which can be shared by the kernels of several windows.
+
+        Parameters
+        ----------
+        values : np.ndarray
+            A 2-D (series x time) array of values.
+
+        Returns
+        -------
+            The 2-D (series x (time + 1)) arrays of cumulative sums and cumulative
+            numbers of missing values, which both start with 0.
+        """
+
+        is_missing = np.isnan(values)
+
+        cum_sums = np.cumsum(
+            np.insert(np.where(is_missing, 0.0, values), 0, 0.0, axis=1), axis=1
+        )
+        cum_num_missing = np.cumsum(np.insert(is_missing, 0, False, axis=1), axis=1)
+
+        return cum_sums, cum_num_missing
+
+    def _batch(self, values, cumulated_values=None):
+        """
+        Processes the given history from a fresh state with vectorised operations,
+        where `cumulated_values` is the result of `RollingSumKernel.cumulate(values)`,
+        if already calculated.
+        """
+
+        num_values = values.shape[1]
+        cum_sums, cum_num_missing = (
+            self.cumulate(values) if cumulated_values is None else cumulated_values
+        )
+
+        sums = np.full(values.shape, np.nan)
+        sums[:, self.window - 1 :] = np.where(
+            cum_num_missing[:, self.window :] - cum_num_missing[:, : -self.window] > 0,
+            np.nan,
+            cum_sums[:, self.window :] - cum_sums[:, : -self.window],
+        )
+
+        # The cumulative sum of the first j values is kept in slot j % window.
+        history_sums = np.full((self.num_series, self.window), np.nan)
+        history_num_missing = np.zeros((self.num_series, self.window))
+        indices = np.arange(max(num_values + 1 - self.window, 0), num_values + 1)
+        history_sums[:, indices % self.window] = cum_sums[:, indices]
+        history_num_missing[:, indices % self.window] = cum_num_missing[:, indices]
+
+        self._state = {
+            "cum_sums": cum_sums[:, -1].copy(),
+            "cum_num_missing": cum_num_missing[:, -1].astype(np.float64),
+            "history_sums": history_sums,
+            "history_num_missing": history_num_missing,
+        }
+
+        return self._transform(sums)
+
+    def _step(self, values, is_committed):
+        """
+        Calculates the outputs for the next value of every series.
+        """
+
+        state = self._state
+        is_missing = np.isnan(values)
+
+        cum_sums = state["cum_sums"] + np.where(is_missing, 0.0, values)
+        cum_num_missing = state["cum_num_missing"] + is_missing
+
+        slot = (self.num_values + 1) % self.window
+        num_missing = cum_num_missing - state["history_num_missing"][:, slot]
+        sums = cum_sums - state["history_sums"][:, slot]
+
+        if self.num_values + 1 < self.window:
+            sums = np.full(self.num_series, np.nan)
+
+        if is_committed:
+            state["cum_sums"] = cum_sums
+            state["cum_num_missing"] = cum_num_missing
+            state["history_sums"][:, slot] = cum_sums
+            state["history_num_missing"][:, slot] = cum_num_missing
+
+        return self._transform(np.where(num_missing > 0, np.nan, sums))
+
+    def _transform(self, sums):
+        """
+        Transforms the rolling sums into the outputs of the kernel.
+        """
+
+        return sums
+
+
+class RollingMeanKernel(RollingSumKernel):
+    """
+    Represents a kernel which calculates the mean of the last `window` values, which
+    is NaN if any of them is missing.
+    """
+
+    def _transform(self, sums):
+        """
+        Transforms the rolling sums into the outputs of the kernel.
+        """
+
+        return sums / float(self.window)
+
+
+class RollingStdKernel(RollingKernel):
+    """
+    Represents a kernel which calculates the standard deviation of the last
+    `window` values, which is NaN if any of them is missing.
+
+    Every value is shifted by the first value of its series before being summed,
+    which keeps the sums of squares small and avoids catastrophic cancellation.
+
+    ...
+
+    Instance Attributes
+    -------------------
+    window : int
+        The number of values the standard deviation is calculated over.
+    ddof : int
+        The delta degrees of freedom, e.g. 1 for the sample standard deviation.
+    """
+
+    def __init__(self, window, num_series=1, ddof=1):
+        """
+        Initialises a new instance of this class.
+
+        Parameters
+        ----------
+        window : int
+            The number of values the standard deviation is calculated over.
+        num_series : int
+            The number of series the kernel runs over.
+        ddof : int
+            The delta degrees of freedom, e.g. 1 for the sample standard deviation.
+        """
+
+        super().__init__(num_series)
+
+        self.window = window
+        self.ddof = ddof
+        self._state = {
+            "shifts": np.full(num_series, np.nan),
+            "sums": RollingSumKernel(window, num_series),
+            "sums_of_squares": RollingSumKernel(window, num_series),
+        }
+
+    def _batch(self, values):
+        """
+        Processes the given history from a fresh state with vectorised operations.
+        """
+
+        is_valid = ~np.isnan(values)
+        shifts = np.full(self.num_series, np.nan)
+
+        # An empty history (e.g. when pushing from the start) has no first values.
+        if values.shape[1] > 0:
+            first_columns = np.argmax(is_valid, axis=1)
+            shifts = np.where(
+                is_valid.any(axis=1),
+                values[np.arange(self.num_series), first_columns],
+                np.nan,
+            )
+
+        # A value preceding the first value of its series is missing anyway.
+        shifted_values = values - np.where(np.isnan(shifts), 0.0, shifts)[:, np.newaxis]
+
+        self._state["shifts"] = shifts
+        sums = self._state["sums"].batch(shifted_values)
+        sums_of_squares = self._state["sums_of_squares"].batch(
+            np.square(shifted_values)
+        )
+
+        return self.__calculate_std(sums, sums_of_squares)
+
+    def _step(self, values, is_committed):
+        """
+        Calculates the outputs for the next value of every series.
+        """
+
+        shifts = np.where(
+            np.isnan(self._state["shifts"]), values, self._state["shifts"]
+        )
+        shifted_values = values - np.where(np.isnan(shifts), 0.0, shifts)
+
+        sums_kernel = self._state["sums"]
+        sums_of_squares_kernel = self._state["sums_of_squares"]
+
+        if is_committed:
+            sums = sums_kernel.push(shifted_values)
+            sums_of_squares = sums_of_squares_kernel.push(np.square(shifted_values))
+        else:
+            sums = sums_kernel.peek(shifted_values)
+            sums_of_squares = sums_of_squares_kernel.peek(np.square(shifted_values))
+
+        if is_committed:
+            self._state["shifts"] = shifts
+
+        return self.__calculate_std(sums, sums_of_squares)
+
+    def __calculate_std(self, sums, sums_of_squares):
+        """
+        Calculates the standard deviations given the rolling sums and sums of squares.
+        """
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            variances = (sums_of_squares - np.square(sums) / self.window) / (
+                self.window - self.ddof
+            )
+
+        return np.sqrt(np.maximum(variances, 0.0))
+
+
+class RollingExtremumKernel(RollingKernel):
+    """
+    Represents a kernel which calculates the minimum (or maximum) of the last
+    `window` values, which is NaN if any of them is missing.
+
+    The streaming form keeps a monotonic deque of the candidate extrema of each
+    series, so each value is pushed in amortised constant time.
+
+    ...
+
+    Instance Attributes
+    -------------------
+    window : int
+        The number of values the extremum is taken over.
+    is_maximum : bool
+        A flag which when set to `True` calculates maxima rather than minima.
+    """
+
+    def __init__(self, window, num_series=1, is_maximum=False):
+        """
+        Initialises a new instance of this class.
+
+        Parameters
+        ----------
+        window : int
+            The number of values the extremum is taken over.
+        num_series : int
+            The number of series the kernel runs over.
+        is_maximum : bool
+            A flag which when set to `True` calculates maxima rather than minima.
+        """
+
+        super().__init__(num_series)
+
+        if window < 1:
+            raise Exception("A rolling window needs to be at least 1.")
+
+        self.window = window
+        self.is_maximum = is_maximum
+        self._batch(np.empty((num_series, 0)))
+
+    def _batch(self, values):
+        """
+        Processes the given history from a fresh state with vectorised operations.
+        """
+
+        num_values = values.shape[1]
+        extrema = np.full(values.shape, np.nan)
+
+        if num_values >= self.window:
+            windows = np.lib.stride_tricks.sliding_window_view(
+                values, self.window, axis=1
+            )
+            extrema[:, self.window - 1 :] = (
+                windows.max(axis=2) if self.is_maximum else windows.min(axis=2)
+            )
+
+        self._state = {
+            "is_missing": np.zeros((self.num_series, self.window), dtype=bool),
+            "candidates": [deque() for _ in range(self.num_series)],
+        }
+
+        # Only the last `window` values matter to the next extrema.
+        first_index = max(num_values - self.window, 0)
+        self.num_values = first_index
+
+        for index in range(first_index, num_values):
+            self._step(values[:, index], is_committed=True)
+            self.num_values += 1
+
+        return extrema
+
+    def _step(self, values, is_committed):
+        """
+        Calculates the outputs for the next value of every series.
+        """
+
+        index = self.num_values
+        slot = index % self.window
+        first_index = index + 1 - self.window
+
+        is_missing = self._state["is_missing"]
+        is_missing_now = np.isnan(values)
+        num_missing = is_missing.sum(axis=1) - is_missing[:, slot] + is_missing_now
+
+        extrema = np.full(self.num_series, np.nan)
+
+        for row, value in enumerate(values):
+            candidates = self._state["candidates"][row]
+
+            if is_committed:
+                while candidates and candidates[0][0] < first_index:
+                    candidates.popleft()
+
+                if not is_missing_now[row]:
+                    while candidates and self.__is_dominated(candidates[-1][1], value):
+                        candidates.pop()
+
+                    candidates.append((index, value))
+
+                extremum = candidates[0][1] if candidates else np.nan
+            else:
+                extremum = next(
+                    (
+                        candidate
+                        for candidate_index, candidate in candidates
+                        if candidate_index >= first_index
+                    ),
+                    np.nan,
+                )
+
+                if not is_missing_now[row] and (
+                    extremum != extremum or self.__is_dominated(extremum, value)
+                ):
+                    extremum = value
+
+            if num_missing[row] == 0 and first_index >= 0:
+                extrema[row] = extremum
+
+        if is_committed:
+            is_missing[:, slot] = is_missing_now
+
+        return extrema
+
+    def __is_dominated(self, candidate, value):
+        """
+        Returns whether the given candidate can no longer be an extremum once the
+        given value has been pushed.
+        """
+
+        return candidate <= value if self.is_maximum else candidate >= value
+
+
+class LaggedChangeKernel(RollingKernel):
+    """
+    Represents a kernel which calculates the change of each value from the value
+    `lag` periods before it, either as a difference or, relative to the lagged
+    value, as a ratio minus one (e.g. a return).
+
+    ...
+
+    Instance Attributes
+    -------------------
+    lag : int
+        The number of periods between a value and the value it's compared to.
+    is_relative : bool
+        A flag which when set to `True` divides each change by the lagged value.
+    scale : double
+        The factor each change is multiplied by, e.g. 100 for a percentage.
+    """
+
+    def __init__(self, lag, num_series=1, is_relative=False, scale=1.0):
+        """
+        Initialises a new instance of this class.
+
+        Parameters
+        ----------
+        lag : int
+            The number of periods between a value and the value it's compared to.
+        num_series : int
+            The number of series the kernel runs over.
+        is_relative : bool
+            A flag which when set to `True` divides each change by the lagged value.
+        scale : double
+            The factor each change is multiplied by, e.g. 100 for a percentage.
+        """
+
+        super().__init__(num_series)
+
+        if lag < 1:
+            raise Exception("A lag needs to be at least 1.")
+
+        self.lag = lag
+        self.is_relative = is_relative
+        self.scale = scale
+        self._batch(np.empty((num_series, 0)))
+
+    def _batch(self, values):
+        """
+        Processes the given history from a fresh state with vectorised operations.
+        """
+
+        num_values = values.shape[1]
+        changes = np.full(values.shape, np.nan)
+        changes[:, self.lag :] = self.__calculate_change(
+            values[:, self.lag :], values[:, : -self.lag]
+        )
+
+        # The value with index j is kept in slot j % lag.
+        history = np.full((self.num_series, self.lag), np.nan)
+        indices = np.arange(max(num_values - self.lag, 0), num_values)
+        history[:, indices % self.lag] = values[:, indices]
+
+        self._state = {"history": history}
+
+        return changes
+
+    def _step(self, values, is_committed):
+        """
+        Calculates the outputs for the next value of every series.
+        """
+
+        slot = self.num_values % self.lag
+        changes = self.__calculate_change(values, self._state["history"][:, slot])
+
+        if is_committed:
+            self._state["history"][:, slot] = values
+
+        return changes
+
+    def __calculate_change(self, values, lagged_values):
+        """
+        Calculates the changes of the given values from the lagged values.
+        """
+
+        if self.is_relative:
+            return (values - lagged_values) / lagged_values * self.scale
+
+        return (values - lagged_values) * self.scale
+
+
+class EwmKernel(RollingKernel):
+    """
+    Represents a kernel which calculates exponentially weighted means.
+
+    ...
+
+    Class Attributes
+    ----------------
+    adjusted_mode : str
+        The mode which follows the same recursion (and floating point operations)
+        as `pandas.Series.ewm(alpha=alpha, adjust=True).mean()`.
+    recursive_mode : str
+        The mode which follows `pandas.Series.ewm(alpha=alpha, adjust=False).mean()`,
+        where missing values are skipped.
+    wilder_mode : str
+        The mode of Wilder's smoothing, i.e. a simple mean of the first 1 / alpha
+        values followed by the recursive mode.
+
+    Instance Attributes
+    -------------------
+    alpha : np.ndarray
+        The smoothing factor of each series.
+    mode : str
+        The mode of the exponentially weighted means.
+    min_periods : np.ndarray
+        The number of values each series needs before its means are defined.
+    """
+
+    adjusted_mode = "adjusted"
+    recursive_mode = "recursive"
+    wilder_mode = "wilder"
+
+    def __init__(self, alpha, num_series=1, mode=recursive_mode, min_periods=0):
+        """
+        Initialises a new instance of this class.
+
+        Parameters
+        ----------
+        alpha : double
+            The smoothing factor, or an array of one smoothing factor per series.
+        num_series : int
+            The number of series the kernel runs over.
+        mode : str
+            The mode of the exponentially weighted means, i.e.
+            `EwmKernel.adjusted_mode`, `EwmKernel.recursive_mode` or
+            `EwmKernel.wilder_mode`.
+        min_periods : int
+            The number of values needed before the means are defined, or an array
+            of one number per series.
+        """
+
+        super().__init__(num_series)
+
+        if mode not in [
+            EwmKernel.adjusted_mode,
+            EwmKernel.recursive_mode,
+            EwmKernel.wilder_mode,
+        ]:
+            raise Exception(f"Unknown exponentially weighted mean mode '{mode}'.")
+
+        self.alpha = np.broadcast_to(np.asarray(alpha, dtype=np.float64), num_series)
+        self.mode = mode
+        self.min_periods = np.broadcast_to(np.asarray(min_periods), num_series)
+        self._batch(np.empty((num_series, 0)))
+
+    def select(self, rows):
+        """
+        Returns a kernel with the state of the given series only.
+
+        Parameters
+        ----------
+        rows : int[]
+            The indices of the series.
+
+        Returns
+        -------
+            A new kernel of `len(rows)` series.
+        """
+
+        kernel = super().select(rows)
+        kernel.alpha = self.alpha[rows]
+        kernel.min_periods = self.min_periods[rows]
+
+        return kernel
+
+    def _batch(self, values):
+        """
+        Processes the given history from a fresh state, one vectorised step per
+        period since the recursion is sequential.
+        """
+
+        self._state = {
+            "averages": np.full(self.num_series, np.nan),
+            "weights": np.ones(self.num_series),
+            "num_observations": np.zeros(self.num_series),
+        }
+
+        means = np.empty(values.shape)
+
+        for column in range(values.shape[1]):
+            means[:, column] = self._step(values[:, column], is_committed=True)
+
+        return means
+
+    def _step(self, values, is_committed):
+        """
+        Calculates the outputs for the next value of every series.
+        """
+
+        averages = self._state["averages"]
+        weights = self._state["weights"]
+
+        is_observation = values == values
+        has_average = averages == averages
+        num_observations = self._state["num_observations"] + is_observation
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            if self.mode == EwmKernel.adjusted_mode:
+                old_weight_factor = 1.0 - self.alpha
+                weights = np.where(has_average, weights * old_weight_factor, weights)
+                is_update = has_average & is_observation & (averages != values)
+
+                averages = np.where(
+                    is_update,
+                    (weights * averages + values) / (weights + 1.0),
+                    np.where(has_average | ~is_observation, averages, values),
+                )
+                weights = np.where(has_average & is_observation, weights + 1.0, weights)
+            elif self.mode == EwmKernel.wilder_mode:
+                num_periods = np.minimum(num_observations, np.rint(1.0 / self.alpha))
+                averages = np.where(
+                    is_observation,
+                    np.where(
+                        has_average,
+                        (averages * (num_periods - 1) + values) / num_periods,
+                        values,
+                    ),
+                    averages,
+                )
+            else:
+                averages = np.where(
+                    is_observation,
+                    np.where(
+                        has_average,
+                        self.alpha * values + (1 - self.alpha) * averages,
+                        values,
+                    ),
+                    averages,
+                )
+
+        if is_committed:
+            self._state["averages"] = averages
+            self._state["weights"] = weights
+            self._state["num_observations"] = num_observations
+
+        return np.where(num_observations >= self.min_periods, averages, np.nan)
@@ -1,57 +1,113 @@
 import numpy as np
-import pandas as pd
-import scipy.stats as stats
 
 from .analytics_calculator import AnalyticsCalculator
+from .rolling_kernels import EwmKernel, LaggedChangeKernel
 
 
 class RsiCalculator(AnalyticsCalculator):
     """
     Represents a class that calculates a relative strength momentum (rsi) values.
+
+    ...
+
+    Class Attributes
+    ----------------
+    adjusted_smoothing : str
+        The smoothing which averages price changes with an adjusted exponentially
+        weighted mean, i.e. like `pandas.Series.ewm(com=13, adjust=True).mean()`.
+    wilder_smoothing : str
+        The smoothing which averages price changes with Wilder's smoothing, i.e. a
+        simple average of the first 14 price changes followed by a recursive
+        average with a smoothing factor of 1/14.
+
+    Instance Attributes
+    -------------------
+    __num_periods : int
+        The number of periods the rsi values are calculated over.
+    __smoothing : str
+        The smoothing used to average price changes.
     """
 
-    def __init__(self):
+    adjusted_smoothing = "adjusted"
+    wilder_smoothing = "wilder"
+
+    def __init__(self, smoothing=adjusted_smoothing):
         """
         Initialises a new instance of this class.
+
+        Parameters
+        ----------
+        smoothing : str
+            The smoothing used to average price changes, i.e. either
+            `RsiCalculator.adjusted_smoothing` or `RsiCalculator.wilder_smoothing`.
         """
         super().__init__("rsi", "price")
 
+        if smoothing not in [
+            RsiCalculator.adjusted_smoothing,
+            RsiCalculator.wilder_smoothing,
+        ]:
+            raise Exception(f"Unknown rsi smoothing '{smoothing}'.")
+
         self.__num_periods = 14
+        self.__smoothing = smoothing
 
-    def _calculate_analytics(self, fundamentals):
+    def _calculate_panel_analytics(self, symbols, fundamentals):
         """
-        Calculate the analytics using the given fundamentals.
+        Calculate the analytics of all symbols at once using the given panel of fundamentals.
 
         Parameters
         ----------
-        fundamentals : double[]
-            An array of fundamentals.
+        symbols : str[]
+            The asset symbols, in the order of the panel's rows.
+        fundamentals : np.ndarray
+            A 2-D (symbols x time) array of fundamentals aligned to the right.
 
         Returns
         -------
-            An array of the calculated analytics.
+            A 2-D (symbols x time) array of the calculated analytics.
         """
-        prices = list(filter(None, fundamentals))
-        rsi_values = self.__calculate_rsi(prices)
+        num_symbols = len(symbols)
+        smoothing_factor = 1.0 / (1.0 + (self.__num_periods - 1))
+        mode = (
+            EwmKernel.wilder_mode
+            if self.__smoothing == RsiCalculator.wilder_smoothing
+            else EwmKernel.adjusted_mode
+        )
+
+        kernels = (
+            LaggedChangeKernel(1, num_symbols),
+            EwmKernel(smoothing_factor, num_symbols, mode, self.__num_periods),
+            EwmKernel(smoothing_factor, num_symbols, mode, self.__num_periods),
+        )
+        self._kernels[tuple(symbols)] = kernels
+
+        price_changes_kernel, increases_kernel, decreases_kernel = kernels
+        price_changes = price_changes_kernel.prime(fundamentals)
+
+        rsi_values = self.__calculate_rsi_value(
+            increases_kernel.prime(np.maximum(price_changes, 0)),
+            decreases_kernel.prime(-1 * np.minimum(price_changes, 0)),
+        )
 
         return rsi_values
 
-    def _calculate_latest_analytics(self, latest_fundamental, fundamentals, analytics):
+    def _calculate_latest_analytics(self, symbol, latest_fundamental, fundamentals):
         """
         Calculate the analytics using the given fundamentals but only for the latest tick.
 
         Parameters
         ----------
+        symbol : str
+            The asset symbol.
         latest_fundamental : double
             The latest tick price.
-        fundamentals : double[]
+        fundamentals : np.ndarray
             An array of fundamentals.
-        analytics : double[
-            An array of analytics values.
 
         Returns
         -------
-            An array of the calculated analytics.
+            The latest analytics value.
         """
 
         if len(fundamentals) < self.__num_periods + 1:
@@ -59,53 +115,113 @@ class RsiCalculator(AnalyticsCalculator):
                 "There are insufficient price data points to calculate a singular moving average value."
             )
 
-        in_scope_prices = (
-            fundamentals[-(self.__num_periods + 1) :]
-            if latest_fundamental is None
-            else [*fundamentals[-(self.__num_periods + 1) : -1], latest_fundamental]
+        latest_price = (
+            fundamentals[-1] if latest_fundamental is None else latest_fundamental
         )
 
-        new_rsi = self.__calculate_rsi(in_scope_prices)[-1]
-        z_score = stats.zscore([*analytics[:-1], new_rsi])[-1]
+        new_rsi = self._calculate_latest_panel_analytics(
+            [symbol],
+            np.array([latest_price], dtype=np.float64),
+            fundamentals[np.newaxis, :],
+        )[0]
 
-        return {
-            "time_series": None,
-            f"last_{self.id}": new_rsi,
-            "last_z_score": z_score,
-        }
+        return new_rsi
 
-    def __calculate_rsi(self, prices):
+    def _calculate_latest_panel_analytics(
+        self, symbols, latest_fundamentals, fundamentals
+    ):
         """
-        Calculates the rsi values for the given prices.
+        Calculate the analytics of all symbols at once using the given panel of
+        fundamentals but only for the latest tick.
 
         Parameters
         ----------
-        prices : double[]
-            The prices.
+        symbols : str[]
+            The asset symbols, in the order of the panel's rows.
+        latest_fundamentals : np.ndarray
+            The array of latest tick prices, one per symbol.
+        fundamentals : np.ndarray
+            A 2-D (symbols x time) array of fundamentals aligned to the right.
 
         Returns
         -------
-            The rsi values for the given prices.
+            The array of latest analytics values, one per symbol.
         """
 
-        # TODO: implement this algorithm without dataframes.
-        prices_df = pd.DataFrame(prices, columns=["price"])
+        if fundamentals.shape[1] < self.__num_periods + 1:
+            raise Exception(
+                "There are insufficient price data points to calculate a singular moving average value."
+            )
 
-        price_change = prices_df["price"].diff()
-        increases = price_change.clip(lower=0)
-        decreases = -1 * price_change.clip(upper=0)
+        price_changes_kernel, increases_kernel, decreases_kernel = self._kernels[
+            tuple(symbols)
+        ]
+        price_changes = price_changes_kernel.peek(latest_fundamentals)
 
-        moving_average_increases = increases.ewm(
-            com=self.__num_periods - 1, adjust=True, min_periods=self.__num_periods
-        ).mean()
-        moving_average_decreases = decreases.ewm(
-            com=self.__num_periods - 1, adjust=True, min_periods=self.__num_periods
-        ).mean()
+        return self.__calculate_rsi_value(
+            increases_kernel.peek(np.maximum(price_changes, 0)),
+            decreases_kernel.peek(-1 * np.minimum(price_changes, 0)),
+        )
 
-        rsi = moving_average_increases / moving_average_decreases
-        rsi = 100 - (100 / (1 + rsi))
-        rsi = rsi.dropna()
+    def _roll_over_panel_analytics(
+        self, symbols, closed_fundamentals, latest_fundamentals
+    ):
+        """
+        Advances the rolling kernels of the given symbols by the prices of the bar
+        which has closed and calculates the rsi values of the closed bar and of the
+        new bar.
 
-        rsi_values = list(filter(None, rsi.values.tolist()))
+        Parameters
+        ----------
+        symbols : str[]
+            The asset symbols, in the order of the panel's rows.
+        closed_fundamentals : np.ndarray
+            The array of the closed bar's prices, one per symbol.
+        latest_fundamentals : np.ndarray
+            The array of the new bar's prices, one per symbol.
 
-        return rsi_values
+        Returns
+        -------
+            The arrays of the rsi values of the closed bar and of the new bar, one
+            per symbol.
+        """
+
+        price_changes_kernel, increases_kernel, decreases_kernel = self._kernels[
+            tuple(symbols)
+        ]
+        closed_price_changes = price_changes_kernel.push(closed_fundamentals)
+        closed_rsi = self.__calculate_rsi_value(
+            increases_kernel.push(np.maximum(closed_price_changes, 0)),
+            decreases_kernel.push(-1 * np.minimum(closed_price_changes, 0)),
+        )
+        price_changes = price_changes_kernel.peek(latest_fundamentals)
+
+        return closed_rsi, self.__calculate_rsi_value(
+            increases_kernel.peek(np.maximum(price_changes, 0)),
+            decreases_kernel.peek(-1 * np.minimum(price_changes, 0)),
+        )
+
+    def __calculate_rsi_value(self, average_increases, average_decreases):
+        """
+        Calculates the rsi values given the average increases and decreases of
+        the prices.
+
+        Parameters
+        ----------
+        average_increases : np.ndarray
+            The average price increases, which are NaN until enough price changes
+            have been observed.
+        average_decreases : np.ndarray
+            The average price decreases, which are NaN until enough price changes
+            have been observed.
+
+        Returns
+        -------
+            The array of rsi values.
+        """
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rsi = average_increases / average_decreases
+            rsi = 100 - (100 / (1 + rsi))
+
+        return rsi
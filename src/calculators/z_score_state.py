@@ -0,0 +1,88 @@
+import math
+
+import numpy as np
+
+
+class ZScoreState:
+    """
+    Represents the running (Welford) statistics of every value in a series but
+    its last one, which is enough to calculate the z-score of any value that
+    replaces the last one in constant time.
+
+    ...
+
+    Instance Attributes
+    -------------------
+    last_value : double
+        The last value of the series the state was built from.
+    __count : int
+        The number of values preceding the last value.
+    __mean : double
+        The mean of the values preceding the last value.
+    __m2 : double
+        The sum of squared differences from the mean of the values preceding
+        the last value.
+    """
+
+    def __init__(self, values):
+        """
+        Initialises a new instance of this class.
+
+        Parameters
+        ----------
+        values : np.ndarray
+            The series of values, none of which should be missing.
+        """
+
+        preceding_values = values[:-1]
+
+        self.last_value = values[-1] if len(values) > 0 else None
+        self.__count = len(preceding_values)
+        self.__mean = preceding_values.mean() if self.__count > 0 else 0.0
+        self.__m2 = (
+            np.square(preceding_values - self.__mean).sum() if self.__count > 0 else 0.0
+        )
+
+    def append(self, value):
+        """
+        Appends the given value to the series, adding the previous last value to
+        the running statistics, e.g. when the latest bar of the series closes.
+
+        Parameters
+        ----------
+        value : double
+            The new last value of the series, which should not be missing.
+        """
+
+        if self.last_value is not None:
+            self.__count += 1
+            delta = self.last_value - self.__mean
+            self.__mean += delta / self.__count
+            self.__m2 += delta * (self.last_value - self.__mean)
+
+        self.last_value = value
+
+    def z_score(self, value):
+        """
+        Calculates the z-score of the given value as the last value of the series,
+        i.e. equivalent to `scipy.stats.zscore([*values[:-1], value])[-1]`.
+
+        Parameters
+        ----------
+        value : double
+            The value replacing the last value of the series.
+
+        Returns
+        -------
+            The z-score of the given value, or NaN if it's undefined.
+        """
+
+        count = self.__count + 1
+        delta = value - self.__mean
+        mean = self.__mean + delta / count
+        m2 = self.__m2 + delta * (value - mean)
+
+        if not m2 > 0:
+            return math.nan
+
+        return (value - mean) / math.sqrt(m2 / count)
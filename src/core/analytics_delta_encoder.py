@@ -0,0 +1,229 @@
+from threading import Lock
+
+from utils.serialiser import Serialiser
+
+
+class AnalyticsDeltaEncoder:
+    """
+    Represents the encoder of the messages sent to web clients on every tick,
+    which are either snapshots of the whole engine output or deltas holding only
+    the values (e.g. `last_rsi` and `last_z_score`) which changed since the
+    previous message, and which are numbered by a sequence number increasing by
+    one per message.
+
+    A client applies each delta to its snapshot, and requests a new snapshot
+    when it reconnects or when it detects a gap in the sequence numbers.
+
+    Every message publishes a new snapshot message of the engine output, which
+    is never modified afterwards, by replacing the reference to the previous one,
+    so clients read a consistent snapshot along with its sequence number without
+    waiting for the message being encoded. A delta only copies the symbols and
+    entries which changed and shares the others with the previous snapshot.
+
+    The time series of snapshots are left as they are, for the payload serialiser
+    of each client to convert, while every other value is made serialisable.
+
+    ...
+
+    Instance Attributes
+    -------------------
+    __snapshot : dict
+        The snapshot message as of the last message, holding its sequence number
+        (which is 0 before the first message) indexed by "sequence" and the engine
+        output indexed by "analytics".
+    __lock : Lock
+        The lock which stops two messages being encoded at the same time, which is
+        never held by clients reading the snapshot.
+    """
+
+    def __init__(self):
+        """
+        Initialises a new instance of this class.
+        """
+
+        self.__snapshot = {"sequence": 0, "analytics": {}}
+        self.__lock = Lock()
+
+    def encode_snapshot(self, engine_output):
+        """
+        Encodes a snapshot message of the given (full) engine output, e.g. after
+        every analytics time series has been recalculated.
+
+        Parameters
+        ----------
+        engine_output : dict
+            The engine output indexed by symbol and then by calculator ID.
+
+        Returns
+        -------
+            The snapshot message, holding the sequence number indexed by "sequence"
+            and the engine output indexed by "analytics".
+        """
+
+        snapshot = {
+            symbol: {
+                key: (
+                    AnalyticsDeltaEncoder.__to_snapshot_entry(value)
+                    if isinstance(value, dict)
+                    else Serialiser.to_serialisable(value)
+                )
+                for key, value in symbol_output.items()
+            }
+            for symbol, symbol_output in engine_output.items()
+        }
+
+        with self.__lock:
+            self.__snapshot = {
+                "sequence": self.__snapshot["sequence"] + 1,
+                "analytics": snapshot,
+            }
+
+            return self.__snapshot
+
+    def encode_delta(self, latest_engine_output):
+        """
+        Encodes a delta message of the values of the given latest tick engine
+        output which changed since the previous message.
+
+        Parameters
+        ----------
+        latest_engine_output : dict
+            The latest tick engine output indexed by symbol and then by calculator
+            ID, whose entries have no time series.
+
+        Returns
+        -------
+            The delta message, holding the sequence number indexed by "sequence"
+            and the changed values, indexed by symbol and then by calculator ID,
+            indexed by "analytics".
+        """
+
+        with self.__lock:
+            previous_snapshot = self.__snapshot["analytics"]
+            snapshot = dict(previous_snapshot)
+            changes = {}
+
+            for symbol, symbol_output in latest_engine_output.items():
+                symbol_snapshot = previous_snapshot.get(symbol, {})
+                symbol_changes = {}
+
+                for key, value in symbol_output.items():
+                    if isinstance(value, dict):
+                        entry_changes = self.__diff_entry(
+                            symbol_snapshot.get(key, {}), value
+                        )
+
+                        if entry_changes:
+                            symbol_changes[key] = entry_changes
+                    else:
+                        value = Serialiser.to_serialisable(value)
+
+                        if symbol_snapshot.get(key) != value:
+                            symbol_changes[key] = value
+
+                if symbol_changes:
+                    changes[symbol] = symbol_changes
+                    snapshot[symbol] = self.__apply_changes(
+                        symbol_snapshot, symbol_changes
+                    )
+
+            sequence = self.__snapshot["sequence"] + 1
+            self.__snapshot = {"sequence": sequence, "analytics": snapshot}
+
+            return {"sequence": sequence, "analytics": changes}
+
+    def snapshot(self):
+        """
+        Returns the snapshot message as of the last message, e.g. for a client
+        which has just connected, without waiting for the message being encoded.
+
+        Returns
+        -------
+            The snapshot message, holding the sequence number indexed by "sequence"
+            and the engine output indexed by "analytics", which must not be
+            modified.
+        """
+
+        return self.__snapshot
+
+    @staticmethod
+    def __to_snapshot_entry(entry):
+        """
+        Makes every value of the given analytics entry serialisable, except for
+        its time series.
+
+        Parameters
+        ----------
+        entry : dict
+            The analytics entry.
+
+        Returns
+        -------
+            The snapshot of the analytics entry.
+        """
+
+        return {
+            key: value if key == "time_series" else Serialiser.to_serialisable(value)
+            for key, value in entry.items()
+        }
+
+    @staticmethod
+    def __apply_changes(symbol_snapshot, symbol_changes):
+        """
+        Applies the changed values of a symbol to a copy of its snapshot, which
+        shares the entries that did not change.
+
+        Parameters
+        ----------
+        symbol_snapshot : dict
+            The symbol's engine output as of the last message.
+        symbol_changes : dict
+            The changed values of the symbol, indexed by calculator ID.
+
+        Returns
+        -------
+            The symbol's new engine output.
+        """
+
+        symbol_snapshot = dict(symbol_snapshot)
+
+        for key, value in symbol_changes.items():
+            symbol_snapshot[key] = (
+                {**symbol_snapshot.get(key, {}), **value}
+                if isinstance(value, dict)
+                else value
+            )
+
+        return symbol_snapshot
+
+    @staticmethod
+    def __diff_entry(entry_snapshot, entry):
+        """
+        Finds the values of the given analytics entry which changed since the
+        snapshot.
+
+        Parameters
+        ----------
+        entry_snapshot : dict
+            The analytics entry as of the last message.
+        entry : dict
+            The latest tick analytics entry.
+
+        Returns
+        -------
+            The dictionary of changed values, indexed by key.
+        """
+
+        entry_changes = {}
+
+        for key, value in entry.items():
+            # The latest tick leaves the time series as of the last snapshot.
+            if key == "time_series":
+                continue
+
+            value = Serialiser.to_serialisable(value)
+
+            if key not in entry_snapshot or entry_snapshot[key] != value:
+                entry_changes[key] = value
+
+        return entry_changes
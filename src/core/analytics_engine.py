@@ -1,7 +1,15 @@
 from datetime import datetime
+from threading import Lock
 import time
 
 from utils.logger import Logger
+from utils.metrics import Metrics
+
+from .analytics_delta_encoder import AnalyticsDeltaEncoder
+from .calculator_scheduler import CalculatorScheduler
+from .intermediate_cache import IntermediateCache
+from .payload_fingerprinter import PayloadFingerprinter
+from .serialised_snapshot import SerialisedSnapshot
 
 
 class AnalyticsEngine:
@@ -21,17 +29,59 @@ class AnalyticsEngine:
     ----------
     _logger : Logger
         The logger of this class.
+    __metrics : Metrics
+        The metrics which the latencies of each phase and calculator are recorded in.
     __lunar_crush_client : LunarCrushClient
         The client for the LunarCrush API.
     symbol_store: SymbolStore
         The symbol store
     calculators: AnalyticsCalculators[]
         The list of analytics calculators.
+    is_batched : bool
+        A flag which when set to `True` runs every calculator in batched mode, i.e.
+        over all symbols at once rather than symbol by symbol.
+    __total_z_score_calculator_ids : set
+        The IDs of the calculators whose z-scores are added to the total z-score
+        of each symbol.
+    __scheduler : CalculatorScheduler
+        The scheduler which runs the calculators in the order of their dependencies.
+    __intermediate_cache : IntermediateCache
+        The cache of intermediate values shared by every calculator, which is
+        cleared whenever the next tick arrives.
+    __delta_encoder : AnalyticsDeltaEncoder
+        The encoder of the snapshot and delta messages sent to web clients.
+    __payload_fingerprinter : PayloadFingerprinter
+        The fingerprinter of the symbols' data in each payload, which detects
+        polls that returned the same data as the previous one.
+    __is_latest_analytics_reusable : bool
+        A flag which when set to `False` makes the next tick recalculate the
+        latest analytics of every symbol rather than only of the changed ones,
+        e.g. after a tick failed half-way.
+    engine_output : dict
+        The engine output as of the last tick indexed by symbol and then by
+        calculator ID, which every tick replaces rather than modifies.
+    latest_message : dict
+        The message of the last tick, i.e. either a snapshot of the whole engine
+        output or a delta of the values which changed, as encoded by the delta
+        encoder, along with a flag indexed by "is_snapshot", or `None` if the last
+        tick's data did not change.
+    __serialised_snapshots : dict
+        The serialised snapshots of the last tick which were requested, indexed
+        by payload format name.
+    __serialised_snapshot_lock : Lock
+        The lock which stops a snapshot being serialised more than once.
     """
 
     update_lag = 60  # lag in seconds
 
-    def __init__(self, lunar_crush_client, symbol_store, calculators):
+    def __init__(
+        self,
+        lunar_crush_client,
+        symbol_store,
+        calculators,
+        is_batched=False,
+        max_workers=1,
+    ):
         """
         Initialises a new instance of this class.
 
@@ -39,15 +89,42 @@ class AnalyticsEngine:
         ----------
         lunar_crush_client : LynarCryshClient
             The client for the LunarCrysh API
-
+        symbol_store : SymbolStore
+            The symbol store.
+        calculators : AnalyticsCalculators[]
+            The list of analytics calculators.
+        is_batched : bool
+            A flag which when set to `True` runs every calculator in batched mode.
+        max_workers : int
+            The maximum number of calculators which run at the same time, where 1
+            runs them one after another.
         """
         self.__logger = Logger.get_instance()
+        self.__metrics = Metrics.get_instance()
         self.__lunar_crush_client = lunar_crush_client
         self.__calculator_ids = [calculator.id for calculator in calculators]
+        self.__total_z_score_calculator_ids = {
+            calculator.id
+            for calculator in calculators
+            if calculator.is_in_total_z_score
+        }
         self.__fundamantals_calculators = [
             calculator for calculator in calculators if calculator.is_fundamental
         ]
-        self.__calculators = {calculator.id: calculator for calculator in calculators}
+        self.__scheduler = CalculatorScheduler(calculators, max_workers)
+
+        self.__intermediate_cache = IntermediateCache()
+        self.__delta_encoder = AnalyticsDeltaEncoder()
+        self.__payload_fingerprinter = PayloadFingerprinter(
+            [
+                calculator.fundamental_id
+                for calculator in self.__fundamantals_calculators
+            ]
+        )
+
+        for calculator in calculators:
+            calculator.is_batched = is_batched
+            calculator.intermediate_cache = self.__intermediate_cache
 
         self.__symbol_store = symbol_store
 
@@ -57,7 +134,11 @@ class AnalyticsEngine:
         self.__raw_asset_data = None
         self.analytics_data = {}
         self.engine_output = {}
+        self.latest_message = None
+        self.__serialised_snapshots = {}
+        self.__serialised_snapshot_lock = Lock()
         self.__last_update_time = None
+        self.__is_latest_analytics_reusable = True
 
     def initialise(self):
         """
@@ -74,90 +155,310 @@ class AnalyticsEngine:
 
         self.__logger.log("Initialising analytics engine!")
 
-        self.__update_raw_asset_data()
+        raw_asset_data = self.__fetch_raw_asset_data()
+        self.__apply_raw_asset_data(raw_asset_data)
 
         self.__generate_analytics()
+        self.__encode_message(is_snapshot=True)
+        self.__payload_fingerprinter.commit(
+            self.__payload_fingerprinter.fingerprint(raw_asset_data)
+        )
+        self.__metrics.increment(Metrics.ticks, labels=(("kind", "full"),))
 
         self.__is_initialised = True
 
-    def update(self):
+    def fetch_update(self, update_time=None):
+        """
+        Fetches the data of an update from the LunarCrush API, e.g. ahead of the
+        update's scheduled time while the previous update is still running.
+
+        Parameters
+        ----------
+        update_time : double
+            The epoch time (in seconds) of the update, which defaults to now.
+
+        Returns
+        -------
+            The prefetched update, i.e. a tuple of the update time, of a flag which
+            is set to `True` if the update is on the next day (and so rolls every
+            time series over to the new bar) and of the raw asset data.
+        """
+
+        if update_time is None:
+            update_time = datetime.timestamp(datetime.now())
+
+        day_in_seconds = 24 * 60 * 60
+
+        self.__logger.log("Polling LunarCrush API to see if there's any fresh data.")
+
+        is_next_day = update_time - self.__latest_time >= day_in_seconds
+
+        # The bars of the next day are merged into the stored history, so only
+        # the last few of them are needed.
+        num_datapoints = 5 if is_next_day else 100
+
+        return update_time, is_next_day, self.__fetch_raw_asset_data(num_datapoints)
+
+    def update(self, prefetched_update=None, on_applied=None):
         """
         Update increment in the analytics engine lifecycle, which is supposed to be run in a infinite loop that
         periodically polls the LunarCrushAPI for new data.
+
+        Nothing is generated (and `latest_message` is `None`) if the data of every
+        symbol is the same as in the previous update, unless the update is on the
+        next day, in which case every time series is rolled over to the new bar
+        rather than recalculated. Otherwise only the latest analytics of the
+        symbols whose data changed are recalculated.
+
+        Parameters
+        ----------
+        prefetched_update : tuple
+            The update returned by `fetch_update`, which is fetched now if `None`.
+        on_applied : func
+            Function without parameters which is called once the update's raw
+            asset data has replaced the previous one, but before the analytics are
+            generated, e.g. to start prefetching the next update.
         """
 
         if not self.__is_initialised:
             self.__logger.log("Initialising engine before running the update method.")
             self.initialise()
 
-        day_in_seconds = 24 * 60 * 60
+        if prefetched_update is None:
+            prefetched_update = self.fetch_update()
 
-        self.__logger.log("Polling LunarCrush API to see if there's any fresh data.")
+        current_time, is_next_day, raw_asset_data = prefetched_update
 
-        current_time = datetime.timestamp(datetime.now())
-        is_next_day = current_time - self.__latest_time >= day_in_seconds
+        fingerprints = self.__payload_fingerprinter.fingerprint(raw_asset_data)
+        changed_symbols = self.__payload_fingerprinter.changed_symbols(fingerprints)
+        self.__apply_raw_asset_data(raw_asset_data)
 
-        num_datapoints = 5 if is_next_day else 100
+        if on_applied is not None:
+            on_applied()
 
-        generate = (
-            self.__generate_analytics
-            if is_next_day
-            else self.__generate_latest_analytics
-        )
-        self.__update_raw_asset_data(num_datapoints)
+        if not is_next_day and not changed_symbols:
+            self.__logger.log(
+                "Skipping the update as no symbol's data changed since the last one."
+            )
+            self.latest_message = None
+            self.__metrics.increment(Metrics.ticks, labels=(("kind", "unchanged"),))
+            self.__last_update_time = current_time
+
+            return {}
 
-        self.__logger.log("Generating analytics for the requested update.")
+        self.__logger.log(
+            "Generating analytics for the requested update, where the data of {} symbols changed.",
+            len(changed_symbols),
+        )
 
-        analytics = generate()
+        try:
+            analytics = (
+                self.__roll_over_analytics()
+                if is_next_day
+                else self.__generate_latest_analytics(
+                    changed_symbols if self.__is_latest_analytics_reusable else None
+                )
+            )
+        except Exception:
+            # A failed tick may have recalculated the latest analytics of some
+            # calculators only, so every symbol is recalculated on the next one.
+            self.__is_latest_analytics_reusable = False
+            self.__metrics.increment(Metrics.errors, labels=(("phase", "generate"),))
+            raise
+
+        self.__is_latest_analytics_reusable = True
+
+        self.__encode_message(is_snapshot=is_next_day, analytics=analytics)
+        self.__payload_fingerprinter.commit(fingerprints)
+        self.__metrics.increment(
+            Metrics.ticks,
+            labels=(("kind", "roll_over" if is_next_day else "latest"),),
+        )
         self.__last_update_time = current_time
 
         return analytics
 
-    def __generate_analytics(self):
+    def snapshot(self):
+        """
+        Returns the snapshot message of the whole engine output as of the last
+        tick, e.g. for a web client which has just connected or which missed a delta,
+        without waiting for the tick being generated.
+
+        Returns
+        -------
+            The snapshot message, holding the sequence number indexed by "sequence"
+            and the engine output indexed by "analytics", which must not be
+            modified.
+        """
+
+        return self.__delta_encoder.snapshot()
+
+    def serialised_snapshot(self, payload_serialiser):
+        """
+        Returns the snapshot of the whole engine output as of the last tick,
+        serialised only once per tick and format however many times it's requested.
+
+        Parameters
+        ----------
+        payload_serialiser : PayloadSerialiser
+            The serialiser of the format requested.
+
+        Returns
+        -------
+            The serialised snapshot.
+        """
+
+        format_name = payload_serialiser.format_name
+
+        # The snapshot is read once, so its sequence number matches its analytics
+        # even if the next tick publishes a new one meanwhile.
+        snapshot = self.__delta_encoder.snapshot()
+        serialised_snapshot = self.__serialised_snapshots.get(format_name)
+
+        if (
+            serialised_snapshot is not None
+            and serialised_snapshot.sequence == snapshot["sequence"]
+        ):
+            return serialised_snapshot
+
+        with self.__serialised_snapshot_lock:
+            serialised_snapshot = self.__serialised_snapshots.get(format_name)
+
+            if (
+                serialised_snapshot is None
+                or serialised_snapshot.sequence != snapshot["sequence"]
+            ):
+                with self.__metrics.time(
+                    Metrics.phase_latency, (("phase", "serialise"),)
+                ):
+                    serialised_snapshot = SerialisedSnapshot(
+                        snapshot["sequence"], snapshot["analytics"], payload_serialiser
+                    )
+
+                self.__serialised_snapshots[format_name] = serialised_snapshot
+
+            return serialised_snapshot
+
+    def __encode_message(self, is_snapshot, analytics=None):
+        """
+        Encodes the message of the tick for web clients.
+
+        Parameters
+        ----------
+        is_snapshot : bool
+            A flag which when set to `True` encodes a snapshot of the whole engine
+            output, rather than a delta of the given latest tick analytics.
+        analytics : dict
+            The latest tick engine output, for deltas.
+        """
+
+        with self.__metrics.time(Metrics.phase_latency, (("phase", "encode"),)):
+            if is_snapshot:
+                message = self.__delta_encoder.encode_snapshot(self.engine_output)
+            else:
+                message = self.__delta_encoder.encode_delta(analytics)
+
+        self.latest_message = {**message, "is_snapshot": is_snapshot}
+
+    def __generate_analytics(self, is_rolled_over=False):
         """
         Runs all calculators over the price data fetched from the LunarCrysh API, and then packages the
         results
 
+        Parameters
+        ----------
+        is_rolled_over : bool
+            A flag which when set to `True` rolls every calculator over to the next
+            day's bar rather than calculating it over the whole history.
+
         Returns
         -------
             A dictionary keyed by symbol containing all the generated anlaytics.
         """
 
-        fundamentals_data = {
-            calculator.id: calculator.calculate(self.__raw_asset_data)
-            for calculator in self.__fundamantals_calculators
-        }
+        self.__intermediate_cache.clear()
+        mode = "roll_over" if is_rolled_over else "calculate"
+
+        def calculate(calculator, analytics_data):
+            fundamental_data = (
+                self.__raw_asset_data
+                if calculator.is_fundamental
+                else analytics_data[calculator.fundamental_id]
+            )
+
+            with self.__metrics.time(
+                Metrics.calculator_latency,
+                (("calculator", calculator.id), ("mode", mode)),
+            ):
+                if is_rolled_over:
+                    return calculator.roll_over(fundamental_data)
+
+                return calculator.calculate(fundamental_data)
+
+        analytics_data = self.__scheduler.run(calculate)
+        assembly_start_time = time.perf_counter()
 
         self.analytics_data = {
-            calculator.id: fundamentals_data[calculator.id]
-            if calculator.is_fundamental
-            else calculator.calculate(fundamentals_data[f"{calculator.fundamental_id}"])
-            for calculator in self.__calculators.values()
+            calculator_id: analytics_data[calculator_id]
+            for calculator_id in self.__calculator_ids
         }
 
+        engine_output = {}
+
         for symbol in self.__symbol_store.symbols:
             total_z_score = 0
-            self.engine_output[symbol] = {}
+            engine_output[symbol] = {}
 
             for calculator_id in self.__calculator_ids:
-                self.engine_output[symbol][calculator_id] = self.analytics_data[
+                engine_output[symbol][calculator_id] = self.analytics_data[
                     calculator_id
                 ][symbol]
 
-                total_z_score += abs(
-                    self.engine_output[symbol][calculator_id]["last_z_score"]
-                )
+                if calculator_id in self.__total_z_score_calculator_ids:
+                    total_z_score += abs(
+                        engine_output[symbol][calculator_id]["last_z_score"]
+                    )
 
-            self.engine_output[symbol]["name"] = self.__symbol_store.symbol_map[symbol]
-            self.engine_output[symbol]["total_z_score"] = total_z_score
+            engine_output[symbol]["name"] = self.__symbol_store.symbol_map[symbol]
+            engine_output[symbol]["total_z_score"] = total_z_score
+
+        # The engine output is replaced rather than modified, so it's never read
+        # half-updated.
+        self.engine_output = engine_output
+
+        self.__metrics.observe(
+            Metrics.phase_latency,
+            time.perf_counter() - assembly_start_time,
+            (("phase", "assemble"),),
+        )
 
         return self.engine_output
 
-    def __generate_latest_analytics(self):
+    def __roll_over_analytics(self):
+        """
+        Rolls all calculators over to the bar of the next day fetched from the
+        LunarCrysh API, which is appended to the stored history, and then packages
+        the results
+
+        Returns
+        -------
+            A dictionary keyed by symbol containing all the generated anlaytics.
+        """
+
+        return self.__generate_analytics(is_rolled_over=True)
+
+    def __generate_latest_analytics(self, changed_symbols=None):
         """
         Runs all calculators over the latest (tick) price data fetched from the LunarCrysh API, and then packages the
         results
 
+        Parameters
+        ----------
+        changed_symbols : set
+            The symbols whose data changed since the previous tick, which are the
+            only ones the calculators recalculate (but for the correlations with a
+            changed benchmark symbol), or `None` to recalculate every symbol.
+
         Returns
         -------
             A dictionary keyed by symbol containing all the generated anlaytics for the latest tick fundamentals.
@@ -174,12 +475,19 @@ class AnalyticsEngine:
             for datum in self.__raw_asset_data["data"]
         }
 
+        self.__intermediate_cache.clear()
+
         # Get all the latest analytics, including
         # those from the price calculator
-        latest_analytics = {
-            calculator.id: calculator.calculate_latest(latest_fundamentals)
-            for calculator in self.__calculators.values()
-        }
+        def calculate_latest(calculator, _):
+            with self.__metrics.time(
+                Metrics.calculator_latency,
+                (("calculator", calculator.id), ("mode", "calculate_latest")),
+            ):
+                return calculator.calculate_latest(latest_fundamentals, changed_symbols)
+
+        latest_analytics = self.__scheduler.run(calculate_latest)
+        assembly_start_time = time.perf_counter()
 
         latest_engine_output = {
             symbol: {
@@ -189,44 +497,84 @@ class AnalyticsEngine:
             for symbol in self.__symbol_store.symbols
         }
 
-        # Update the local cache for the engine output.
-        # Calculate total z-score values for both the
+        # Build a new engine output from the previous one and the latest values,
+        # which replaces it rather than modifying it so it's never read
+        # half-updated. Calculate total z-score values for both the
         # engine output and latest engine output objects.
+        engine_output = {}
+
         for symbol in self.__symbol_store.symbols:
             total_z_score = 0
+            symbol_output = dict(self.engine_output[symbol])
 
             for calculator_id in self.__calculator_ids:
-                z_score = latest_engine_output[symbol][calculator_id][f"last_z_score"]
-
-                self.engine_output[symbol][calculator_id][
-                    f"last_{calculator_id}"
-                ] = latest_engine_output[symbol][calculator_id][f"last_{calculator_id}"]
-                self.engine_output[symbol][calculator_id]["last_z_score"] = z_score
+                latest_entry = latest_engine_output[symbol][calculator_id]
+                z_score = latest_entry["last_z_score"]
+
+                # Merge every latest value (e.g. `last_{calculator_id}` and
+                # `last_z_score`) but keep the full history time series.
+                symbol_output[calculator_id] = {
+                    **symbol_output[calculator_id],
+                    **{
+                        key: value
+                        for key, value in latest_entry.items()
+                        if key != "time_series"
+                    },
+                }
+
+                if calculator_id in self.__total_z_score_calculator_ids:
+                    total_z_score += abs(z_score)
+
+            symbol_output["total_z_score"] = total_z_score
+            engine_output[symbol] = symbol_output
+            latest_engine_output[symbol]["total_z_score"] = total_z_score
 
-                total_z_score += abs(z_score)
+        self.engine_output = engine_output
 
-            self.engine_output[symbol]["total_z_score"] = total_z_score
-            latest_engine_output[symbol]["total_z_score"] = total_z_score
+        self.__metrics.observe(
+            Metrics.phase_latency,
+            time.perf_counter() - assembly_start_time,
+            (("phase", "assemble"),),
+        )
 
         return latest_engine_output
 
-    def __update_raw_asset_data(self, num_datapoints=100):
+    def __fetch_raw_asset_data(self, num_datapoints=100):
         """
-        Updates stale data in raw asset data cache with fresh data from the Lunar Crush API.
+        Fetches fresh raw asset data from the Lunar Crush API.
 
         Parameters
         ----------
         num_datapoints : int
             The number of raw asset datapoints to fetch from the LunarCrush API.
+
+        Returns
+        -------
+            The raw asset data.
+        """
+
+        try:
+            with self.__metrics.time(Metrics.phase_latency, (("phase", "fetch"),)):
+                return self.__lunar_crush_client.fetch_asset_data(num_datapoints)
+        except Exception:
+            self.__metrics.increment(Metrics.errors, labels=(("phase", "fetch"),))
+            raise
+
+    def __apply_raw_asset_data(self, raw_asset_data):
+        """
+        Replaces stale data in the raw asset data cache with the given fresh data.
+
+        Parameters
+        ----------
+        raw_asset_data : dict
+            The raw asset data fetched from the LunarCrush API.
         """
 
         self.__logger.log(
             "Replacing stale data in raw asset data cache with fresh data from the API"
         )
 
-        self.__raw_asset_data = self.__lunar_crush_client.fetch_asset_data(
-            num_datapoints
-        )
+        self.__raw_asset_data = raw_asset_data
         raw_time_series = self.__raw_asset_data["data"][0]["timeSeries"]
         self.__earliest_time = raw_time_series[0]["time"]
         self.__latest_time = raw_time_series[-1]["time"]
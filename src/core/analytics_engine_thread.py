@@ -1,7 +1,11 @@
+from concurrent.futures import ThreadPoolExecutor
 from threading import Thread
 import time
 
 from utils.logger import Logger
+from utils.metrics import Metrics
+
+from .tick_scheduler import TickScheduler
 
 
 class AnalyticsEngineThread(Thread):
@@ -12,15 +16,29 @@ class AnalyticsEngineThread(Thread):
 
     Instance Attributes
     -------------------
+    __metrics : Metrics
+        The metrics which the latencies of emission are recorded in.
     __socket_io : obj
         The SocketIO object
     __analytics_engine : obj
         The analytics engine
     __engine_thread_stop_event : obj
         The stop event for the engine thread.
+    __client_registry : ClientRegistry
+        The registry of the connected clients, of their payload formats and of
+        their subscriptions.
+    __payload_serialisers : dict
+        The payload serialisers indexed by format name.
     """
 
-    def __init__(self, socket_io, analytics_engine, engine_thread_stop_event):
+    def __init__(
+        self,
+        socket_io,
+        analytics_engine,
+        engine_thread_stop_event,
+        client_registry,
+        payload_serialisers,
+    ):
         """
         Initialises the engine thread.
 
@@ -32,33 +50,183 @@ class AnalyticsEngineThread(Thread):
             The analytics engine
         engine_thread_stop_event : obj
             The stop event for the engine thread.
+        client_registry : ClientRegistry
+            The registry of the connected clients, of their payload formats and of
+            their subscriptions.
+        payload_serialisers : dict
+            The payload serialisers indexed by format name.
         """
 
         super(AnalyticsEngineThread, self).__init__()
 
         self.__logger = Logger.get_instance()
+        self.__metrics = Metrics.get_instance()
         self.__socket_io = socket_io
         self.__analytics_engine = analytics_engine
         self.__engine_thread_stop_event = engine_thread_stop_event
+        self.__client_registry = client_registry
+        self.__payload_serialisers = payload_serialisers
 
     def run(self):
         """
-        Runs the analytics engine thread.
+        Runs the analytics engine thread, which updates the analytics engine on
+        the tick boundaries of its schedule, while the data of each tick is
+        prefetched as the previous tick's analytics are being generated and sent.
         """
 
         self.__logger.log("Starting Analytics Engine Thread.")
+        scheduler = TickScheduler(self.__analytics_engine.update_lag)
+        prefetch_executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="prefetch"
+        )
+        tick_time = scheduler.next_tick_time(time.time())
+        prefetch = None
         i = 1
 
         while not self.__engine_thread_stop_event.is_set():
-            lag = self.__analytics_engine.update_lag
+            wait = max(tick_time - time.time(), 0.0)
+            self.__logger.log(
+                "Waiting {:.3f} seconds before updating analytics engine.", wait
+            )
+
+            if self.__engine_thread_stop_event.wait(wait):
+                break
+
+            lag = max(time.time() - tick_time, 0.0)
+            self.__metrics.observe(Metrics.tick_lag, lag)
+            prefetched_update = self.__take_prefetched_update(prefetch, tick_time)
+            prefetch = None
+            next_tick_time = tick_time + scheduler.period
+
+            def prefetch_next_update():
+                nonlocal prefetch
+                prefetch = (
+                    next_tick_time,
+                    prefetch_executor.submit(
+                        self.__prefetch_update, scheduler, next_tick_time
+                    ),
+                )
+
             self.__logger.log(
-                f"Waiting {lag} seconds before updating analytics engine."
+                "Updating engine for the {}th time, {:.3f} seconds after its tick.",
+                i,
+                lag,
             )
-            time.sleep(lag)
 
-            self.__logger.log(f"Updating engine for the {i}th time.")
-            analytics = self.__analytics_engine.update()
+            # A failed tick is counted by the engine and the next one is still run.
+            try:
+                self.__analytics_engine.update(prefetched_update, prefetch_next_update)
+                self.__emit_latest_message()
+            except Exception as error:
+                self.__logger.error("Failed to update analytics engine: {}", error)
+
+            tick_time, num_skipped = scheduler.advance(tick_time, time.time())
+
+            if num_skipped > 0:
+                self.__metrics.increment(Metrics.skipped_ticks, num_skipped)
+                self.__logger.warning(
+                    "Skipping {} ticks as the analytics engine is running behind.",
+                    num_skipped,
+                )
 
-            self.__logger.log(f"Sending latest engine output to clients.")
-            self.__socket_io.emit("fresh_analytics", {"analytics": analytics})
             i += 1
+
+        prefetch_executor.shutdown(wait=False)
+
+    def __prefetch_update(self, scheduler, tick_time):
+        """
+        Prefetches the data of the given tick, waiting until the scheduler's
+        prefetch time first.
+
+        Parameters
+        ----------
+        scheduler : TickScheduler
+            The schedule of the ticks.
+        tick_time : double
+            The epoch time (in seconds) of the tick.
+
+        Returns
+        -------
+            The prefetched update, or `None` if the thread was stopped.
+        """
+
+        wait = max(scheduler.prefetch_time(tick_time) - time.time(), 0.0)
+
+        if self.__engine_thread_stop_event.wait(wait):
+            return None
+
+        start_time = time.perf_counter()
+        prefetched_update = self.__analytics_engine.fetch_update(tick_time)
+        scheduler.record_fetch_latency(time.perf_counter() - start_time)
+
+        return prefetched_update
+
+    def __take_prefetched_update(self, prefetch, tick_time):
+        """
+        Returns the update prefetched for the given tick, waiting for it if it is
+        still being fetched.
+
+        Parameters
+        ----------
+        prefetch : tuple
+            The epoch time (in seconds) of the tick the update is prefetched for
+            and the future of the prefetched update, or `None` if there is none.
+        tick_time : double
+            The epoch time (in seconds) of the tick.
+
+        Returns
+        -------
+            The prefetched update, or `None` if there is none, if it failed or if
+            it was prefetched for a tick which has been skipped, in which case the
+            engine fetches the update itself.
+        """
+
+        if prefetch is None:
+            return None
+
+        prefetch_tick_time, future = prefetch
+
+        # The update of a skipped tick is stale, so it is not waited for.
+        if prefetch_tick_time != tick_time:
+            future.cancel()
+            return None
+
+        try:
+            return future.result()
+        except Exception as error:
+            self.__logger.warning("Failed to prefetch the next update: {}", error)
+            return None
+
+    def __emit_latest_message(self):
+        """
+        Sends the message of the latest tick to every room of clients.
+        """
+
+        # Clients apply deltas to the snapshot they were sent on registering.
+        message = self.__analytics_engine.latest_message
+
+        # Nothing is sent when the tick's data did not change.
+        if message is None:
+            return
+
+        event = "analytics_snapshot" if message["is_snapshot"] else "analytics_delta"
+
+        self.__logger.log("Sending {} {} to clients.", event, message["sequence"])
+
+        # The message is filtered and serialised once per room rather than once
+        # per client, and rooms whose analytics did not change still get it so
+        # their clients see every sequence number.
+        with self.__metrics.time(Metrics.phase_latency, (("phase", "emit"),)):
+            for room, (
+                format_name,
+                subscription,
+            ) in self.__client_registry.rooms().items():
+                payload = {
+                    "sequence": message["sequence"],
+                    "analytics": subscription.filter(message["analytics"]),
+                }
+                self.__socket_io.emit(
+                    event,
+                    self.__payload_serialisers[format_name].to_message(payload),
+                    to=room,
+                )
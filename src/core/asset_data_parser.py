@@ -0,0 +1,200 @@
+from threading import Lock
+
+import numpy as np
+
+from core.time_series_store import TimeSeriesStore
+from utils.logger import Logger
+from utils.metrics import Metrics
+
+
+class AssetDataParser:
+    """
+    Represents the ingest stage which parses a LunarCrush asset data payload once
+    for all fundamental calculators, filling the time series of every fundamental
+    (i.e. price, volume and market cap) of every symbol, which share one int64
+    epoch time axis.
+
+    ...
+
+    Class Attributes
+    ----------------
+    fundamental_fields : dict
+        The payload field of each fundamental's time series, indexed by
+        fundamental ID.
+
+    Instance Attributes
+    -------------------
+    _logger : Logger
+        The logger of this class.
+    _store : TimeSeriesStore
+        The store which the fundamental time series are written to.
+    __metrics : Metrics
+        The metrics which the parsing latency is recorded in.
+    __asset_data : dict
+        The asset data payload which was last parsed.
+    __lock : Lock
+        The lock which stops fundamental calculators running on several threads
+        from parsing the same payload more than once.
+    """
+
+    __instance = None
+
+    fundamental_fields = {
+        "price": "close",
+        "volume": "volume",
+        "market_cap": "market_cap",
+    }
+
+    def __init__(self):
+        """
+        Initialises a new instance of this class.
+        """
+
+        self._logger = Logger.get_instance()
+        self._store = TimeSeriesStore.get_instance()
+        self.__metrics = Metrics.get_instance()
+        self.__asset_data = None
+        self.__lock = Lock()
+
+        if AssetDataParser.__instance is not None:
+            raise Exception("AssetDataParser class is a Singleton!")
+        else:
+            AssetDataParser.__instance = self
+
+    @staticmethod
+    def get_instance():
+        """
+        Returns the single instance of this AssetDataParser class.
+        """
+
+        if AssetDataParser.__instance is None:
+            AssetDataParser()
+
+        return AssetDataParser.__instance
+
+    def parse(self, asset_data):
+        """
+        Parses the given asset data payload into the time series store, unless it
+        has already been parsed, where the last value of each fundamental time
+        series is replaced with the symbol's latest fundamental.
+
+        Parameters
+        ----------
+        asset_data : dict
+            API time_series data dictionary where relevant information
+            is indexed by the keyword "data".
+        """
+
+        self.__parse(asset_data, is_rolled_over=False)
+
+    def roll_over(self, asset_data):
+        """
+        Parses the given asset data payload of the next day into the time series
+        store like `parse`, except that the bars of the payload are merged into the
+        stored time series rather than replacing them, so their history is kept.
+
+        The stored bars from the payload's first bar onwards (e.g. the bar of the
+        previous day, which has since closed) are replaced with the payload's bars.
+
+        Parameters
+        ----------
+        asset_data : dict
+            API time_series data dictionary where relevant information
+            is indexed by the keyword "data".
+        """
+
+        self.__parse(asset_data, is_rolled_over=True)
+
+    def __parse(self, asset_data, is_rolled_over):
+        """
+        Parses the given asset data payload into the time series store, unless it
+        has already been parsed.
+
+        Parameters
+        ----------
+        asset_data : dict
+            API time_series data dictionary where relevant information
+            is indexed by the keyword "data".
+        is_rolled_over : bool
+            A flag which when set to `True` merges the payload's bars into the
+            stored time series.
+        """
+
+        with self.__lock:
+            if asset_data is self.__asset_data:
+                return
+
+            self._logger.log("Parsing the fundamentals of all symbols.")
+
+            with self.__metrics.time(Metrics.phase_latency, (("phase", "parse"),)):
+                for datum in asset_data["data"]:
+                    self.__parse_datum(datum, is_rolled_over)
+
+            self.__asset_data = asset_data
+
+    def __parse_datum(self, datum, is_rolled_over):
+        """
+        Parses the time series of every fundamental of a symbol into the time
+        series store.
+
+        Parameters
+        ----------
+        datum : dict
+            The asset data of a symbol, whose bars are indexed by "timeSeries".
+        is_rolled_over : bool
+            A flag which when set to `True` merges the symbol's bars into its
+            stored time series.
+        """
+
+        symbol = datum["symbol"]
+        bars = datum["timeSeries"]
+
+        # The time axis is parsed once and shared by every fundamental.
+        times = np.array([bar["time"] for bar in bars], dtype=np.int64)
+
+        for fundamental_id, field in AssetDataParser.fundamental_fields.items():
+            # `None` values become NaN.
+            values = np.array([bar[field] for bar in bars], dtype=np.float64)
+            values[-1] = np.array(datum[fundamental_id], dtype=np.float64)
+
+            if is_rolled_over:
+                merged_times, values = self.__merge(
+                    fundamental_id, symbol, times, values
+                )
+            else:
+                merged_times = times
+
+            self._store.write(fundamental_id, symbol, merged_times, values)
+
+    def __merge(self, fundamental_id, symbol, times, values):
+        """
+        Merges the given bars into the stored time series of a fundamental, keeping
+        the stored bars which precede them.
+
+        Parameters
+        ----------
+        fundamental_id : str
+            The ID of the fundamental, e.g. "price".
+        symbol : str
+            The asset symbol.
+        times : np.ndarray
+            The epoch timestamps (in seconds) of the bars.
+        values : np.ndarray
+            The values of the bars.
+
+        Returns
+        -------
+            The merged timestamps and values.
+        """
+
+        try:
+            time_series = self._store.read(fundamental_id, symbol)
+        except KeyError:
+            return times, values
+
+        num_kept = np.searchsorted(time_series.times, times[0])
+
+        return (
+            np.concatenate([time_series.times[:num_kept], times]),
+            np.concatenate([time_series.values[:num_kept], values]),
+        )
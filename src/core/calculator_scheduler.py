@@ -0,0 +1,168 @@
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from utils.logger import Logger
+
+
+class CalculatorScheduler:
+    """
+    Represents a scheduler which runs analytics calculators in the order of the
+    dependency DAG they declare, i.e. a calculator only runs once every calculator
+    it depends on has finished. Independent calculators run concurrently on a
+    thread pool, so the time taken is that of the DAG's critical path rather than
+    the sum of every calculator's time.
+
+    Calculators only run in parallel on native threads, where NumPy releases the
+    GIL. When gevent patches the standard library (e.g. under the
+    `GeventWebSocketWorker`), the threads of the pool become greenlets which run
+    the CPU-bound calculators one after another, so the service runs them on the
+    calling thread instead.
+
+    ...
+
+    Instance Attributes
+    -------------------
+    _logger : Logger
+        The logger of this class.
+    max_workers : int
+        The maximum number of calculators which run at the same time.
+    __calculators : dict
+        The calculators indexed by ID, in topological order.
+    __dependents : dict
+        The IDs of the calculators depending on each calculator, indexed by ID.
+    __executor : ThreadPoolExecutor
+        The thread pool the calculators run on, or `None` if they run one after
+        another on the calling thread.
+    """
+
+    def __init__(self, calculators, max_workers=1):
+        """
+        Initialises a new instance of this class.
+
+        Parameters
+        ----------
+        calculators : AnalyticsCalculators[]
+            The list of analytics calculators, each of which lists the IDs of the
+            calculators it depends on in `dependencies`.
+        max_workers : int
+            The maximum number of calculators which run at the same time, where 1
+            runs them one after another on the calling thread. Values above 1 only
+            help on native (i.e. not gevent-patched) threads.
+        """
+
+        self._logger = Logger.get_instance()
+        self.max_workers = max_workers
+
+        calculators_by_id = {calculator.id: calculator for calculator in calculators}
+        self.__dependents = {calculator.id: [] for calculator in calculators}
+
+        for calculator in calculators:
+            for dependency in calculator.dependencies:
+                if dependency not in calculators_by_id:
+                    raise Exception(
+                        f"The {calculator.id} calculator depends on the unknown calculator '{dependency}'."
+                    )
+
+                self.__dependents[dependency].append(calculator.id)
+
+        self.__calculators = {
+            calculator_id: calculators_by_id[calculator_id]
+            for calculator_id in self.__sort_topologically(calculators_by_id)
+        }
+        self.__executor = (
+            ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="calculator")
+            if max_workers > 1
+            else None
+        )
+
+    def run(self, task):
+        """
+        Runs the given task on every calculator, where a calculator's task only
+        starts once the tasks of all its dependencies have finished.
+
+        Parameters
+        ----------
+        task : func
+            Function taking a calculator and the dictionary of the results of the
+            finished tasks (indexed by calculator ID), and returning the result of
+            the calculator's task.
+
+        Returns
+        -------
+            The dictionary of the results of every task, indexed by calculator ID.
+        """
+
+        results = {}
+
+        if self.__executor is None:
+            for calculator_id, calculator in self.__calculators.items():
+                results[calculator_id] = task(calculator, results)
+
+            return results
+
+        num_pending_dependencies = {
+            calculator_id: len(calculator.dependencies)
+            for calculator_id, calculator in self.__calculators.items()
+        }
+        futures = {
+            self.__executor.submit(task, calculator, results): calculator_id
+            for calculator_id, calculator in self.__calculators.items()
+            if num_pending_dependencies[calculator_id] == 0
+        }
+
+        while futures:
+            finished_futures, _ = wait(futures, return_when=FIRST_COMPLETED)
+
+            for future in finished_futures:
+                calculator_id = futures.pop(future)
+                results[calculator_id] = future.result()
+
+                for dependent_id in self.__dependents[calculator_id]:
+                    num_pending_dependencies[dependent_id] -= 1
+
+                    if num_pending_dependencies[dependent_id] == 0:
+                        dependent = self.__calculators[dependent_id]
+                        futures[self.__executor.submit(task, dependent, results)] = (
+                            dependent_id
+                        )
+
+        return results
+
+    def __sort_topologically(self, calculators_by_id):
+        """
+        Sorts the calculators so that each calculator comes after the calculators
+        it depends on, keeping the given order otherwise.
+
+        Parameters
+        ----------
+        calculators_by_id : dict
+            The calculators indexed by ID.
+
+        Returns
+        -------
+            The list of calculator IDs in topological order.
+        """
+
+        sorted_ids = []
+        visiting_ids = set()
+
+        def visit(calculator_id):
+            if calculator_id in sorted_ids:
+                return
+
+            if calculator_id in visiting_ids:
+                raise Exception(
+                    f"The calculator dependencies contain a cycle through the {calculator_id} calculator."
+                )
+
+            visiting_ids.add(calculator_id)
+
+            for dependency in calculators_by_id[calculator_id].dependencies:
+                visit(dependency)
+
+            visiting_ids.remove(calculator_id)
+            sorted_ids.append(calculator_id)
+
+        for calculator_id in calculators_by_id:
+            visit(calculator_id)
+
+        return sorted_ids
@@ -0,0 +1,272 @@
+from threading import Lock
+
+from .subscription import Subscription
+
+
+class ClientRegistry:
+    """
+    Represents the registry of the web clients connected to the Coinarius
+    WebSocket service, of the payload format each of them selected when it
+    registered and of the symbols and calculators each of them subscribed to.
+
+    Clients with the same format and subscription share a SocketIO room, so
+    every message is filtered and serialised once per room rather than once per
+    client.
+
+    ...
+
+    Instance Attributes
+    -------------------
+    default_format_name : str
+        The format of clients which do not select one.
+    symbols : str[]
+        Every symbol which can be subscribed to.
+    calculator_ids : str[]
+        Every calculator ID which can be subscribed to.
+    __clients : dict
+        The format name and subscription of each client, indexed by client (i.e.
+        session) ID.
+    __lock : Lock
+        The lock which keeps the registry consistent when clients register while
+        the engine thread reads it.
+    """
+
+    def __init__(self, default_format_name, symbols, calculator_ids):
+        """
+        Initialises a new instance of this class.
+
+        Parameters
+        ----------
+        default_format_name : str
+            The format of clients which do not select one.
+        symbols : str[]
+            Every symbol which can be subscribed to.
+        calculator_ids : str[]
+            Every calculator ID which can be subscribed to.
+        """
+
+        self.default_format_name = default_format_name
+        self.symbols = list(symbols)
+        self.calculator_ids = list(calculator_ids)
+        self.__clients = {}
+        self.__lock = Lock()
+
+    @staticmethod
+    def room(format_name, subscription):
+        """
+        Returns the name of the SocketIO room of the clients of the given format
+        and subscription.
+
+        Parameters
+        ----------
+        format_name : str
+            The format name, e.g. "json".
+        subscription : Subscription
+            The subscription.
+
+        Returns
+        -------
+            The room name.
+        """
+
+        return f"analytics/{format_name}/{subscription.key}"
+
+    def register(self, client_id, format_name=None):
+        """
+        Registers a client along with its format, where a new client is
+        subscribed to every symbol and every calculator.
+
+        Parameters
+        ----------
+        client_id : str
+            The client (i.e. session) ID.
+        format_name : str
+            The format name, or `None` for the default format.
+
+        Returns
+        -------
+            The rooms the client leaves and joins, where the room it leaves is
+            `None` for a new client.
+        """
+
+        format_name = format_name or self.default_format_name
+
+        with self.__lock:
+            client = self.__clients.get(client_id)
+            subscription = Subscription() if client is None else client[1]
+
+            return self.__update(client_id, format_name, subscription)
+
+    def unregister(self, client_id):
+        """
+        Unregisters a client, e.g. when it disconnects.
+
+        Parameters
+        ----------
+        client_id : str
+            The client (i.e. session) ID.
+
+        Returns
+        -------
+            The room the client leaves, or `None` if it was not registered.
+        """
+
+        with self.__lock:
+            client = self.__clients.pop(client_id, None)
+
+        return None if client is None else ClientRegistry.room(*client)
+
+    def subscribe(self, client_id, symbols=(), calculator_ids=()):
+        """
+        Subscribes a client to the given symbols and calculators as well as the
+        ones it already subscribed to, where a client subscribed to every symbol
+        (or calculator) is only subscribed to the given ones. Unknown symbols and
+        calculator IDs are ignored.
+
+        Parameters
+        ----------
+        client_id : str
+            The client (i.e. session) ID.
+        symbols : str[]
+            The symbols.
+        calculator_ids : str[]
+            The calculator IDs.
+
+        Returns
+        -------
+            The rooms the client leaves and joins.
+        """
+
+        symbols = set(symbols).intersection(self.symbols)
+        calculator_ids = set(calculator_ids).intersection(self.calculator_ids)
+
+        with self.__lock:
+            format_name, subscription = self.__get_client(client_id)
+
+            return self.__update(
+                client_id,
+                format_name,
+                Subscription(
+                    ClientRegistry.__add(subscription.symbols, symbols),
+                    ClientRegistry.__add(subscription.calculator_ids, calculator_ids),
+                ),
+            )
+
+    def unsubscribe(self, client_id, symbols=(), calculator_ids=()):
+        """
+        Unsubscribes a client from the given symbols and calculators.
+
+        Parameters
+        ----------
+        client_id : str
+            The client (i.e. session) ID.
+        symbols : str[]
+            The symbols.
+        calculator_ids : str[]
+            The calculator IDs.
+
+        Returns
+        -------
+            The rooms the client leaves and joins.
+        """
+
+        with self.__lock:
+            format_name, subscription = self.__get_client(client_id)
+
+            return self.__update(
+                client_id,
+                format_name,
+                Subscription(
+                    ClientRegistry.__remove(
+                        subscription.symbols, symbols, self.symbols
+                    ),
+                    ClientRegistry.__remove(
+                        subscription.calculator_ids,
+                        calculator_ids,
+                        self.calculator_ids,
+                    ),
+                ),
+            )
+
+    def client(self, client_id):
+        """
+        Returns the format and subscription of a client, which are the default
+        format and every analytics if the client has not registered.
+
+        Parameters
+        ----------
+        client_id : str
+            The client (i.e. session) ID.
+
+        Returns
+        -------
+            The format name and the subscription.
+        """
+
+        with self.__lock:
+            return self.__get_client(client_id)
+
+    def rooms(self):
+        """
+        Returns the rooms which at least one registered client joined.
+
+        Returns
+        -------
+            The format name and subscription of each room, indexed by room name.
+        """
+
+        with self.__lock:
+            return {
+                ClientRegistry.room(format_name, subscription): (
+                    format_name,
+                    subscription,
+                )
+                for format_name, subscription in self.__clients.values()
+            }
+
+    def __get_client(self, client_id):
+        """
+        Returns the format and subscription of a client, while holding the lock.
+        """
+
+        return self.__clients.get(client_id, (self.default_format_name, Subscription()))
+
+    def __update(self, client_id, format_name, subscription):
+        """
+        Updates the format and subscription of a client, while holding the lock.
+
+        Returns
+        -------
+            The rooms the client leaves and joins.
+        """
+
+        client = self.__clients.get(client_id)
+        self.__clients[client_id] = (format_name, subscription)
+
+        return (
+            None if client is None else ClientRegistry.room(*client),
+            ClientRegistry.room(format_name, subscription),
+        )
+
+    @staticmethod
+    def __add(names, added_names):
+        """
+        Adds names to a subscribed set, where `None` (i.e. every name) is replaced
+        by the added names, unless there are none.
+        """
+
+        if not added_names:
+            return names
+
+        return set(added_names) if names is None else names.union(added_names)
+
+    @staticmethod
+    def __remove(names, removed_names, all_names):
+        """
+        Removes names from a subscribed set, where `None` stands for all names.
+        """
+
+        if not removed_names:
+            return names
+
+        return (set(all_names) if names is None else names).difference(removed_names)
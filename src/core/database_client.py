@@ -47,8 +47,8 @@ class DatabaseClient:
             )
             self.__is_initialised = True
         except Exception as err:
-            self.__logger.log(str(err))
-            self.__logger.log("Failed to connect to the database.")
+            self.__logger.error(str(err))
+            self.__logger.error("Failed to connect to the database.")
 
             raise err
 
@@ -79,8 +79,8 @@ class DatabaseClient:
             output = handle_sql_result(cur, self.__database_connection)
         except Exception as err:
             # TODO: Throw an exception here.
-            self.__logger.log(str(err))
-            self.__logger.log("Failed to execute SQL query {}.".format(query))
+            self.__logger.error(str(err))
+            self.__logger.error("Failed to execute SQL query {}.", query)
             raise err
         finally:
             self.__logger.debug("Closing cursor of database connection.")
@@ -0,0 +1,92 @@
+from concurrent.futures import Future
+from threading import Lock
+
+import numpy as np
+
+
+class IntermediateCache:
+    """
+    Represents a cache of intermediate values derived from the time series of
+    the current tick (e.g. the price array of BTC without missing values), which
+    are computed once and then shared read-only by every calculator.
+
+    The cache is owned by the analytics engine, which clears it whenever the
+    next tick arrives.
+
+    ...
+
+    Instance Attributes
+    -------------------
+    __values : dict
+        The futures of the cached values indexed by key, where a future is still
+        pending while its value is being computed.
+    __lock : Lock
+        The lock which keeps the cached values consistent when calculators run on
+        several threads.
+    """
+
+    def __init__(self):
+        """
+        Initialises a new instance of this class.
+        """
+
+        self.__values = {}
+        self.__lock = Lock()
+
+    def get_or_compute(self, key, compute):
+        """
+        Returns the value cached under the given key, computing and caching it
+        first if there's no such value.
+
+        The first thread asking for a missing key computes its value, while other
+        threads asking for the same key wait for that value instead of computing it
+        again. If the computation fails, every waiting thread gets its exception
+        and the key stays missing.
+
+        Parameters
+        ----------
+        key : tuple
+            The key of the value, e.g. `("clean", "price", "BTC")`.
+        compute : func
+            Function without parameters which computes the value.
+
+        Returns
+        -------
+            The cached value, where arrays are read-only.
+        """
+
+        with self.__lock:
+            future = self.__values.get(key)
+            is_computing = future is None
+
+            if is_computing:
+                future = Future()
+                self.__values[key] = future
+
+        if not is_computing:
+            return future.result()
+
+        try:
+            value = compute()
+        except BaseException as exception:
+            with self.__lock:
+                if self.__values.get(key) is future:
+                    del self.__values[key]
+
+            future.set_exception(exception)
+            raise
+
+        if isinstance(value, np.ndarray):
+            value.setflags(write=False)
+
+        future.set_result(value)
+
+        return value
+
+    def clear(self):
+        """
+        Removes every cached value, e.g. when the next tick arrives.
+        """
+
+        with self.__lock:
+            self.__values = {}
@@ -0,0 +1,90 @@
+class PayloadFingerprinter:
+    """
+    Represents the fingerprinter of the parts of a LunarCrush asset data payload
+    the analytics of each symbol depend on, i.e. the symbol's latest
+    fundamentals (e.g. its last price, volume and market cap) and the timestamps
+    of its bars, so polls which return the same data as the previous one can be
+    detected without recalculating anything.
+
+    ...
+
+    Instance Attributes
+    -------------------
+    fundamental_ids : str[]
+        The IDs of the latest fundamentals fingerprinted, e.g. "price".
+    __fingerprints : dict
+        The fingerprint of each symbol as of the last committed payload.
+    """
+
+    def __init__(self, fundamental_ids):
+        """
+        Initialises a new instance of this class.
+
+        Parameters
+        ----------
+        fundamental_ids : str[]
+            The IDs of the latest fundamentals fingerprinted, e.g. "price".
+        """
+
+        self.fundamental_ids = list(fundamental_ids)
+        self.__fingerprints = {}
+
+    def fingerprint(self, asset_data):
+        """
+        Fingerprints every symbol of the given payload, where a fingerprint is the
+        tuple of the symbol's latest fundamentals and bar timestamps, which is
+        compared exactly rather than hashed so distinct data can never collide.
+
+        Parameters
+        ----------
+        asset_data : dict
+            The asset data payload, whose symbols are indexed by "data".
+
+        Returns
+        -------
+            The fingerprint of each symbol, indexed by symbol.
+        """
+
+        return {
+            datum["symbol"]: (
+                tuple(
+                    datum.get(fundamental_id) for fundamental_id in self.fundamental_ids
+                ),
+                tuple(bar["time"] for bar in datum.get("timeSeries", [])),
+            )
+            for datum in asset_data["data"]
+        }
+
+    def changed_symbols(self, fingerprints):
+        """
+        Returns the symbols whose fingerprints differ from the last committed ones,
+        including symbols which were not in the last committed payload.
+
+        Parameters
+        ----------
+        fingerprints : dict
+            The fingerprint of each symbol, indexed by symbol.
+
+        Returns
+        -------
+            The set of changed symbols.
+        """
+
+        return {
+            symbol
+            for symbol, fingerprint in fingerprints.items()
+            if self.__fingerprints.get(symbol) != fingerprint
+        }
+
+    def commit(self, fingerprints):
+        """
+        Replaces the last committed fingerprints, e.g. once the analytics of the
+        payload they were taken from have been generated.
+
+        Parameters
+        ----------
+        fingerprints : dict
+            The fingerprint of each symbol, indexed by symbol.
+        """
+
+        self.__fingerprints = fingerprints
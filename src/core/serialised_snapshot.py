@@ -0,0 +1,118 @@
+import gzip
+import hashlib
+from threading import Lock
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+class SerialisedSnapshot:
+    """
+    Represents a snapshot of the engine output serialised once into an immutable
+    bytes buffer by a payload serialiser, along with its content hash (i.e. its ETag) and its
+    compressed variants, which are compressed on first use.
+
+    ...
+
+    Class Attributes
+    ----------------
+    identity_encoding : str
+        The content encoding of the uncompressed buffer.
+    encodings : str[]
+        The supported content encodings in order of preference, where brotli is
+        only supported if the `brotli` package is installed.
+
+    Instance Attributes
+    -------------------
+    sequence : int
+        The sequence number of the snapshot.
+    mimetype : str
+        The mimetype of the bytes buffer.
+    body : bytes
+        The bytes buffer of the snapshot.
+    etag : str
+        The (unquoted) hash of the bytes buffer.
+    __encoded_bodies : dict
+        The compressed bytes buffers indexed by content encoding.
+    __lock : Lock
+        The lock which stops a variant being compressed more than once.
+    """
+
+    identity_encoding = "identity"
+    encodings = (["br"] if brotli is not None else []) + ["gzip", identity_encoding]
+
+    def __init__(self, sequence, analytics, payload_serialiser):
+        """
+        Initialises a new instance of this class.
+
+        Parameters
+        ----------
+        sequence : int
+            The sequence number of the snapshot.
+        analytics : dict
+            The engine output.
+        payload_serialiser : PayloadSerialiser
+            The serialiser of the engine output.
+        """
+
+        self.sequence = sequence
+        self.mimetype = payload_serialiser.mimetype
+        self.body = payload_serialiser.serialise(analytics)
+        self.etag = hashlib.blake2b(self.body, digest_size=16).hexdigest()
+        self.__encoded_bodies = {SerialisedSnapshot.identity_encoding: self.body}
+        self.__lock = Lock()
+
+    def encoded_body(self, encoding):
+        """
+        Returns the bytes buffer of the snapshot in the given content encoding,
+        compressing it only the first time.
+
+        Parameters
+        ----------
+        encoding : str
+            The content encoding, i.e. one of `SerialisedSnapshot.encodings`.
+
+        Returns
+        -------
+            The bytes buffer.
+        """
+
+        encoded_body = self.__encoded_bodies.get(encoding)
+
+        if encoded_body is not None:
+            return encoded_body
+
+        if encoding not in SerialisedSnapshot.encodings:
+            raise Exception(f"Unsupported content encoding '{encoding}'.")
+
+        with self.__lock:
+            if encoding not in self.__encoded_bodies:
+                self.__encoded_bodies[encoding] = (
+                    brotli.compress(self.body)
+                    if encoding == "br"
+                    else gzip.compress(self.body, compresslevel=6)
+                )
+
+            return self.__encoded_bodies[encoding]
+
+    def encoded_etag(self, encoding):
+        """
+        Returns the (unquoted) ETag of the snapshot in the given content encoding,
+        since each encoding is a different representation of the snapshot.
+
+        Parameters
+        ----------
+        encoding : str
+            The content encoding.
+
+        Returns
+        -------
+            The ETag.
+        """
+
+        if encoding == SerialisedSnapshot.identity_encoding:
+            return self.etag
+
+        return f"{self.etag}-{encoding}"
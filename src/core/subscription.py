@@ -0,0 +1,98 @@
+import hashlib
+
+
+class Subscription:
+    """
+    Represents the analytics a web client subscribed to, i.e. a set of symbols
+    and a set of calculator IDs, where `None` stands for every symbol or every
+    calculator. Subscriptions are immutable, so clients with equal subscriptions
+    (i.e. with the same key) can share the same SocketIO room.
+
+    ...
+
+    Instance Attributes
+    -------------------
+    symbols : frozenset
+        The symbols subscribed to, or `None` for every symbol.
+    calculator_ids : frozenset
+        The calculator IDs subscribed to, or `None` for every calculator.
+    is_everything : bool
+        A flag which is set to `True` if every symbol and every calculator is
+        subscribed to.
+    key : str
+        The key which identifies the subscription, e.g. in room names.
+    """
+
+    def __init__(self, symbols=None, calculator_ids=None):
+        """
+        Initialises a new instance of this class.
+
+        Parameters
+        ----------
+        symbols : str[]
+            The symbols subscribed to, or `None` for every symbol.
+        calculator_ids : str[]
+            The calculator IDs subscribed to, or `None` for every calculator.
+        """
+
+        self.symbols = None if symbols is None else frozenset(symbols)
+        self.calculator_ids = (
+            None if calculator_ids is None else frozenset(calculator_ids)
+        )
+        self.is_everything = self.symbols is None and self.calculator_ids is None
+        self.key = Subscription.__build_key(self.symbols, self.calculator_ids)
+
+    def filter(self, analytics):
+        """
+        Filters the given engine output (e.g. of a snapshot or a delta message)
+        down to the subscribed symbols and calculators, always keeping the values
+        of each symbol which are not calculator entries, e.g. "name" and
+        "total_z_score".
+
+        Parameters
+        ----------
+        analytics : dict
+            The engine output indexed by symbol and then by calculator ID.
+
+        Returns
+        -------
+            The filtered engine output, which is the given one if everything is
+            subscribed to.
+        """
+
+        if self.is_everything:
+            return analytics
+
+        symbols = self.symbols
+        calculator_ids = self.calculator_ids
+
+        return {
+            symbol: (
+                symbol_output
+                if calculator_ids is None
+                else {
+                    key: value
+                    for key, value in symbol_output.items()
+                    if key in calculator_ids or not isinstance(value, dict)
+                }
+            )
+            for symbol, symbol_output in analytics.items()
+            if symbols is None or symbol in symbols
+        }
+
+    @staticmethod
+    def __build_key(symbols, calculator_ids):
+        """
+        Builds the key of a subscription, which is "all" when every symbol and
+        every calculator is subscribed to and else a short hash.
+        """
+
+        if symbols is None and calculator_ids is None:
+            return "all"
+
+        description = "|".join(
+            "*" if names is None else ",".join(sorted(names))
+            for names in [symbols, calculator_ids]
+        )
+
+        return hashlib.blake2b(description.encode("utf-8"), digest_size=8).hexdigest()
@@ -0,0 +1,133 @@
+import math
+
+
+class TickScheduler:
+    """
+    Represents the schedule of the analytics engine ticks, which fire on wall
+    clock boundaries (i.e. on multiples of the period since the epoch) so the
+    cadence does not drift by the time each tick takes, and which coalesces the
+    ticks missed while running behind into the next boundary rather than
+    queueing them.
+
+    The data of each tick is prefetched ahead of its boundary by an estimate of
+    the fetch latency, so the tick's analytics can be generated on the boundary.
+
+    ...
+
+    Class Attributes
+    ----------------
+    latency_smoothing : double
+        The weight of the latest fetch latency in the smoothed estimate.
+    lead_factor : double
+        The safety factor the smoothed fetch latency is multiplied by to find how
+        early prefetching starts.
+
+    Instance Attributes
+    -------------------
+    period : double
+        The number of seconds between ticks.
+    fetch_latency : double
+        The smoothed fetch latency, in seconds, or `None` before the first fetch.
+    """
+
+    latency_smoothing = 0.3
+    lead_factor = 1.5
+
+    def __init__(self, period):
+        """
+        Initialises a new instance of this class.
+
+        Parameters
+        ----------
+        period : double
+            The number of seconds between ticks.
+        """
+
+        if period <= 0:
+            raise Exception("The period between ticks needs to be positive.")
+
+        self.period = period
+        self.fetch_latency = None
+
+    def next_tick_time(self, now):
+        """
+        Returns the first tick boundary after the given time.
+
+        Parameters
+        ----------
+        now : double
+            The epoch time (in seconds).
+
+        Returns
+        -------
+            The epoch time (in seconds) of the tick.
+        """
+
+        return (math.floor(now / self.period) + 1) * self.period
+
+    def advance(self, tick_time, now):
+        """
+        Returns the tick which follows the given one, skipping the boundaries
+        which have already passed.
+
+        Parameters
+        ----------
+        tick_time : double
+            The epoch time (in seconds) of the current tick.
+        now : double
+            The epoch time (in seconds) at which the current tick finished.
+
+        Returns
+        -------
+            The epoch time (in seconds) of the next tick and the number of ticks
+            skipped.
+        """
+
+        next_tick_time = tick_time + self.period
+
+        if next_tick_time > now:
+            return next_tick_time, 0
+
+        next_tick_time = self.next_tick_time(now)
+
+        return next_tick_time, round((next_tick_time - tick_time) / self.period) - 1
+
+    def prefetch_time(self, tick_time):
+        """
+        Returns the time at which the data of the given tick is prefetched, which
+        is ahead of the tick by the smoothed fetch latency times the lead factor,
+        but never by more than half a period.
+
+        Parameters
+        ----------
+        tick_time : double
+            The epoch time (in seconds) of the tick.
+
+        Returns
+        -------
+            The epoch time (in seconds) to start prefetching at.
+        """
+
+        if self.fetch_latency is None:
+            return tick_time - self.period / 2
+
+        return tick_time - min(
+            self.fetch_latency * TickScheduler.lead_factor, self.period / 2
+        )
+
+    def record_fetch_latency(self, seconds):
+        """
+        Updates the smoothed fetch latency with the latency of a fetch.
+
+        Parameters
+        ----------
+        seconds : double
+            The fetch latency in seconds.
+        """
+
+        if self.fetch_latency is None:
+            self.fetch_latency = seconds
+        else:
+            self.fetch_latency += TickScheduler.latency_smoothing * (
+                seconds - self.fetch_latency
+            )
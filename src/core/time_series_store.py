@@ -0,0 +1,296 @@
+from datetime import datetime
+from threading import Lock
+
+import numpy as np
+
+
+class TimeSeries:
+    """
+    Represents a columnar time series, i.e. one contiguous array of epoch
+    timestamps and one contiguous array of values of the same length.
+
+    ...
+
+    Class Attributes
+    ----------------
+    time_format : str
+        The format used when rendering timestamps as human-readable strings.
+
+    Instance Attributes
+    -------------------
+    times : np.ndarray
+        The int64 array of epoch timestamps (in seconds).
+    values : np.ndarray
+        The float64 array of values, where missing values are stored as NaN.
+    """
+
+    time_format = "%Y-%m-%d, %H:%M:%S"
+
+    def __init__(self, times, values):
+        """
+        Initialises a new instance of this class.
+
+        Parameters
+        ----------
+        times : int[]
+            The epoch timestamps (in seconds).
+        values : double[]
+            The values, where `None` is treated as a missing value.
+        """
+
+        self.times = np.ascontiguousarray(times, dtype=np.int64)
+        self.values = np.ascontiguousarray(values, dtype=np.float64)
+
+        if len(self.times) != len(self.values):
+            raise Exception(
+                f"A time series needs as many timestamps ({len(self.times)}) as values ({len(self.values)})."
+            )
+
+    def __len__(self):
+        """
+        Returns the number of datapoints in this time series.
+        """
+
+        return len(self.values)
+
+    @staticmethod
+    def format_time(timestamp):
+        """
+        Renders the given epoch timestamp as a human-readable string.
+
+        Parameters
+        ----------
+        timestamp : int
+            The epoch timestamp (in seconds).
+
+        Returns
+        -------
+            The human-readable timestamp.
+        """
+
+        return datetime.fromtimestamp(timestamp).strftime(TimeSeries.time_format)
+
+    def slice(self, start_time=None, end_time=None):
+        """
+        Returns the datapoints of this time series between the given times, which
+        are found by binary search since the timestamps are sorted.
+
+        Parameters
+        ----------
+        start_time : int
+            The earliest epoch timestamp (in seconds) included, or `None` for the
+            start of the time series.
+        end_time : int
+            The latest epoch timestamp (in seconds) included, or `None` for the end
+            of the time series.
+
+        Returns
+        -------
+            The time series of the datapoints, which shares its arrays with this one.
+        """
+
+        start_index = (
+            0
+            if start_time is None
+            else int(np.searchsorted(self.times, start_time, side="left"))
+        )
+        end_index = (
+            len(self.times)
+            if end_time is None
+            else int(np.searchsorted(self.times, end_time, side="right"))
+        )
+
+        return TimeSeries(
+            self.times[start_index:end_index], self.values[start_index:end_index]
+        )
+
+    def to_list(self):
+        """
+        Converts this time series into a list of `[time, value]` pairs, which is
+        the representation served to web clients.
+
+        Returns
+        -------
+            A list of `[time, value]` pairs where missing values are `None`.
+        """
+
+        return [
+            [TimeSeries.format_time(timestamp), None if value != value else value]
+            for timestamp, value in zip(self.times.tolist(), self.values.tolist())
+        ]
+
+
+class TimeSeriesStore:
+    """
+    Represents a store containing every time series calculated in the
+    coinarius analytics universe, indexed by series ID (i.e. a calculator ID)
+    and then by symbol.
+
+    ...
+
+    Instance Attributes
+    -------------------
+    __series : dict
+        The time series indexed by series ID and then by symbol.
+    __panels : dict
+        The cached 2-D (symbols x time) panels indexed by series ID, which are
+        invalidated whenever a time series of the same ID is written.
+    __lock : Lock
+        The lock which keeps the series and the cached panels consistent when
+        calculators run on several threads.
+    """
+
+    __instance = None
+
+    def __init__(self):
+        """
+        Initialises a new instance of this class.
+        """
+
+        self.__series = {}
+        self.__panels = {}
+        self.__lock = Lock()
+
+        if TimeSeriesStore.__instance is not None:
+            raise Exception("TimeSeriesStore class is a Singleton!")
+        else:
+            TimeSeriesStore.__instance = self
+
+    @staticmethod
+    def get_instance():
+        """
+        Returns the single instance of this TimeSeriesStore class.
+        """
+
+        if TimeSeriesStore.__instance is None:
+            TimeSeriesStore()
+
+        return TimeSeriesStore.__instance
+
+    def write(self, series_id, symbol, times, values):
+        """
+        Stores the given timestamps and values as the time series for the
+        given series ID and symbol, replacing any previous one.
+
+        Parameters
+        ----------
+        series_id : str
+            The ID of the series, e.g. "price" or "return".
+        symbol : str
+            The asset symbol.
+        times : int[]
+            The epoch timestamps (in seconds).
+        values : double[]
+            The values.
+
+        Returns
+        -------
+            The stored time series.
+        """
+
+        time_series = TimeSeries(times, values)
+
+        with self.__lock:
+            self.__series.setdefault(series_id, {})[symbol] = time_series
+            self.__panels.pop(series_id, None)
+
+        return time_series
+
+    def read(self, series_id, symbol):
+        """
+        Returns the time series for the given series ID and symbol.
+
+        Parameters
+        ----------
+        series_id : str
+            The ID of the series, e.g. "price" or "return".
+        symbol : str
+            The asset symbol.
+
+        Returns
+        -------
+            The stored time series.
+        """
+
+        return self.__series[series_id][symbol]
+
+    def panel(self, series_id, symbols, drop_missing=True):
+        """
+        Returns the values of the given symbols' time series as a 2-D
+        (symbols x time) panel, where each row is aligned to the right,
+        i.e. the last column holds the last value of every symbol, and
+        padded with NaN on the left.
+
+        Parameters
+        ----------
+        series_id : str
+            The ID of the series, e.g. "price" or "return".
+        symbols : str[]
+            The asset symbols, in the order of the panel's rows.
+        drop_missing : bool
+            A flag which when set to `True` drops missing values from each
+            time series before aligning it.
+
+        Returns
+        -------
+            A read-only 2-D float64 array.
+        """
+
+        with self.__lock:
+            panels = self.__panels.setdefault(series_id, {})
+            key = (tuple(symbols), drop_missing)
+            panel = panels.get(key)
+
+            if panel is None:
+                rows = [self.__series[series_id][symbol].values for symbol in symbols]
+
+                if drop_missing:
+                    rows = [row[np.isfinite(row)] for row in rows]
+
+                num_columns = max((len(row) for row in rows), default=0)
+                panel = np.full((len(rows), num_columns), np.nan)
+
+                for row_index, row in enumerate(rows):
+                    panel[row_index, num_columns - len(row) :] = row
+
+                panel.setflags(write=False)
+                panels[key] = panel
+
+        return panel
+
+    @staticmethod
+    def is_rolled_over(panel, next_panel):
+        """
+        Returns whether the given next panel is the given panel rolled over to the
+        next day, i.e. whether it has one more column and only differs from the
+        panel in its last two columns, where the panel's last column (e.g. the bar
+        which has since closed) may have changed and the last column is new.
+
+        Parameters
+        ----------
+        panel : np.ndarray
+            A 2-D (symbols x time) array aligned to the right.
+        next_panel : np.ndarray
+            A 2-D (symbols x time) array aligned to the right.
+
+        Returns
+        -------
+            `True` if the next panel is the panel rolled over, else `False`.
+        """
+
+        num_rows, num_columns = panel.shape
+
+        return (
+            num_columns > 0
+            and next_panel.shape == (num_rows, num_columns + 1)
+            and np.array_equal(next_panel[:, :-2], panel[:, :-1], equal_nan=True)
+        )
+
+    def clear(self):
+        """
+        Removes every time series from this store.
+        """
+
+        with self.__lock:
+            self.__series = {}
+            self.__panels = {}
@@ -1,15 +1,18 @@
-from flask import Flask, render_template
+from flask import Flask, Response, render_template, request
 from flask_cors import CORS
-from flask_socketio import SocketIO, emit
+from flask_socketio import SocketIO, emit, join_room, leave_room
 import signal
 from threading import Thread, Event
 
 from calculators.autocorrelation_calculator import AutocorrelationCalculator
 from calculators.btc_correlation_calculator import BtcCorrelationCalculator
+from calculators.correlation_matrix_calculator import CorrelationMatrixCalculator
 from calculators.eth_correlation_calculator import EthCorrelationCalculator
 from core.analytics_engine_thread import AnalyticsEngineThread
 from calculators.market_cap_calculator import MarketCapCalculator
 from calculators.moving_average_30d_calculator import MovingAverage30dCalculator
+from calculators.moving_average_calculator import MovingAverageCalculator
+from calculators.moving_average_family import MovingAverageFamily
 from calculators.price_calculator import PriceCalculator
 from calculators.price_diff_calculator import PriceDiffCalculator
 from calculators.return_calculator import ReturnCalculator
@@ -18,8 +21,16 @@ from calculators.rsi_calculator import RsiCalculator
 from calculators.volume_calculator import VolumeCalculator
 from calculators.volume_diff_calculator import VolumeDiffCalculator
 from core.analytics_engine import AnalyticsEngine
+from core.client_registry import ClientRegistry
+from core.serialised_snapshot import SerialisedSnapshot
 from core.symbol_store import SymbolStore
+from core.time_series_store import TimeSeriesStore
+from utils.json_payload_serialiser import JsonPayloadSerialiser
 from utils.logger import Logger
+from utils.metrics import Metrics
+from utils.msgpack_payload_serialiser import MsgpackPayloadSerialiser
+from utils.serialiser import Serialiser
+from utils.time_series_downsampler import TimeSeriesDownsampler
 from network.lunar_crush_client import LunarCrushClient
 
 logger = Logger.get_instance()
@@ -53,6 +64,9 @@ symbol_store = SymbolStore.get_instance()
 lunar_crush_client = LunarCrushClient(symbol_store)
 
 return_calculator = ReturnCalculator()
+correlation_matrix_calculator = CorrelationMatrixCalculator(return_calculator)
+moving_average_family = MovingAverageFamily()
+moving_average_30d_calculator = MovingAverage30dCalculator(moving_average_family)
 calculators = [
     PriceCalculator(),
     VolumeCalculator(),
@@ -61,13 +75,34 @@ calculators = [
     Return30dCalculator(),
     PriceDiffCalculator(),
     VolumeDiffCalculator(),
-    MovingAverage30dCalculator(),
+    moving_average_30d_calculator,
+    # The other moving averages are shown but left out of the total z-score.
+    *MovingAverageCalculator.create_all(
+        moving_average_family, excluded_ids=[moving_average_30d_calculator.id]
+    ),
     RsiCalculator(),
     AutocorrelationCalculator(return_calculator),
-    BtcCorrelationCalculator(return_calculator),
-    EthCorrelationCalculator(return_calculator),
+    BtcCorrelationCalculator(correlation_matrix_calculator),
+    EthCorrelationCalculator(correlation_matrix_calculator),
 ]
-analytics_engine = AnalyticsEngine(lunar_crush_client, symbol_store, calculators)
+# Gunicorn's gevent worker turns the calculator threads into greenlets, which
+# can't run the CPU-bound calculators in parallel, so they run one after another.
+analytics_engine = AnalyticsEngine(
+    lunar_crush_client, symbol_store, calculators, is_batched=True, max_workers=1
+)
+# MessagePack is only offered if its optional dependency is installed.
+payload_serialisers = {
+    payload_serialiser.format_name: payload_serialiser
+    for payload_serialiser in [JsonPayloadSerialiser(), MsgpackPayloadSerialiser()]
+    if payload_serialiser.is_available
+}
+# Bounds the size of /range responses however much history is stored.
+max_range_points = 2000
+client_registry = ClientRegistry(
+    JsonPayloadSerialiser.format_name,
+    symbol_store.symbols,
+    [calculator.id for calculator in calculators],
+)
 
 
 app = Flask(__name__)
@@ -96,10 +131,118 @@ def index():
 @app.route("/analytics")
 def analytics():
     logger.log(
-        "Handling request to /analytics URI by returning analytics cache dictionary."
+        "Handling request to /analytics URI by returning the serialised analytics snapshot."
     )
 
-    return analytics_engine.engine_output
+    # The format is given by the `format` query parameter or else by the Accept header.
+    format_name = request.args.get("format")
+
+    if format_name is None:
+        mimetype = request.accept_mimetypes.best_match(
+            [
+                payload_serialiser.mimetype
+                for payload_serialiser in payload_serialisers.values()
+            ],
+            default=JsonPayloadSerialiser.mimetype,
+        )
+        format_name = next(
+            payload_serialiser.format_name
+            for payload_serialiser in payload_serialisers.values()
+            if payload_serialiser.mimetype == mimetype
+        )
+
+    if format_name not in payload_serialisers:
+        return Response(f"Unsupported format '{format_name}'.", status=406)
+
+    snapshot = analytics_engine.serialised_snapshot(payload_serialisers[format_name])
+    encoding = request.accept_encodings.best_match(
+        SerialisedSnapshot.encodings, default=SerialisedSnapshot.identity_encoding
+    )
+    etag = snapshot.encoded_etag(encoding)
+
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = Response(snapshot.encoded_body(encoding), mimetype=snapshot.mimetype)
+
+        if encoding != SerialisedSnapshot.identity_encoding:
+            response.headers["Content-Encoding"] = encoding
+
+    response.set_etag(etag)
+    response.headers["Vary"] = "Accept, Accept-Encoding"
+
+    return response
+
+
+@app.route("/correlations")
+def correlations():
+    logger.log(
+        "Handling request to /correlations URI by returning the most and least correlated pairs of symbols."
+    )
+
+    k = request.args.get("k", default=10, type=int)
+
+    return Serialiser.to_serialisable(
+        {
+            "most_correlated": correlation_matrix_calculator.top_pairs(k),
+            "least_correlated": correlation_matrix_calculator.top_pairs(
+                k, most_correlated=False
+            ),
+        }
+    )
+
+
+@app.route("/range")
+def time_series_range():
+    logger.log(
+        "Handling request to /range URI by returning a sliced and downsampled time series."
+    )
+
+    # e.g. /range?symbol=BTC&calculator=rsi&from=1630000000&to=1640000000&max_points=500
+    symbol = request.args.get("symbol")
+    calculator_id = request.args.get("calculator")
+    max_points = min(
+        request.args.get("max_points", default=max_range_points, type=int),
+        max_range_points,
+    )
+
+    if symbol is None or calculator_id is None:
+        return Response(
+            "The symbol and calculator parameters are required.", status=400
+        )
+
+    if max_points < 3:
+        return Response("The max_points parameter needs to be at least 3.", status=400)
+
+    try:
+        time_series = TimeSeriesStore.get_instance().read(calculator_id, symbol)
+    except KeyError:
+        return Response(
+            f"There is no '{calculator_id}' time series for '{symbol}'.", status=404
+        )
+
+    time_series = TimeSeriesDownsampler.downsample(
+        time_series.slice(
+            request.args.get("from", type=int), request.args.get("to", type=int)
+        ),
+        max_points,
+    )
+
+    return payload_serialisers[JsonPayloadSerialiser.format_name].to_message(
+        {"symbol": symbol, "calculator": calculator_id, "time_series": time_series}
+    )
+
+
+@app.route("/metrics")
+def metrics():
+    logger.log(
+        "Handling request to /metrics URI by returning the engine metrics in the Prometheus text format."
+    )
+
+    return Response(
+        Metrics.get_instance().to_prometheus_text(),
+        mimetype="text/plain; version=0.0.4",
+    )
 
 
 @socket_io.on("my_event")
@@ -116,16 +259,109 @@ def register(message):
     if not engine_thread.is_alive():
         logger.log("Starting Analytics Engine Thread.")
         engine_thread = AnalyticsEngineThread(
-            socket_io, analytics_engine, engine_thread_stop_event
+            socket_io,
+            analytics_engine,
+            engine_thread_stop_event,
+            client_registry,
+            payload_serialisers,
         )
         engine_thread.start()
 
+    # Clients select the payload format of the messages sent to them, e.g. "msgpack".
+    format_name = (message or {}).get("format")
 
-@socket_io.on("unregister", namespace="/user")
-def unregister():
-    # TODO
-    global engine_thread
-    logger.log("Client disconnecting from Coinarius WebSocket service")
+    if format_name is not None and format_name not in payload_serialisers:
+        logger.warning(
+            "Client selected the unsupported payload format '{}', falling back to '{}'.",
+            format_name,
+            client_registry.default_format_name,
+        )
+        format_name = None
+
+    switch_room(client_registry.register(request.sid, format_name))
+    send_snapshot()
+
+
+@socket_io.on("subscribe")
+def subscribe(message):
+    logger.log("Subscribing a client to symbols and calculators.")
+
+    # Clients subscribe to e.g. `{"symbols": ["BTC", "ETH"], "calculators": ["rsi"]}`.
+    switch_room(
+        client_registry.subscribe(
+            request.sid,
+            (message or {}).get("symbols", []),
+            (message or {}).get("calculators", []),
+        )
+    )
+    send_snapshot()
+
+
+@socket_io.on("unsubscribe")
+def unsubscribe(message):
+    logger.log("Unsubscribing a client from symbols and calculators.")
+
+    switch_room(
+        client_registry.unsubscribe(
+            request.sid,
+            (message or {}).get("symbols", []),
+            (message or {}).get("calculators", []),
+        )
+    )
+    send_snapshot()
+
+
+@socket_io.on("request_snapshot")
+def send_snapshot(message=None):
+    logger.log(
+        "Sending the analytics snapshot to a client which connected, subscribed or missed a delta."
+    )
+
+    snapshot = analytics_engine.snapshot()
+    format_name, subscription = client_registry.client(request.sid)
+
+    # There is no snapshot to send before the engine's first tick.
+    if snapshot["sequence"] > 0:
+        emit(
+            "analytics_snapshot",
+            payload_serialisers[format_name].to_message(
+                {
+                    "sequence": snapshot["sequence"],
+                    "analytics": subscription.filter(snapshot["analytics"]),
+                }
+            ),
+        )
+
+
+@socket_io.on("unregister")
+def unregister(message=None):
+    logger.log("Client unregistering from Coinarius WebSocket service")
+
+    room = client_registry.unregister(request.sid)
+
+    if room is not None:
+        leave_room(room)
+
+
+@socket_io.on("disconnect")
+def disconnect():
+    logger.log("Client disconnected from Coinarius WebSocket service")
+
+    # SocketIO removes disconnected clients from their rooms.
+    client_registry.unregister(request.sid)
+
+
+# Moves the client of the current request between the rooms returned by the registry.
+def switch_room(rooms):
+    left_room, joined_room = rooms
+
+    if left_room == joined_room:
+        return
+
+    if left_room is not None:
+        leave_room(left_room)
+
+    join_room(joined_room)
 
 
 if __name__ == "__main__":
@@ -1,32 +1,75 @@
+from concurrent.futures import ThreadPoolExecutor
 import os
+import random
+import time
+
 import requests
+from requests.adapters import HTTPAdapter
 
 from utils.logger import Logger
+from utils.metrics import Metrics
 
 
 class LunarCrushClient:
     """
     Represents a client to the LunarCrush API
 
+    The symbol universe is split into shards of symbols, which are fetched
+    concurrently over a persistent pool of keep-alive connections and merged
+    into a single payload, and each shard request is retried with jittered
+    exponential backoff when it fails, times out or is throttled. The workers
+    are threads, which become greenlets when gevent patches the standard library
+    (e.g. under the `GeventWebSocketWorker`).
+
     ...
     Class Attributes
     ----------
     lunar_crush_base_url : String
         Base URL for all calls to the LunarCrush API.
+    retried_status_codes : int[]
+        The HTTP status codes of the responses which are retried, i.e. throttled
+        requests and server errors.
 
     Instance Attributes
     ----------
     _logger : Logger
         The logger of this class.
+    __metrics : Metrics
+        The metrics which the number of fetched bytes and of retries are counted in.
     __api_key : String
         The LunarCrush API key
     __symbol_store
         The symbol store.
+    shard_size : int
+        The maximum number of symbols fetched by a single request.
+    timeout : tuple
+        The connect and read timeouts of each request, in seconds.
+    max_retries : int
+        The maximum number of times a shard request is retried.
+    backoff_base : double
+        The cap of the first backoff, in seconds, which doubles on every retry.
+    backoff_cap : double
+        The cap of every backoff, in seconds.
+    __session : requests.Session
+        The session whose connection pool is reused by every request.
+    __executor : ThreadPoolExecutor
+        The executor which fetches the shards concurrently.
     """
 
     lunar_crush_base_url = "https://api.lunarcrush.com/v2"
-
-    def __init__(self, symbol_store):
+    retried_status_codes = [429, 500, 502, 503, 504]
+
+    def __init__(
+        self,
+        symbol_store,
+        shard_size=50,
+        max_concurrent_shards=8,
+        connect_timeout=3.05,
+        read_timeout=10.0,
+        max_retries=3,
+        backoff_base=0.5,
+        backoff_cap=8.0,
+    ):
         """
         Initialises a new instance of this class.
 
@@ -34,11 +77,45 @@ class LunarCrushClient:
         ----------
         symbol_store
             The symbol store.
+        shard_size : int
+            The maximum number of symbols fetched by a single request.
+        max_concurrent_shards : int
+            The maximum number of shards fetched at the same time, which is also
+            the size of the connection pool.
+        connect_timeout : double
+            The number of seconds to wait for a connection to the API.
+        read_timeout : double
+            The number of seconds to wait for the API between received bytes.
+        max_retries : int
+            The maximum number of times a shard request is retried.
+        backoff_base : double
+            The cap of the first backoff, in seconds, which doubles on every retry.
+        backoff_cap : double
+            The cap of every backoff, in seconds.
         """
 
+        if shard_size < 1:
+            raise Exception("A shard needs to hold at least 1 symbol.")
+
         self.__api_key = os.environ["LUNAR_CRUSH_API_KEY"]
         self.__logger = Logger.get_instance()
+        self.__metrics = Metrics.get_instance()
         self.__symbol_store = symbol_store
+        self.shard_size = shard_size
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+
+        adapter = HTTPAdapter(
+            pool_connections=1, pool_maxsize=max_concurrent_shards, pool_block=True
+        )
+        self.__session = requests.Session()
+        self.__session.mount("https://", adapter)
+        self.__session.mount("http://", adapter)
+        self.__executor = ThreadPoolExecutor(
+            max_workers=max_concurrent_shards, thread_name_prefix="lunar-crush"
+        )
 
     def fetch_asset_data(self, num_of_datapoints=100):
         """
@@ -55,19 +132,100 @@ class LunarCrushClient:
             A dictionary where the keys are the asset symbols and the values asset data
             (e.g. time series data, etc).
         """
-        self.__logger.log("Fetching asset data from the LunarCrush API.")
+        symbols = list(self.__symbol_store.symbols)
+        shards = [
+            symbols[index : index + self.shard_size]
+            for index in range(0, len(symbols), self.shard_size)
+        ]
+
+        self.__logger.log(
+            "Fetching asset data of {} symbols in {} shards from the LunarCrush API.",
+            len(symbols),
+            len(shards),
+        )
+
+        if len(shards) == 1:
+            responses = [self.__fetch_shard(shards[0], num_of_datapoints)]
+        else:
+            responses = list(
+                self.__executor.map(
+                    lambda shard: self.__fetch_shard(shard, num_of_datapoints), shards
+                )
+            )
+
+        # The shards are merged in the order of the symbols, keeping the other
+        # fields of the first response.
+        asset_data = dict(responses[0])
+        asset_data["data"] = [
+            datum for response in responses for datum in response.get("data", [])
+        ]
+
+        return asset_data
+
+    def __fetch_shard(self, symbols, num_of_datapoints):
+        """
+        Fetches the asset data of a shard of symbols, retrying with jittered
+        exponential backoff (i.e. sleeping a random time up to the doubling
+        backoff cap) when the request fails, times out or is throttled.
+
+        Parameters
+        ----------
+        symbols : str[]
+            The symbols of the shard.
+        num_of_datapoints : int
+            The number of time series datapoints to fetch from the API.
+
+        Returns
+        -------
+            The decoded response of the API.
+        """
 
         query = {
             "data": "assets",
             "key": self.__api_key,
-            "symbol": str(self.__symbol_store),
+            "symbol": ",".join(symbols),
             "interval": "day",
             "time_series_indicators": "close,volume,market_cap",
             "data_points": num_of_datapoints,
         }
-        response = requests.get(LunarCrushClient.lunar_crush_base_url, params=query)
 
-        return response.json()
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self.__session.get(
+                    LunarCrushClient.lunar_crush_base_url,
+                    params=query,
+                    timeout=self.timeout,
+                )
+
+                if (
+                    response.status_code not in LunarCrushClient.retried_status_codes
+                    or attempt == self.max_retries
+                ):
+                    response.raise_for_status()
+                    self.__metrics.increment(
+                        Metrics.payload_bytes, len(response.content)
+                    )
+
+                    return response.json()
+
+                reason = f"status {response.status_code}"
+            except (requests.ConnectionError, requests.Timeout) as error:
+                if attempt == self.max_retries:
+                    raise
+
+                reason = type(error).__name__
+
+            backoff = random.uniform(
+                0, min(self.backoff_cap, self.backoff_base * 2**attempt)
+            )
+            self.__metrics.increment(Metrics.fetch_retries)
+            self.__logger.warning(
+                "Retrying LunarCrush request of {} symbols in {:.2f} seconds after {}.",
+                len(symbols),
+                backoff,
+                reason,
+            )
+            time.sleep(backoff)
 
 
 if __name__ == "__main__":
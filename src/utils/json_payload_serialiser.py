@@ -0,0 +1,137 @@
+import json
+
+import numpy as np
+
+from core.time_series_store import TimeSeries
+
+from .payload_serialiser import PayloadSerialiser
+
+
+class JsonPayloadSerialiser(PayloadSerialiser):
+    """
+    Serialises engine output into JSON, converting time series, NumPy arrays and
+    NumPy scalars natively, i.e. dispatching on the exact type of each value
+    first and converting NumPy arrays with `tolist` rather than element by
+    element. Time series are `[time, value]` pairs where missing values are
+    `null`, as served by `Serialiser.to_serialisable`.
+
+    ...
+
+    Class Attributes
+    ----------------
+    max_formatted_times : int
+        The maximum number of formatted timestamps which are memoised.
+
+    Instance Attributes
+    -------------------
+    __formatted_times : dict
+        The memoised human-readable timestamps indexed by epoch timestamp, since
+        every time series of a tick shares the same few timestamps.
+    """
+
+    format_name = "json"
+    mimetype = "application/json"
+
+    max_formatted_times = 100000
+
+    def __init__(self):
+        """
+        Initialises a new instance of this class.
+        """
+
+        self.__formatted_times = {}
+
+    def to_message(self, output):
+        """
+        Converts the given engine output into plain Python objects which SocketIO
+        JSON encodes.
+
+        Parameters
+        ----------
+        output : obj
+            The (possibly nested) engine output.
+
+        Returns
+        -------
+            A JSON serialisable copy of the given output.
+        """
+
+        return self.__to_plain(output)
+
+    def serialise(self, output):
+        """
+        Serialises the given engine output into compact JSON bytes, whose object
+        keys are sorted so the same output is always serialised into the same bytes.
+
+        Parameters
+        ----------
+        output : obj
+            The (possibly nested) engine output.
+
+        Returns
+        -------
+            The UTF-8 encoded JSON bytes.
+        """
+
+        return json.dumps(
+            self.__to_plain(output),
+            sort_keys=True,
+            separators=(",", ":"),
+            allow_nan=False,
+        ).encode("utf-8")
+
+    def __to_plain(self, output):
+        """
+        Recursively converts the given output into plain Python objects.
+        """
+
+        output_type = type(output)
+
+        if output_type is dict:
+            return {key: self.__to_plain(value) for key, value in output.items()}
+
+        if output_type is float:
+            return None if output != output else output
+
+        if output is None or output_type is str or output_type is int:
+            return output
+
+        if output_type is TimeSeries:
+            return self.__time_series_to_list(output)
+
+        if output_type is list or output_type is tuple:
+            return [self.__to_plain(value) for value in output]
+
+        if isinstance(output, np.ndarray):
+            return self.__to_plain(output.tolist())
+
+        if isinstance(output, np.generic):
+            return self.__to_plain(output.item())
+
+        return output
+
+    def __time_series_to_list(self, time_series):
+        """
+        Converts the given time series into a list of `[time, value]` pairs.
+        """
+
+        formatted_times = self.__formatted_times
+
+        if len(formatted_times) > JsonPayloadSerialiser.max_formatted_times:
+            formatted_times.clear()
+
+        pairs = []
+
+        for timestamp, value in zip(
+            time_series.times.tolist(), time_series.values.tolist()
+        ):
+            formatted_time = formatted_times.get(timestamp)
+
+            if formatted_time is None:
+                formatted_time = formatted_times[timestamp] = TimeSeries.format_time(
+                    timestamp
+                )
+
+            pairs.append([formatted_time, None if value != value else value])
+
+        return pairs
@@ -0,0 +1,91 @@
+from bisect import bisect_left
+
+
+class LatencyHistogram:
+    """
+    Represents a histogram of latencies with fixed, exponentially spaced bucket
+    bounds, so recording a latency only takes a binary search and an increment,
+    and quantiles (e.g. the p95) are estimated from the bucket counts.
+
+    ...
+
+    Class Attributes
+    ----------------
+    bucket_bounds : double[]
+        The upper bounds in seconds of the buckets (except for the last bucket,
+        which is unbounded), which double from 10 microseconds to about 84 seconds.
+
+    Instance Attributes
+    -------------------
+    bucket_counts : int[]
+        The number of latencies recorded in each bucket.
+    count : int
+        The number of latencies recorded.
+    total : double
+        The sum of the latencies recorded, in seconds.
+    """
+
+    bucket_bounds = [0.00001 * 2**exponent for exponent in range(24)]
+
+    def __init__(self):
+        """
+        Initialises a new instance of this class.
+        """
+
+        self.bucket_counts = [0] * (len(LatencyHistogram.bucket_bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def record(self, seconds):
+        """
+        Records a latency.
+
+        Parameters
+        ----------
+        seconds : double
+            The latency in seconds.
+        """
+
+        self.bucket_counts[bisect_left(LatencyHistogram.bucket_bounds, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+
+    def quantile(self, quantile):
+        """
+        Estimates a quantile of the recorded latencies by interpolating linearly
+        within the bucket the quantile falls into, like Prometheus'
+        `histogram_quantile`.
+
+        Parameters
+        ----------
+        quantile : double
+            The quantile, e.g. 0.95 for the p95.
+
+        Returns
+        -------
+            The estimated quantile in seconds, or NaN if no latency was recorded.
+        """
+
+        if self.count == 0:
+            return float("nan")
+
+        rank = quantile * self.count
+        cumulative_count = 0
+
+        for index, bucket_count in enumerate(self.bucket_counts):
+            if bucket_count > 0 and cumulative_count + bucket_count >= rank:
+                bounds = LatencyHistogram.bucket_bounds
+
+                # Latencies beyond the last bound are reported as the last bound.
+                if index == len(bounds):
+                    return bounds[-1]
+
+                lower_bound = 0.0 if index == 0 else bounds[index - 1]
+
+                return lower_bound + (bounds[index] - lower_bound) * (
+                    (rank - cumulative_count) / bucket_count
+                )
+
+            cumulative_count += bucket_count
+
+        return LatencyHistogram.bucket_bounds[-1]
@@ -1,27 +1,99 @@
+import atexit
+from datetime import datetime, timezone
+import json
+import os
+from queue import Full, Queue
+import sys
+from threading import Lock, Thread
+import time
+
+
 class Logger:
     """
     Logger class which follows the Singleton pattern.
+
+    Messages below the logger's level are dropped straight away, and the ones
+    above it are only formatted (with `str.format` and their arguments) and
+    written by a background writer thread, so logging never blocks the caller.
+    When the writer falls behind and its bounded queue is full, messages are
+    dropped and counted rather than waited on.
     ...
 
     Class Attributes
     ----------
     __instance : Logger
         The singular instance of this Logger class.
-    debug_mode : bool
-        A flag which when set to `True` includes detailed messages
-        intended for diagnostic purposes in this Logger's output.
+    debug_level : int
+        The level of detailed messages intended for diagnostic purposes.
+    info_level : int
+        The level of messages about the normal running of the service.
+    warning_level : int
+        The level of messages about unexpected but recoverable events.
+    error_level : int
+        The level of messages about failures.
+    level_names : dict
+        The name of each level indexed by level.
+    text_format : str
+        The output format of one plain text line per message, prefixed by its level.
+    json_format : str
+        The output format of one JSON object per message.
+    max_queue_size : int
+        The maximum number of messages waiting to be written.
+
+    Instance Attributes
+    -------------------
+    level : int
+        The level below which messages are dropped, which defaults to the
+        `LOG_LEVEL` environment variable (e.g. "DEBUG") or else the info level.
+    output_format : str
+        The output format, which defaults to the `LOG_FORMAT` environment variable
+        or else the text format.
+    num_dropped : int
+        The number of messages dropped because the queue was full.
+    __queue : Queue
+        The queue of messages waiting to be written.
+    __writer : Thread
+        The background thread which writes the queued messages.
+    __writer_lock : Lock
+        The lock which stops the writer thread being started more than once.
+
     Methods
     -------
     get_instance()
         Returns the single instance of this Logger class.
-    log(message)
+    configure(level, output_format)
+        Changes the level and/or the output format.
+    is_enabled_for(level)
+        Returns whether messages of the level are logged.
+    log(message, *args, level)
         Logs the message.
-    debug(message)
+    debug(message, *args)
         Logs a detailed message intended for diagnostic purposes.
+    info(message, *args), warning(message, *args), error(message, *args)
+        Logs the message with the corresponding level.
+    flush()
+        Waits until every queued message has been written.
     """
 
     __instance = None
 
+    debug_level = 10
+    info_level = 20
+    warning_level = 30
+    error_level = 40
+
+    level_names = {
+        debug_level: "DEBUG",
+        info_level: "INFO",
+        warning_level: "WARNING",
+        error_level: "ERROR",
+    }
+
+    text_format = "text"
+    json_format = "json"
+
+    max_queue_size = 10000
+
     def __init__(self):
         """
         Initialises a new instance of this class.
@@ -32,6 +104,20 @@ class Logger:
         else:
             Logger.__instance = self
 
+        self.level = Logger.info_level
+        self.output_format = Logger.text_format
+        self.num_dropped = 0
+        self.__queue = Queue(Logger.max_queue_size)
+        self.__writer = None
+        self.__writer_lock = Lock()
+
+        self.configure(
+            os.environ.get("LOG_LEVEL"),
+            os.environ.get("LOG_FORMAT", "").lower() or None,
+        )
+
+        atexit.register(self.flush)
+
     @staticmethod
     def get_instance():
         """
@@ -43,14 +129,217 @@ class Logger:
 
         return Logger.__instance
 
-    @staticmethod
-    def log(message):
+    def configure(self, level=None, output_format=None):
+        """
+        Changes the level and/or the output format of this logger.
+
+        Parameters
+        ----------
+        level : int
+            The level below which messages are dropped, e.g. `Logger.debug_level`,
+            or its name, e.g. "DEBUG".
+        output_format : str
+            The output format, i.e. `Logger.text_format` or `Logger.json_format`.
+        """
+
+        if isinstance(level, str):
+            levels = {name: level for level, name in Logger.level_names.items()}
+
+            if level.upper() not in levels:
+                raise Exception(f"Unknown log level '{level}'.")
+
+            level = levels[level.upper()]
+
+        if output_format not in [None, Logger.text_format, Logger.json_format]:
+            raise Exception(f"Unknown log output format '{output_format}'.")
+
+        if level is not None:
+            self.level = level
+
+        if output_format is not None:
+            self.output_format = output_format
+
+    def is_enabled_for(self, level):
+        """
+        Returns whether messages of the given level are logged, e.g. to skip
+        building expensive message arguments.
+
+        Parameters
+        ----------
+        level : int
+            The level.
+
+        Returns
+        -------
+            `True` if messages of the level are logged.
+        """
+
+        return level >= self.level
+
+    def log(self, message, *args, level=info_level):
         """
         Logs the message.
         Parameters
         ----------
+        message : str
+            The message to be logged, which is formatted with `str.format` and the
+            given arguments only if the message is logged.
+        *args
+            The arguments of the message.
+        level : int
+            The level of the message.
+        """
+
+        if level < self.level:
+            return
+
+        try:
+            self.__queue.put_nowait((time.time(), level, message, args))
+        except Full:
+            self.num_dropped += 1
+            return
+
+        if self.__writer is None:
+            self.__start_writer()
+
+    def debug(self, message, *args):
+        """
+        Logs a detailed message intended for diagnostic purposes.
+        Parameters
+        ----------
+        message : str
+            The message to be logged.
+        *args
+            The arguments of the message.
+        """
+
+        if Logger.debug_level >= self.level:
+            self.log(message, *args, level=Logger.debug_level)
+
+    def info(self, message, *args):
+        """
+        Logs a message about the normal running of the service.
+        Parameters
+        ----------
+        message : str
+            The message to be logged.
+        *args
+            The arguments of the message.
+        """
+
+        if Logger.info_level >= self.level:
+            self.log(message, *args, level=Logger.info_level)
+
+    def warning(self, message, *args):
+        """
+        Logs a message about an unexpected but recoverable event.
+        Parameters
+        ----------
         message : str
             The message to be logged.
+        *args
+            The arguments of the message.
+        """
+
+        if Logger.warning_level >= self.level:
+            self.log(message, *args, level=Logger.warning_level)
+
+    def error(self, message, *args):
+        """
+        Logs a message about a failure.
+        Parameters
+        ----------
+        message : str
+            The message to be logged.
+        *args
+            The arguments of the message.
+        """
+
+        if Logger.error_level >= self.level:
+            self.log(message, *args, level=Logger.error_level)
+
+    def flush(self):
+        """
+        Waits until every queued message has been written.
         """
 
-        print(message)
+        if self.__writer is not None:
+            self.__queue.join()
+
+    def __start_writer(self):
+        """
+        Starts the background writer thread, unless it has already been started.
+        """
+
+        with self.__writer_lock:
+            if self.__writer is None:
+                writer = Thread(target=self.__write, name="logger-writer", daemon=True)
+                writer.start()
+                self.__writer = writer
+
+    def __write(self):
+        """
+        Writes the queued messages to the standard output forever.
+        """
+
+        num_reported_dropped = 0
+
+        while True:
+            record = self.__queue.get()
+
+            try:
+                lines = [self.__format(record)]
+
+                if self.num_dropped > num_reported_dropped:
+                    num_dropped = self.num_dropped - num_reported_dropped
+                    num_reported_dropped += num_dropped
+                    lines.append(
+                        self.__format(
+                            (
+                                time.time(),
+                                Logger.warning_level,
+                                "Dropped {} log messages as the log queue was full.",
+                                (num_dropped,),
+                            )
+                        )
+                    )
+
+                sys.stdout.write("\n".join(lines) + "\n")
+                sys.stdout.flush()
+            except Exception:
+                # The writer must never die, or logging callers would fill the queue.
+                pass
+            finally:
+                self.__queue.task_done()
+
+    def __format(self, record):
+        """
+        Formats a queued message in the output format.
+
+        Parameters
+        ----------
+        record : tuple
+            The time, level, message and arguments of the message.
+
+        Returns
+        -------
+            The formatted line.
+        """
+
+        timestamp, level, message, args = record
+
+        try:
+            text = str(message).format(*args) if args else str(message)
+        except (IndexError, KeyError, ValueError):
+            text = f"{message} {args!r}"
+
+        if self.output_format == Logger.json_format:
+            return json.dumps(
+                {
+                    "time": datetime.fromtimestamp(timestamp, timezone.utc).isoformat(),
+                    "level": Logger.level_names.get(level, str(level)),
+                    "message": text,
+                }
+            )
+
+        return f"[{Logger.level_names.get(level, level)}] {text}"
@@ -0,0 +1,282 @@
+from contextlib import contextmanager
+from threading import Lock
+import time
+
+from .latency_histogram import LatencyHistogram
+
+
+class Metrics:
+    """
+    Metrics class which follows the Singleton pattern, and records latency
+    histograms and counters of the analytics engine, e.g. per phase of a tick and
+    per calculator, in a way which costs only a few microseconds per recording.
+
+    ...
+
+    Class Attributes
+    ----------------
+    __instance : Metrics
+        The singular instance of this Metrics class.
+    phase_latency : str
+        The name of the latency histograms of each phase of a tick, labelled by
+        "phase", e.g. "fetch", "parse", "assemble", "encode", "serialise" or "emit".
+    calculator_latency : str
+        The name of the latency histograms of each calculator, labelled by
+        "calculator" and by "mode", i.e. "calculate", "calculate_latest" or
+        "roll_over".
+    tick_lag : str
+        The name of the latency histogram of how late each tick starts after its
+        scheduled time.
+    skipped_ticks : str
+        The name of the counter of ticks skipped as the engine was running behind.
+    ticks : str
+        The name of the counters of ticks, labelled by "kind", i.e. "full",
+        "roll_over", "latest" or "unchanged".
+    errors : str
+        The name of the counters of errors, labelled by "phase".
+    payload_bytes : str
+        The name of the counter of bytes of the payloads fetched from the
+        LunarCrush API.
+    fetch_retries : str
+        The name of the counter of retried requests to the LunarCrush API.
+    descriptions : dict
+        The description of each metric, indexed by metric name.
+    latency_quantiles : double[]
+        The quantiles of each latency histogram which are exposed.
+
+    Instance Attributes
+    -------------------
+    __histograms : dict
+        The latency histograms indexed by metric name and then by labels.
+    __counters : dict
+        The counter values indexed by metric name and then by labels.
+    __lock : Lock
+        The lock which keeps the metrics consistent when they are recorded on
+        several threads.
+    """
+
+    __instance = None
+
+    phase_latency = "coinarius_phase_latency_seconds"
+    calculator_latency = "coinarius_calculator_latency_seconds"
+    tick_lag = "coinarius_tick_lag_seconds"
+    skipped_ticks = "coinarius_skipped_ticks_total"
+    ticks = "coinarius_ticks_total"
+    errors = "coinarius_errors_total"
+    payload_bytes = "coinarius_payload_bytes_total"
+    fetch_retries = "coinarius_fetch_retries_total"
+
+    descriptions = {
+        phase_latency: "Latency of each phase of an analytics engine tick.",
+        calculator_latency: "Latency of each analytics calculator.",
+        tick_lag: "Delay of each analytics engine tick after its scheduled time.",
+        skipped_ticks: "Number of analytics engine ticks skipped while running behind.",
+        ticks: "Number of analytics engine ticks.",
+        errors: "Number of errors raised by the analytics engine.",
+        payload_bytes: "Number of bytes of the payloads fetched from LunarCrush.",
+        fetch_retries: "Number of retried requests to LunarCrush.",
+    }
+
+    latency_quantiles = [0.5, 0.95, 0.99]
+
+    def __init__(self):
+        """
+        Initialises a new instance of this class.
+        """
+
+        self.__histograms = {}
+        self.__counters = {}
+        self.__lock = Lock()
+
+        if Metrics.__instance is not None:
+            raise Exception("Metrics class is a Singleton!")
+        else:
+            Metrics.__instance = self
+
+    @staticmethod
+    def get_instance():
+        """
+        Returns the single instance of this Metrics class.
+        """
+
+        if Metrics.__instance is None:
+            Metrics()
+
+        return Metrics.__instance
+
+    def observe(self, name, seconds, labels=()):
+        """
+        Records a latency in the latency histogram with the given name and labels.
+
+        Parameters
+        ----------
+        name : str
+            The name of the metric, e.g. `Metrics.phase_latency`.
+        seconds : double
+            The latency in seconds.
+        labels : tuple
+            The (label name, label value) pairs of the histogram, e.g.
+            `(("phase", "fetch"),)`, which are always given in the same order.
+        """
+
+        with self.__lock:
+            histograms = self.__histograms.setdefault(name, {})
+            histogram = histograms.get(labels)
+
+            if histogram is None:
+                histogram = histograms[labels] = LatencyHistogram()
+
+            histogram.record(seconds)
+
+    @contextmanager
+    def time(self, name, labels=()):
+        """
+        Times the block of a `with` statement and records its latency, even if
+        it raises.
+
+        Parameters
+        ----------
+        name : str
+            The name of the metric, e.g. `Metrics.phase_latency`.
+        labels : tuple
+            The (label name, label value) pairs of the histogram.
+        """
+
+        start_time = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start_time, labels)
+
+    def increment(self, name, amount=1, labels=()):
+        """
+        Increments the counter with the given name and labels.
+
+        Parameters
+        ----------
+        name : str
+            The name of the metric, e.g. `Metrics.ticks`.
+        amount : double
+            The amount the counter is incremented by.
+        labels : tuple
+            The (label name, label value) pairs of the counter.
+        """
+
+        with self.__lock:
+            counters = self.__counters.setdefault(name, {})
+            counters[labels] = counters.get(labels, 0) + amount
+
+    def quantile(self, name, quantile, labels=()):
+        """
+        Estimates a quantile of the latency histogram with the given name and labels.
+
+        Parameters
+        ----------
+        name : str
+            The name of the metric.
+        quantile : double
+            The quantile, e.g. 0.95 for the p95.
+        labels : tuple
+            The (label name, label value) pairs of the histogram.
+
+        Returns
+        -------
+            The estimated quantile in seconds, or NaN if the histogram is empty.
+        """
+
+        with self.__lock:
+            histogram = self.__histograms.get(name, {}).get(labels)
+
+            return float("nan") if histogram is None else histogram.quantile(quantile)
+
+    def to_prometheus_text(self):
+        """
+        Formats every metric in the Prometheus text exposition format, where each
+        latency histogram is exposed both as a histogram and as gauges of its
+        estimated quantiles (i.e. `{name}_quantile`).
+
+        Returns
+        -------
+            The metrics as text.
+        """
+
+        lines = []
+
+        with self.__lock:
+            for name, histograms in sorted(self.__histograms.items()):
+                self.__add_header(lines, name, "histogram")
+
+                for labels, histogram in histograms.items():
+                    cumulative_count = 0
+
+                    for bound, bucket_count in zip(
+                        LatencyHistogram.bucket_bounds, histogram.bucket_counts
+                    ):
+                        cumulative_count += bucket_count
+                        lines.append(
+                            f"{name}_bucket{self.__format_labels(labels + (('le', repr(bound)),))} {cumulative_count}"
+                        )
+
+                    lines.append(
+                        f"{name}_bucket{self.__format_labels(labels + (('le', '+Inf'),))} {histogram.count}"
+                    )
+                    lines.append(
+                        f"{name}_sum{self.__format_labels(labels)} {repr(histogram.total)}"
+                    )
+                    lines.append(
+                        f"{name}_count{self.__format_labels(labels)} {histogram.count}"
+                    )
+
+                self.__add_header(lines, f"{name}_quantile", "gauge", name)
+
+                for labels, histogram in histograms.items():
+                    for quantile in Metrics.latency_quantiles:
+                        quantile_labels = labels + (("quantile", str(quantile)),)
+                        lines.append(
+                            f"{name}_quantile{self.__format_labels(quantile_labels)} {repr(histogram.quantile(quantile))}"
+                        )
+
+            for name, counters in sorted(self.__counters.items()):
+                self.__add_header(lines, name, "counter")
+
+                for labels, value in counters.items():
+                    lines.append(f"{name}{self.__format_labels(labels)} {value}")
+
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def __add_header(lines, name, metric_type, described_name=None):
+        """
+        Adds the HELP and TYPE lines of a metric.
+        """
+
+        description = Metrics.descriptions.get(described_name or name, name)
+
+        if described_name is not None:
+            description = f"Estimated quantiles. {description}"
+
+        lines.append(f"# HELP {name} {description}")
+        lines.append(f"# TYPE {name} {metric_type}")
+
+    @staticmethod
+    def __format_labels(labels):
+        """
+        Formats the given (label name, label value) pairs, e.g. as `{phase="fetch"}`.
+        """
+
+        if not labels:
+            return ""
+
+        formatted_labels = ",".join(
+            '{}="{}"'.format(
+                label,
+                str(value)
+                .replace("\\", "\\\\")
+                .replace('"', '\\"')
+                .replace("\n", "\\n"),
+            )
+            for label, value in labels
+        )
+
+        return f"{{{formatted_labels}}}"
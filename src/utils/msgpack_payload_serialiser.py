@@ -0,0 +1,87 @@
+import numpy as np
+
+from core.time_series_store import TimeSeries
+
+from .payload_serialiser import PayloadSerialiser
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+class MsgpackPayloadSerialiser(PayloadSerialiser):
+    """
+    Serialises engine output into MessagePack, which is only available if the
+    `msgpack` package is installed.
+
+    Time series use a compact binary layout, i.e. a map of "times", the
+    little-endian int64 epoch timestamps (in seconds), and of "values", the
+    little-endian float64 values where missing values are NaN, so clients can
+    view them as `BigInt64Array` and `Float64Array` without parsing each value.
+    """
+
+    format_name = "msgpack"
+    mimetype = "application/msgpack"
+    is_available = msgpack is not None
+
+    def to_message(self, output):
+        """
+        Serialises the given engine output into MessagePack bytes, which SocketIO
+        sends as a binary attachment.
+
+        Parameters
+        ----------
+        output : obj
+            The (possibly nested) engine output.
+
+        Returns
+        -------
+            The MessagePack bytes.
+        """
+
+        return self.serialise(output)
+
+    def serialise(self, output):
+        """
+        Serialises the given engine output into MessagePack bytes.
+
+        Parameters
+        ----------
+        output : obj
+            The (possibly nested) engine output.
+
+        Returns
+        -------
+            The MessagePack bytes.
+        """
+
+        if msgpack is None:
+            raise Exception(
+                "The msgpack package needs to be installed to serialise MessagePack."
+            )
+
+        return msgpack.packb(
+            output, default=MsgpackPayloadSerialiser.__to_packable, use_bin_type=True
+        )
+
+    @staticmethod
+    def __to_packable(output):
+        """
+        Converts a value MessagePack cannot pack natively, i.e. a time series, a
+        NumPy array or a NumPy scalar.
+        """
+
+        if isinstance(output, TimeSeries):
+            return {
+                "times": output.times.astype("<i8", copy=False).tobytes(),
+                "values": output.values.astype("<f8", copy=False).tobytes(),
+            }
+
+        if isinstance(output, np.ndarray):
+            return output.tolist()
+
+        if isinstance(output, np.generic):
+            return output.item()
+
+        raise TypeError(f"Cannot serialise {type(output).__name__} into MessagePack.")
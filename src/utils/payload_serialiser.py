@@ -0,0 +1,62 @@
+class PayloadSerialiser:
+    """
+    Represents a serialiser of engine output (e.g. the analytics snapshot and
+    delta messages) into the wire format of web clients, where each web client
+    selects one of the available formats when it registers.
+
+    ...
+
+    Class Attributes
+    ----------------
+    format_name : str
+        The name of the format, which web clients select it by.
+    mimetype : str
+        The mimetype of the serialised bytes.
+    is_available : bool
+        A flag which is set to `False` if the format depends on a package which is
+        not installed.
+    """
+
+    format_name = None
+    mimetype = None
+    is_available = True
+
+    def to_message(self, output):
+        """
+        Converts the given engine output into the object emitted to SocketIO
+        clients, i.e. either plain Python objects which SocketIO JSON encodes or
+        bytes which it sends as a binary attachment.
+
+        Parameters
+        ----------
+        output : obj
+            The (possibly nested) engine output, which may hold time series,
+            NumPy arrays and NumPy scalars.
+
+        Returns
+        -------
+            The SocketIO message.
+        """
+
+        raise NotImplementedError(
+            "PayloadSerialiser is a base class and this method should be implemented in its child classes."
+        )
+
+    def serialise(self, output):
+        """
+        Serialises the given engine output into bytes, e.g. for the body of an
+        HTTP response.
+
+        Parameters
+        ----------
+        output : obj
+            The (possibly nested) engine output.
+
+        Returns
+        -------
+            The serialised bytes.
+        """
+
+        raise NotImplementedError(
+            "PayloadSerialiser is a base class and this method should be implemented in its child classes."
+        )
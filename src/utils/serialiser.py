@@ -0,0 +1,48 @@
+import numpy as np
+
+from core.time_series_store import TimeSeries
+
+
+class Serialiser:
+    """
+    Converts engine output into plain Python objects which can be JSON encoded,
+    e.g. by Flask or SocketIO.
+    """
+
+    @staticmethod
+    def to_serialisable(output):
+        """
+        Recursively converts time series, NumPy arrays and NumPy scalars in the given output
+        into lists and Python scalars.
+
+        Parameters
+        ----------
+        output : obj
+            The (possibly nested) engine output.
+
+        Returns
+        -------
+            A JSON serialisable copy of the given output.
+        """
+
+        if isinstance(output, dict):
+            return {
+                key: Serialiser.to_serialisable(value) for key, value in output.items()
+            }
+
+        if isinstance(output, TimeSeries):
+            return output.to_list()
+
+        if isinstance(output, np.ndarray):
+            output = output.tolist()
+
+        if isinstance(output, (list, tuple)):
+            return [Serialiser.to_serialisable(value) for value in output]
+
+        if isinstance(output, np.generic):
+            output = output.item()
+
+        if isinstance(output, float) and output != output:
+            return None
+
+        return output
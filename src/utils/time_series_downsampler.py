@@ -0,0 +1,85 @@
+import numpy as np
+
+from core.time_series_store import TimeSeries
+
+
+class TimeSeriesDownsampler:
+    """
+    Downsamples time series for charting with the Largest-Triangle-Three-Buckets
+    (LTTB) algorithm, which keeps the first and last datapoints and, from each
+    bucket of datapoints in between, the one forming the largest triangle with
+    the datapoint kept from the previous bucket and the average of the next
+    bucket, so the shape of the chart (e.g. its peaks and troughs) is preserved.
+    """
+
+    @staticmethod
+    def downsample(time_series, max_points):
+        """
+        Downsamples the given time series to at most the given number of
+        datapoints, dropping its missing values first.
+
+        Parameters
+        ----------
+        time_series : TimeSeries
+            The time series.
+        max_points : int
+            The maximum number of datapoints, which needs to be at least 3.
+
+        Returns
+        -------
+            The downsampled time series, which is the given one if it has no more
+            datapoints than the maximum and no missing values.
+        """
+
+        if max_points < 3:
+            raise Exception("Downsampling needs to keep at least 3 datapoints.")
+
+        is_present = np.isfinite(time_series.values)
+
+        if not is_present.all():
+            time_series = TimeSeries(
+                time_series.times[is_present], time_series.values[is_present]
+            )
+
+        num_points = len(time_series)
+
+        if num_points <= max_points:
+            return time_series
+
+        # Times are made relative to the first one to keep the areas precise.
+        times = (time_series.times - time_series.times[0]).astype(np.float64)
+        values = time_series.values
+
+        # Bucket i (from 0) of the datapoints in between holds indices
+        # [bounds[i], bounds[i + 1]), and the last bucket only holds the last one.
+        bucket_size = (num_points - 2) / (max_points - 2)
+        bounds = np.empty(max_points, dtype=np.int64)
+        bounds[:-1] = (
+            np.floor(np.arange(max_points - 1) * bucket_size).astype(np.int64) + 1
+        )
+        bounds[-2:] = [num_points - 1, num_points]
+
+        indices = np.empty(max_points, dtype=np.int64)
+        indices[0] = 0
+        indices[-1] = num_points - 1
+        kept_index = 0
+
+        for bucket in range(max_points - 2):
+            start, end = bounds[bucket], bounds[bucket + 1]
+            next_start, next_end = bounds[bucket + 1], bounds[bucket + 2]
+
+            average_time = times[next_start:next_end].mean()
+            average_value = values[next_start:next_end].mean()
+            kept_time = times[kept_index]
+            kept_value = values[kept_index]
+
+            # Twice the area of each triangle, since only their order matters.
+            areas = np.abs(
+                (kept_time - average_time) * (values[start:end] - kept_value)
+                - (kept_time - times[start:end]) * (average_value - kept_value)
+            )
+
+            kept_index = start + int(np.argmax(areas))
+            indices[bucket + 1] = kept_index
+
+        return TimeSeries(time_series.times[indices], values[indices])
@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from calculators.correlation_matrix_calculator import CorrelationMatrixCalculator
+from calculators.return_calculator import ReturnCalculator
+from core.time_series_store import TimeSeriesStore
+
+day_in_seconds = 24 * 60 * 60
+symbols = ["AAA", "BBB", "CCC", "DDD", "EEE"]
+
+
+@pytest.fixture
+def store():
+    store = TimeSeriesStore.get_instance()
+    store.clear()
+
+    yield store
+
+    store.clear()
+
+
+def write_prices(store, seed, num_prices=60):
+    rng = np.random.default_rng(seed)
+
+    for row, symbol in enumerate(symbols):
+        # The series have different lengths, so the panel is NaN-padded.
+        prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.03, num_prices - 5 * row)))
+        times = np.arange(len(prices), dtype=np.int64) * day_in_seconds
+        store.write("price", symbol, times, prices)
+
+
+def latest_prices(store, changes):
+    return {
+        symbol: {"price": store.read("price", symbol).values[-1] * (1 + change)}
+        for symbol, change in zip(symbols, changes)
+    }
+
+
+def create_calculators(is_batched, window):
+    return_calculator = ReturnCalculator()
+    return_calculator.is_batched = is_batched
+    return_calculator.calculate({symbol: None for symbol in symbols})
+
+    correlation_matrix_calculator = CorrelationMatrixCalculator(
+        return_calculator, window
+    )
+    correlation_matrix_calculator.calculate()
+
+    return return_calculator, correlation_matrix_calculator
+
+
+@pytest.mark.parametrize("is_batched", [False, True])
+@pytest.mark.parametrize("window", [None, 20])
+def test_latest_matrix_of_changed_symbols_matches_recalculation(
+    store, is_batched, window
+):
+    write_prices(store, 1)
+    return_calculator, correlation_matrix_calculator = create_calculators(
+        is_batched, window
+    )
+    return_calculator.calculate_latest(
+        latest_prices(store, [0.01, -0.02, 0.03, 0.0, 0.01])
+    )
+    correlation_matrix_calculator.calculate_latest()
+
+    changed_symbols = {"BBB", "DDD"}
+    changed_latest_prices = latest_prices(store, [0.01, 0.05, 0.03, -0.04, 0.01])
+    latest_return_data = return_calculator.latest_analytics_data
+    return_calculator.calculate_latest(changed_latest_prices, changed_symbols)
+    latest_matrix = correlation_matrix_calculator.calculate_latest(changed_symbols)
+
+    for symbol in set(symbols) - changed_symbols:
+        assert (
+            return_calculator.latest_analytics_data[symbol]
+            is latest_return_data[symbol]
+        )
+
+    expected_return_calculator, expected_correlation_matrix_calculator = (
+        create_calculators(is_batched, window)
+    )
+    expected_return_calculator.calculate_latest(changed_latest_prices)
+    expected_matrix = expected_correlation_matrix_calculator.calculate_latest()
+
+    for symbol in symbols:
+        assert return_calculator.latest_analytics_data[symbol][
+            "last_return"
+        ] == pytest.approx(
+            expected_return_calculator.latest_analytics_data[symbol]["last_return"],
+            rel=1e-12,
+        )
+
+    np.testing.assert_array_equal(latest_matrix, expected_matrix)
+
+
+@pytest.mark.parametrize("is_batched", [False, True])
+def test_window_longer_than_history_uses_every_return(store, is_batched):
+    write_prices(store, 2, num_prices=100)
+    return_calculator, correlation_matrix_calculator = create_calculators(
+        is_batched, window=120
+    )
+
+    matrix = correlation_matrix_calculator.calculate()
+
+    returns = store.panel("return", symbols)
+    expected_matrix = pd.DataFrame(returns.T).corr(min_periods=2).to_numpy()
+
+    assert returns.shape[1] < 120
+    np.testing.assert_allclose(matrix, expected_matrix, rtol=1e-10, atol=1e-12)
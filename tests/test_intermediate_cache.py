@@ -0,0 +1,78 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from core.intermediate_cache import IntermediateCache
+
+
+def test_concurrent_misses_compute_once():
+    cache = IntermediateCache()
+    num_computations = 0
+    lock = threading.Lock()
+
+    def compute():
+        nonlocal num_computations
+
+        with lock:
+            num_computations += 1
+
+        time.sleep(0.05)
+
+        return np.arange(3, dtype=np.float64)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        values = list(
+            executor.map(
+                lambda _: cache.get_or_compute(("clean", "price", "BTC"), compute),
+                range(8),
+            )
+        )
+
+    assert num_computations == 1
+    assert all(value is values[0] for value in values)
+    assert not values[0].flags.writeable
+
+
+def test_failed_computation_is_retried():
+    cache = IntermediateCache()
+
+    def fail():
+        raise ValueError("no prices")
+
+    with pytest.raises(ValueError):
+        cache.get_or_compute("key", fail)
+
+    assert cache.get_or_compute("key", lambda: 1) == 1
+
+
+def test_waiters_get_the_exception_of_a_failed_computation():
+    cache = IntermediateCache()
+    is_started = threading.Event()
+
+    def fail():
+        is_started.set()
+        time.sleep(0.05)
+
+        raise ValueError("no prices")
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        owner = executor.submit(cache.get_or_compute, "key", fail)
+        is_started.wait()
+        waiter = executor.submit(cache.get_or_compute, "key", lambda: 1)
+
+        with pytest.raises(ValueError):
+            owner.result()
+
+        with pytest.raises(ValueError):
+            waiter.result()
+
+
+def test_clear_removes_values():
+    cache = IntermediateCache()
+    cache.get_or_compute("key", lambda: 1)
+    cache.clear()
+
+    assert cache.get_or_compute("key", lambda: 2) == 2
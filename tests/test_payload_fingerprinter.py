@@ -0,0 +1,40 @@
+from core.payload_fingerprinter import PayloadFingerprinter
+
+
+def asset_data(prices):
+    return {
+        "data": [
+            {
+                "symbol": symbol,
+                "price": price,
+                "timeSeries": [{"time": 0, "close": price}],
+            }
+            for symbol, price in prices.items()
+        ]
+    }
+
+
+def test_changed_symbols_is_a_set_of_changed_and_new_symbols():
+    payload_fingerprinter = PayloadFingerprinter(["price"])
+    payload_fingerprinter.commit(
+        payload_fingerprinter.fingerprint(asset_data({"AAA": 1.0, "BBB": 2.0}))
+    )
+
+    changed_symbols = payload_fingerprinter.changed_symbols(
+        payload_fingerprinter.fingerprint(
+            asset_data({"AAA": 1.0, "BBB": 2.5, "CCC": 3.0})
+        )
+    )
+
+    assert changed_symbols == {"BBB", "CCC"}
+    assert isinstance(changed_symbols, set)
+
+
+def test_unchanged_payload_has_no_changed_symbols():
+    payload_fingerprinter = PayloadFingerprinter(["price"])
+    fingerprints = payload_fingerprinter.fingerprint(asset_data({"AAA": 1.0}))
+    payload_fingerprinter.commit(fingerprints)
+
+    assert not payload_fingerprinter.changed_symbols(
+        payload_fingerprinter.fingerprint(asset_data({"AAA": 1.0}))
+    )
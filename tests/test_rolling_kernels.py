@@ -0,0 +1,195 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from calculators.rolling_kernels import (
+    EwmKernel,
+    LaggedChangeKernel,
+    RollingExtremumKernel,
+    RollingMeanKernel,
+    RollingStdKernel,
+    RollingSumKernel,
+)
+
+window = 5
+alpha = 0.2
+
+
+def wilder_mean(series):
+    """
+    Calculates Wilder's smoothing of the given series like a pandas baseline,
+    i.e. the mean of the first `1 / alpha` values followed by a recursive mean,
+    where missing values are skipped.
+    """
+
+    values = series.dropna()
+    num_periods = int(round(1 / alpha))
+    means = values.expanding().mean()
+
+    if len(values) > num_periods:
+        seeded_values = values.iloc[num_periods - 1 :].copy()
+        seeded_values.iloc[0] = means.iloc[num_periods - 1]
+        means.iloc[num_periods - 1 :] = seeded_values.ewm(
+            alpha=alpha, adjust=False
+        ).mean()
+
+    return means.reindex(series.index).ffill().where(series.notna().cummax())
+
+
+kernels = {
+    "sum": (
+        lambda num_series: RollingSumKernel(window, num_series),
+        lambda series: series.rolling(window).sum(),
+    ),
+    "mean": (
+        lambda num_series: RollingMeanKernel(window, num_series),
+        lambda series: series.rolling(window).mean(),
+    ),
+    "std": (
+        lambda num_series: RollingStdKernel(window, num_series),
+        lambda series: series.rolling(window).std(),
+    ),
+    "population_std": (
+        lambda num_series: RollingStdKernel(window, num_series, ddof=0),
+        lambda series: series.rolling(window).std(ddof=0),
+    ),
+    "min": (
+        lambda num_series: RollingExtremumKernel(window, num_series),
+        lambda series: series.rolling(window).min(),
+    ),
+    "max": (
+        lambda num_series: RollingExtremumKernel(window, num_series, is_maximum=True),
+        lambda series: series.rolling(window).max(),
+    ),
+    "difference": (
+        lambda num_series: LaggedChangeKernel(2, num_series),
+        lambda series: series.diff(2),
+    ),
+    "return": (
+        lambda num_series: LaggedChangeKernel(
+            1, num_series, is_relative=True, scale=100
+        ),
+        lambda series: series.diff() / series.shift() * 100,
+    ),
+    "adjusted_ewm": (
+        lambda num_series: EwmKernel(
+            alpha, num_series, EwmKernel.adjusted_mode, min_periods=3
+        ),
+        lambda series: series.ewm(alpha=alpha, adjust=True, min_periods=3).mean(),
+    ),
+    "recursive_ewm": (
+        lambda num_series: EwmKernel(alpha, num_series, EwmKernel.recursive_mode),
+        lambda series: series.ewm(alpha=alpha, adjust=False, ignore_na=True).mean(),
+    ),
+    "wilder_ewm": (
+        lambda num_series: EwmKernel(
+            alpha, num_series, EwmKernel.wilder_mode, min_periods=5
+        ),
+        lambda series: wilder_mean(series).where(series.notna().cumsum() >= 5),
+    ),
+}
+
+
+def random_panel(seed, num_values):
+    rng = np.random.default_rng(seed)
+
+    return 100 * np.exp(np.cumsum(rng.normal(0, 0.05, (3, num_values)), axis=1))
+
+
+def gapped_panel():
+    values = random_panel(1, 40)
+    values[0, [6, 7, 20]] = np.nan
+    # A series shorter than the others, aligned to the right like store panels.
+    values[1, :30] = np.nan
+    values[2, -3] = np.nan
+
+    return values
+
+
+panels = {
+    "random": lambda: random_panel(0, 40),
+    "gapped": gapped_panel,
+    # Every series is shorter than the window.
+    "short": lambda: random_panel(2, window - 2),
+}
+
+
+@pytest.mark.parametrize("panel", list(panels))
+@pytest.mark.parametrize("kernel", list(kernels))
+def test_batch_matches_pandas(kernel, panel):
+    create_kernel, baseline = kernels[kernel]
+    values = panels[panel]()
+
+    outputs = create_kernel(len(values)).batch(values)
+
+    for row, row_values in enumerate(values):
+        np.testing.assert_allclose(
+            outputs[row],
+            baseline(pd.Series(row_values)).to_numpy(),
+            rtol=1e-9,
+            atol=1e-9,
+            equal_nan=True,
+        )
+
+
+@pytest.mark.parametrize("panel", list(panels))
+@pytest.mark.parametrize("kernel", list(kernels))
+def test_push_matches_batch(kernel, panel):
+    create_kernel, _ = kernels[kernel]
+    values = panels[panel]()
+    expected_outputs = create_kernel(len(values)).batch(values)
+
+    for num_batched in [0, 1, values.shape[1] // 2]:
+        streaming_kernel = create_kernel(len(values))
+        streaming_kernel.batch(values[:, :num_batched])
+
+        for column in range(num_batched, values.shape[1]):
+            peeked_outputs = streaming_kernel.peek(values[:, column])
+            pushed_outputs = streaming_kernel.push(values[:, column])
+
+            np.testing.assert_array_equal(pushed_outputs, expected_outputs[:, column])
+            np.testing.assert_array_equal(peeked_outputs, pushed_outputs)
+
+
+@pytest.mark.parametrize("panel", list(panels))
+@pytest.mark.parametrize("kernel", list(kernels))
+def test_prime_matches_batch(kernel, panel):
+    create_kernel, _ = kernels[kernel]
+    values = panels[panel]()
+    expected_outputs = create_kernel(len(values)).batch(values)
+    primed_kernel = create_kernel(len(values))
+
+    outputs = primed_kernel.prime(values)
+
+    np.testing.assert_array_equal(outputs, expected_outputs)
+    # The kernel stops right before the last values, so peeking them again gives
+    # their outputs.
+    np.testing.assert_array_equal(
+        primed_kernel.peek(values[:, -1]), expected_outputs[:, -1]
+    )
+
+
+@pytest.mark.parametrize("kernel", list(kernels))
+def test_select_keeps_state_of_rows(kernel):
+    create_kernel, _ = kernels[kernel]
+    values = gapped_panel()
+    rows = [2, 0]
+    panel_kernel = create_kernel(len(values))
+    panel_kernel.batch(values[:, :-2])
+
+    selected_kernel = panel_kernel.select(rows)
+    expected_outputs = panel_kernel.peek(values[:, -2])
+
+    assert selected_kernel.num_series == len(rows)
+    assert selected_kernel.num_values == panel_kernel.num_values
+
+    for column in [-2, -1]:
+        np.testing.assert_array_equal(
+            selected_kernel.push(values[rows, column]),
+            create_kernel(len(rows)).batch(
+                values[rows, : values.shape[1] + column + 1]
+            )[:, -1],
+        )
+
+    # Pushing to the selected kernel leaves the panel's kernel unchanged.
+    np.testing.assert_array_equal(panel_kernel.peek(values[:, -2]), expected_outputs)
@@ -0,0 +1,190 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from calculators.rsi_calculator import RsiCalculator
+from core.time_series_store import TimeSeriesStore
+
+num_periods = 14
+day_in_seconds = 24 * 60 * 60
+
+
+def baseline_rsi(prices, smoothing=RsiCalculator.adjusted_smoothing):
+    """
+    Calculates the rsi values of the given (non-missing) prices like the pandas
+    implementation the NumPy kernels replaced, where Wilder's smoothing seeds a
+    recursive mean with the simple mean of the first 14 price changes.
+    """
+
+    price_changes = pd.Series(prices, dtype=np.float64).diff()
+    increases = price_changes.clip(lower=0)
+    decreases = -1 * price_changes.clip(upper=0)
+
+    if smoothing == RsiCalculator.adjusted_smoothing:
+        average_increases = increases.ewm(
+            com=num_periods - 1, adjust=True, min_periods=num_periods
+        ).mean()
+        average_decreases = decreases.ewm(
+            com=num_periods - 1, adjust=True, min_periods=num_periods
+        ).mean()
+    else:
+        average_increases = wilder_mean(increases)
+        average_decreases = wilder_mean(decreases)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = average_increases / average_decreases
+
+    return (100 - (100 / (1 + rsi))).to_numpy()
+
+
+def wilder_mean(values):
+    """
+    Calculates Wilder's smoothing of the given series, whose first value is NaN.
+    """
+
+    means = pd.Series(np.nan, index=values.index)
+
+    if len(values) > num_periods:
+        seeded_values = values.iloc[num_periods:].copy()
+        seeded_values.iloc[0] = values.iloc[1 : num_periods + 1].mean()
+        means.iloc[num_periods:] = seeded_values.ewm(
+            alpha=1 / num_periods, adjust=False
+        ).mean()
+
+    return means
+
+
+def random_prices(seed, num_prices):
+    rng = np.random.default_rng(seed)
+
+    return 100 * np.exp(np.cumsum(rng.normal(0, 0.03, num_prices)))
+
+
+def flat_prices(num_prices):
+    return np.full(num_prices, 42.0)
+
+
+def flat_then_random_prices(seed, num_prices):
+    return np.concatenate(
+        [
+            flat_prices(num_prices // 2),
+            42.0 * random_prices(seed, num_prices // 2) / 100,
+        ]
+    )
+
+
+def missing_prices(seed, num_prices):
+    prices = random_prices(seed, num_prices)
+    prices[[0, 5, 17, num_prices // 2]] = np.nan
+
+    return prices
+
+
+price_series = {
+    "random": lambda: {"AAA": random_prices(1, 100), "BBB": random_prices(2, 60)},
+    "flat": lambda: {
+        "AAA": flat_then_random_prices(3, 100),
+        "BBB": random_prices(7, 20),
+    },
+    "nan_padded": lambda: {"AAA": missing_prices(4, 100), "BBB": random_prices(5, 30)},
+}
+
+
+@pytest.fixture
+def store():
+    store = TimeSeriesStore.get_instance()
+    store.clear()
+
+    yield store
+
+    store.clear()
+
+
+def write_prices(store, prices):
+    for symbol, values in prices.items():
+        times = np.arange(len(values), dtype=np.int64) * day_in_seconds
+        store.write("price", symbol, times, values)
+
+
+def create_calculator(smoothing, is_batched):
+    calculator = RsiCalculator(smoothing)
+    calculator.is_batched = is_batched
+
+    return calculator
+
+
+def finite(values):
+    values = np.asarray(values, dtype=np.float64)
+
+    return values[np.isfinite(values)]
+
+
+@pytest.mark.parametrize("is_batched", [False, True])
+@pytest.mark.parametrize(
+    "smoothing", [RsiCalculator.adjusted_smoothing, RsiCalculator.wilder_smoothing]
+)
+@pytest.mark.parametrize("series", list(price_series))
+def test_calculate_matches_baseline(store, series, smoothing, is_batched):
+    prices = price_series[series]()
+    write_prices(store, prices)
+    calculator = create_calculator(smoothing, is_batched)
+
+    analytics_data = calculator.calculate({symbol: None for symbol in prices})
+
+    for symbol, values in prices.items():
+        expected = baseline_rsi(finite(values), smoothing)
+        time_series = analytics_data[symbol]["time_series"]
+
+        np.testing.assert_allclose(
+            time_series.values, finite(expected), rtol=1e-10, atol=1e-10
+        )
+
+        if np.isfinite(expected).any():
+            assert analytics_data[symbol]["last_rsi"] == pytest.approx(
+                finite(expected)[-1], rel=1e-10
+            )
+
+
+@pytest.mark.parametrize("is_batched", [False, True])
+@pytest.mark.parametrize(
+    "smoothing", [RsiCalculator.adjusted_smoothing, RsiCalculator.wilder_smoothing]
+)
+@pytest.mark.parametrize("series", ["random", "nan_padded"])
+@pytest.mark.parametrize("change", [-0.05, 0.0, 0.02])
+def test_calculate_latest_matches_baseline(
+    store, series, smoothing, is_batched, change
+):
+    prices = price_series[series]()
+    write_prices(store, prices)
+    calculator = create_calculator(smoothing, is_batched)
+    calculator.calculate({symbol: None for symbol in prices})
+
+    latest_prices = {
+        symbol: finite(values)[-1] * (1 + change) for symbol, values in prices.items()
+    }
+    latest_analytics_data = calculator.calculate_latest(
+        {symbol: {"price": price} for symbol, price in latest_prices.items()}
+    )
+
+    for symbol, values in prices.items():
+        expected = baseline_rsi(
+            [*finite(values)[:-1], latest_prices[symbol]], smoothing
+        )[-1]
+
+        assert latest_analytics_data[symbol]["last_rsi"] == pytest.approx(
+            expected, rel=1e-10
+        )
+
+
+def test_flat_prices_have_no_rsi(store):
+    prices = np.stack([flat_prices(50), random_prices(6, 50)])
+    calculator = create_calculator(RsiCalculator.adjusted_smoothing, True)
+
+    rsi = calculator._calculate_panel_analytics(["AAA", "BBB"], prices)
+
+    # Without any price changes the average increases and decreases are both 0.
+    np.testing.assert_array_equal(rsi[0], baseline_rsi(prices[0]))
+    assert np.isnan(rsi[0]).all()
+    np.testing.assert_allclose(
+        rsi[1], baseline_rsi(prices[1]), rtol=1e-10, atol=1e-10, equal_nan=True
+    )